@@ -0,0 +1,98 @@
+"""Single-producer frame bus for streaming simulation frames.
+
+The simulation loop computes one frame per tick and publishes it here;
+every WebSocket subscriber receives that same frame. The loop may run on
+its own thread: ``publish_threadsafe`` swaps in the latest frame and hands
+delivery to the event loop that owns the subscriber mailboxes.
+"""
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+
+@dataclass
+class Frame:
+    """One fully computed simulation tick."""
+    seq: int
+    timestamp: float
+    joint_states: List[Any]
+    sensor_data: Any
+    predictions: Dict[str, float]
+    alerts: List[Dict[str, str]]
+    payload: Dict[str, Any]  # Flat format sent to stream clients
+    _json: Optional[str] = field(default=None, repr=False)
+
+    def to_json(self) -> str:
+        """Serialize the payload once and reuse it for every subscriber."""
+        if self._json is None:
+            self._json = json.dumps(self.payload)
+        return self._json
+
+
+class FrameBus:
+    """Fan-out broadcast of frames from one producer to many subscribers."""
+
+    def __init__(self):
+        """Initialize an empty bus."""
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.latest: Optional[Frame] = None
+        self.seq = 0
+
+    def attach(self, loop: asyncio.AbstractEventLoop):
+        """Set the event loop that owns the subscriber mailboxes."""
+        self._loop = loop
+
+    def next_seq(self) -> int:
+        """Return the sequence number for the next frame."""
+        self.seq += 1
+        return self.seq
+
+    def publish(self, frame: Frame):
+        """
+        Publish a frame to every subscriber.
+
+        Each subscriber has a single-slot mailbox, so a slow client skips
+        to the newest frame instead of building up a backlog.
+        """
+        self.latest = frame
+        self._deliver(frame)
+
+    def publish_threadsafe(self, frame: Frame):
+        """
+        Publish a frame from a producer thread.
+
+        The latest-frame reference is swapped immediately; fan-out is
+        scheduled on the attached event loop, so the producer never waits
+        on subscribers and mailboxes are only touched by their own loop.
+        """
+        self.latest = frame
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._deliver, frame)
+
+    def _deliver(self, frame: Frame):
+        """Put a frame in every subscriber mailbox, replacing any unread frame."""
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(frame)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Register a subscriber and return its mailbox."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """Remove a subscriber."""
+        self._subscribers.discard(queue)
+
+    @property
+    def subscriber_count(self) -> int:
+        """Number of connected subscribers."""
+        return len(self._subscribers)
+
+    def reset(self):
+        """Forget the latest frame (subscribers stay connected)."""
+        self.latest = None
@@ -17,12 +17,29 @@ class Settings(BaseSettings):
     urdf_path: Path = data_dir / "urdf" / "armpi_fpv.urdf"
     sensor_logs_dir: Path = data_dir / "sensor_logs"
     models_dir: Path = data_dir / "trained_models"
+    cache_dir: Path = data_dir / "cache"  # Derived artifacts keyed by URDF content hash
+    mesh_dir: Path = base_dir / "create_multibody_from_urdf" / "armpi_fpv" / "meshes"
     
     # Simulation
-    simulation_frequency: float = 10.0  # Hz
-    rom_reduction_factor: int = 10  # Reduce timesteps by this factor
+    simulation_frequency: float = 100.0  # Hz, physics and sensor rate
+    rom_reduction_factor: int = 10  # Reduce timesteps by this factor (inference rate = simulation_frequency / factor)
+    stream_frequency: float = 10.0  # Hz, frames published to clients
+    log_frequency: float = 10.0  # Hz, sensor log entries
+    schedule_policy: str = "catch_up"  # Missed simulation ticks: catch_up (run back to back) or skip
+    max_catch_up_ticks: int = 10  # Most missed ticks run back to back before the rest are dropped
+    clock_mode: str = "real"  # real (wall clock) or virtual (simulated time, decoupled from the wall clock)
+    clock_speed: float = 0.0  # Virtual clock: simulated seconds per wall second (0 = turbo, as fast as the CPU allows)
     use_real_data: bool = True
     real_data_path: Path = data_dir / "real_data.csv"
+    replay_stream_threshold_mb: float = 256.0  # Stream recordings larger than this
+    replay_chunk_rows: int = 65536  # Rows per streamed replay chunk
+    replay_interpolation: str = "linear"  # Resample replay to simulation_frequency: none, linear, cubic
+    replay_speed: float = 1.0  # Recorded seconds replayed per simulated second
+    fleet_size: int = 0  # Additional batched machines (0 = disabled)
+    reachability_voxel_size: float = 0.02  # m, workspace map resolution
+    reachability_samples: int = 500000  # Joint configurations sampled for the workspace map
+    collision_frequency: float = 10.0  # Hz, self-collision checks of the live machines
+    collision_leaf_radius: float = 0.005  # m, resolution of the collision sphere hierarchy
     
     # Sensor parameters
     base_temperature: float = 25.0  # Celsius
@@ -34,6 +51,9 @@ class Settings(BaseSettings):
     anomaly_contamination: float = 0.05  # Expected anomaly rate
     failure_threshold: float = 0.7  # Failure probability threshold
     rul_warning_hours: float = 100.0  # RUL warning threshold
+    feature_window_size: int = 10  # Samples in the rolling feature statistics
+    inference_batch_window_ms: float = 2.0  # Longest wait gathering concurrent rows into one prediction
+    inference_max_batch_size: int = 256  # Most rows scored in one batched prediction
     
     # API
     cors_origins: list = [
@@ -53,3 +73,4 @@ settings = Settings()
 # Ensure directories exist
 settings.sensor_logs_dir.mkdir(parents=True, exist_ok=True)
 settings.models_dir.mkdir(parents=True, exist_ok=True)
+settings.cache_dir.mkdir(parents=True, exist_ok=True)
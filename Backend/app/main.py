@@ -5,7 +5,9 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
 import asyncio
+import threading
 import time
 import pandas as pd
 from io import StringIO
@@ -16,17 +18,31 @@ import numpy as np
 from .config import settings
 from .models.schemas import (
     MachineMetadata, MachineState, HealthPrediction,
-    ControlCommand, ControlResponse, JointInfo, JointState, Log
+    ControlCommand, ControlResponse, JointInfo, JointState, Log,
+    IKRequest, IKResponse, ReachabilityRequest, ReachabilityResponse,
+    DynamicsRequest, DynamicsResponse, CollisionRequest, CollisionResponse,
+    PredictionRequest, PredictionResponse, FeatureRowRequest, FeatureRowResponse
 )
 from .simulation.urdf_parser import URDFParser
 from .simulation.physics_sim import PhysicsSimulator
 from .simulation.real_data_sim import RealDataSimulator
+from .simulation.fleet_sim import FleetSimulator
 from .simulation.sensor_generator import SensorGenerator
 from .simulation.rom import ReducedOrderModel
+from .simulation.pipeline import MultiRatePipeline, FixedRateScheduler
+from .simulation.clock import Clock, create_clock
+from .simulation.kinematics import ForwardKinematics, InverseKinematics
+from .simulation.dynamics import InverseDynamics
+from .simulation.workspace import ReachabilityMap
+from .simulation.collision import SelfCollisionChecker
+from .simulation.worker import SimulationWorker
 from .ml.preprocessing import FeatureEngineer
 from .ml.anomaly_detector import AnomalyDetector
 from .ml.failure_predictor import FailurePredictor
 from .ml.rul_estimator import RULEstimator
+from .ml.inference import InferenceEngine, DEFAULT_PREDICTIONS
+from .ml.batching import MicroBatcher
+from .api.frame_bus import Frame, FrameBus
 
 
 # Global state
@@ -34,17 +50,35 @@ class AppState:
     """Application state container."""
     urdf_parser: URDFParser = None
     simulator: PhysicsSimulator = None
+    fleet: FleetSimulator = None
     sensor_gen: SensorGenerator = None
     rom: ReducedOrderModel = None
+    pipeline: MultiRatePipeline = None
+    scheduler: FixedRateScheduler = None
+    clock: Clock = None
+    kinematics: ForwardKinematics = None
+    ik_solver: InverseKinematics = None
+    dynamics: InverseDynamics = None
+    reachability: ReachabilityMap = None
+    collision: SelfCollisionChecker = None
+    collisions: dict = {}  # Colliding link pairs per machine, from the last collision check
+    collision_executor: ThreadPoolExecutor = None  # Runs collision checks off the tick
+    collision_pending: Future = None  # Check in flight, if any
+    collision_generation: int = 0  # Bumped on reset so in-flight results are dropped
+    latest_predictions: dict = None  # Most recent scores from the reduced-rate inference stage
     feature_eng: FeatureEngineer = None
     anomaly_detector: AnomalyDetector = None
     failure_predictor: FailurePredictor = None
     rul_estimator: RULEstimator = None
+    inference: InferenceEngine = None
+    batcher: MicroBatcher = None
     sensor_logs: list = []
     system_logs: list = []
     last_alert_log_time: dict = {}  # Track last log time for alerts to prevent flooding
+    frame_bus: FrameBus = FrameBus()
     is_running: bool = False
-    simulation_task: asyncio.Task = None
+    worker: SimulationWorker = None
+    tick_lock: threading.Lock = threading.Lock()  # Held by the worker while a tick runs
 
 
 state = AppState()
@@ -73,30 +107,80 @@ async def lifespan(app: FastAPI):
         print(f"Please ensure URDF file exists at: {settings.urdf_path}")
     
     # Initialize URDF parser
-    state.urdf_parser = URDFParser(settings.urdf_path)
+    state.urdf_parser = URDFParser(settings.urdf_path, cache_dir=settings.cache_dir)
     if not state.urdf_parser.parse():
         raise RuntimeError("Failed to parse URDF file")
-    print(f"Loaded URDF: {state.urdf_parser.robot_name}")
+    source = "cache" if state.urdf_parser.loaded_from_cache else "XML"
+    print(f"Loaded URDF: {state.urdf_parser.robot_name} (from {source})")
+    state.kinematics = ForwardKinematics(state.urdf_parser)
+    state.ik_solver = InverseKinematics(state.urdf_parser, fk=state.kinematics, seed=0)
+    state.dynamics = InverseDynamics(state.urdf_parser, fk=state.kinematics)
     
-    # Initialize simulation
+    # Workspace map, sampled once per URDF and shared memory-mapped afterwards
+    state.reachability = ReachabilityMap(
+        state.ik_solver,
+        state.urdf_parser.content_hash,
+        cache_dir=settings.cache_dir,
+        voxel_size=settings.reachability_voxel_size,
+        num_samples=settings.reachability_samples
+    ).build()
+    state.ik_solver.reachability = state.reachability
+    source = "cache" if state.reachability.loaded_from_cache else "sampling"
+    print(f"Loaded reachability map {state.reachability.shape} (from {source})")
+    
+    # Self-collision hierarchies over the URDF collision meshes
+    if settings.mesh_dir.exists():
+        state.collision = SelfCollisionChecker(
+            state.urdf_parser,
+            settings.mesh_dir,
+            fk=state.kinematics,
+            cache_dir=settings.cache_dir,
+            leaf_radius=settings.collision_leaf_radius
+        )
+        source = "cache" if state.collision.loaded_from_cache else "meshes"
+        print(f"Loaded collision model for {len(state.collision.link_names)} links (from {source})")
+        state.collision_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="collision")
+    else:
+        print(f"Collision meshes not found at {settings.mesh_dir}; self-collision checks disabled")
+    
+    # Initialize simulation; every time-dependent component shares one clock
+    state.clock = create_clock(settings.clock_mode, settings.clock_speed)
     if settings.use_real_data:
         print(f"Using Real Data Simulator from {settings.real_data_path}")
         state.simulator = RealDataSimulator(state.urdf_parser, settings.real_data_path, settings.simulation_frequency)
     else:
         print("Using Synthetic Physics Simulator")
-        state.simulator = PhysicsSimulator(state.urdf_parser, settings.simulation_frequency)
+        state.simulator = PhysicsSimulator(state.urdf_parser, settings.simulation_frequency, clock=state.clock)
         
     state.sensor_gen = SensorGenerator(state.simulator)
-    state.rom = ReducedOrderModel(settings.rom_reduction_factor)
-    print("Simulation initialized")
+    if settings.fleet_size > 0:
+        # Fleet machines are numbered after the primary machine (armpi_fpv_01)
+        fleet_ids = [f"armpi_fpv_{i + 2:02d}" for i in range(settings.fleet_size)]
+        state.fleet = FleetSimulator(state.urdf_parser, settings.fleet_size,
+                                     settings.simulation_frequency, machine_ids=fleet_ids, clock=state.clock)
+        print(f"Fleet simulator initialized with {settings.fleet_size} machines")
+    state.rom = ReducedOrderModel(settings.rom_reduction_factor, joint_names=state.simulator.joint_names)
+    state.pipeline = create_pipeline()
+    state.scheduler = FixedRateScheduler(settings.simulation_frequency, settings.schedule_policy,
+                                         max_catch_up=settings.max_catch_up_ticks, clock=state.clock)
+    print(f"Simulation initialized ({settings.simulation_frequency} Hz physics, "
+          f"{state.pipeline.stages['inference'].rate_hz} Hz inference, {settings.clock_mode} clock)")
     
     # Initialize ML components
-    state.feature_eng = FeatureEngineer(window_size=10)
+    state.feature_eng = FeatureEngineer(window_size=settings.feature_window_size)
     state.anomaly_detector = AnomalyDetector()
     state.failure_predictor = FailurePredictor()
     state.rul_estimator = RULEstimator()
+    state.inference = InferenceEngine(state.feature_eng, state.anomaly_detector,
+                                      state.failure_predictor, state.rul_estimator)
     print("ML components initialized")
-    
+
+    # Load the scaler fitted alongside the pre-trained models
+    try:
+        state.feature_eng.load()
+    except FileNotFoundError:
+        print("No fitted feature scaler found")
+
     # Try to load pre-trained models
     try:
         state.anomaly_detector.load()
@@ -117,26 +201,10 @@ async def lifespan(app: FastAPI):
             sensor_data = state.sensor_gen.generate()
             
             # Extract features
-            # Use same feature set as get_machine_health
+            # Use same feature set as the simulation frames
             joint_states = state.simulator.get_joint_states()
-            num_joints = len(joint_states)
-            if num_joints > 0:
-                avg_temp = sum(sensor_data.joint_temperatures.values()) / len(sensor_data.joint_temperatures)
-                avg_velocity = sum(abs(js.velocity) for js in joint_states) / num_joints
-                avg_torque = sum(abs(js.torque) for js in joint_states) / num_joints
-            else:
-                avg_temp = 25.0
-                avg_velocity = 0.0
-                avg_torque = 0.0
-
-            current_features = {
-                'temperature': avg_temp,
-                'vibration': sensor_data.overall_vibration,
-                'power': sensor_data.power_consumption,
-                'velocity': avg_velocity,
-                'torque': avg_torque,
-            }
-            
+            current_features = aggregate_signals(joint_states, sensor_data)
+
             # Add to feature engineer to update buffers
             state.feature_eng.add_sample(current_features)
             features = state.feature_eng.extract_features(current_features)
@@ -155,8 +223,7 @@ async def lifespan(app: FastAPI):
             df_train = df_train.fillna(0)
             
             # Fit scaler
-            state.feature_eng.scaler.fit(df_train)
-            state.feature_eng.is_fitted = True
+            state.feature_eng.fit(df_train)
             
             # Transform
             X_train_scaled = state.feature_eng.scaler.transform(df_train)
@@ -173,13 +240,22 @@ async def lifespan(app: FastAPI):
             state.anomaly_detector.save()
             state.failure_predictor.save()
             state.rul_estimator.save()
+            state.feature_eng.save()
             print("Trained and saved models with synthetic data")
         else:
             print("Failed to generate training data")
     
-    # Start simulation loop
+    # Concurrent /predict requests are scored together. The worker scores its
+    # one row per inference window directly, inside the tick.
+    state.batcher = MicroBatcher(state.inference, settings.inference_batch_window_ms,
+                                 settings.inference_max_batch_size)
+    state.batcher.start()
+    
+    # Start simulation loop on its own thread; frames come back through the bus
+    state.frame_bus.attach(asyncio.get_running_loop())
     state.is_running = True
-    state.simulation_task = asyncio.create_task(simulation_loop())
+    state.worker = SimulationWorker(simulation_loop)
+    state.worker.start()
     
     # Log startup
     state.system_logs.append(Log(
@@ -196,54 +272,325 @@ async def lifespan(app: FastAPI):
     # Shutdown
     print("Shutting down...")
     state.is_running = False
-    if state.simulation_task:
-        state.simulation_task.cancel()
-        try:
-            await state.simulation_task
-        except asyncio.CancelledError:
-            pass
+    if state.worker:
+        state.worker.stop()
+    if state.batcher:
+        state.batcher.stop()
+    if state.collision_executor:
+        state.collision_executor.shutdown(wait=True)
+    if isinstance(state.simulator, RealDataSimulator):
+        state.simulator.close()
+
+
+def create_pipeline() -> MultiRatePipeline:
+    """Stage rates of the simulation loop from settings."""
+    base = settings.simulation_frequency
+    return MultiRatePipeline(base, {
+        "physics": base,
+        "sensors": base,
+        "rom": base,
+        "inference": base / settings.rom_reduction_factor,
+        "stream": settings.stream_frequency,
+        "logging": settings.log_frequency,
+        "collision": settings.collision_frequency,
+    })
+
+
+def aggregate_signals(joint_states, sensor_data) -> dict:
+    """Aggregate joint states and sensor readings into the ML input signals."""
+    num_joints = len(joint_states)
+    if num_joints > 0 and len(sensor_data.temperatures):
+        avg_temp = float(sensor_data.temperatures.mean())
+        avg_velocity = sum(abs(js.velocity) for js in joint_states) / num_joints
+        avg_torque = sum(abs(js.torque) for js in joint_states) / num_joints
+        avg_angle = sum(abs(js.angle) for js in joint_states) / num_joints
+    else:
+        avg_temp = settings.base_temperature
+        avg_velocity = 0.0
+        avg_torque = 0.0
+        avg_angle = 0.0
+
+    # Keys match the feature set used by train_models.py
+    return {
+        'temperature': avg_temp,
+        'vibration': sensor_data.overall_vibration,
+        'power': sensor_data.power_consumption,
+        'velocity': avg_velocity,
+        'torque': avg_torque,
+        'angle': avg_angle,
+    }
+
+
+def run_inference(current_features: dict) -> dict:
+    """Update the rolling feature buffers and score all ML models."""
+    state.feature_eng.add_sample(current_features)
+    features = state.feature_eng.extract_features(current_features)
+
+    try:
+        return state.inference.predict_one(features)
+    except Exception as e:
+        print(f"Prediction error: {e}")
+        # Default predictions if scoring fails
+        return dict(DEFAULT_PREDICTIONS)
+
+
+def build_alerts(predictions: dict, temperature_core: float, vibration_level: float) -> list:
+    """Generate stream alerts from predictions and sensor thresholds."""
+    anomaly_score = predictions['anomaly_score']
+    failure_prob = predictions['failure_probability']
+    rul_hours = predictions['rul_hours']
+
+    alerts = []
+    if anomaly_score > 0.7:
+        alerts.append({"type": "critical", "title": "Critical Anomaly", "message": f"Critical anomaly score: {anomaly_score:.2f}"})
+    elif anomaly_score > 0.4:
+        alerts.append({"type": "warning", "title": "Potential Anomaly", "message": f"Elevated anomaly score: {anomaly_score:.2f}"})
+
+    if failure_prob > 0.7:
+        alerts.append({"type": "critical", "title": "Failure Imminent", "message": f"Failure probability: {failure_prob:.2f}"})
+    elif failure_prob > 0.4:
+        alerts.append({"type": "warning", "title": "Failure Risk", "message": f"Elevated failure risk: {failure_prob:.2f}"})
+
+    if rul_hours < 50:
+        alerts.append({"type": "critical", "title": "Critical RUL", "message": f"Remaining Useful Life critical: {rul_hours:.1f} hours"})
+    elif rul_hours < 100:
+        alerts.append({"type": "warning", "title": "Low RUL", "message": f"Remaining Useful Life low: {rul_hours:.1f} hours"})
+
+    # Check sensor thresholds
+    if temperature_core > 80:
+        alerts.append({"type": "critical", "title": "Overheating", "message": f"Core temperature critical: {temperature_core:.1f}°C"})
+    elif temperature_core > 60:
+        alerts.append({"type": "warning", "title": "High Temperature", "message": f"Core temperature high: {temperature_core:.1f}°C"})
+
+    if vibration_level > 3.0:
+        alerts.append({"type": "critical", "title": "High Vibration", "message": f"Vibration level critical: {vibration_level:.2f}g"})
+
+    return alerts
+
+
+def log_alerts(alerts: list, machine_id: str, current_time: float):
+    """Log alerts to system logs (with deduplication)."""
+    for alert in alerts:
+        # Create a unique key for the alert
+        alert_key = f"{alert['title']}:{alert['message']}"
+
+        # Only log if it hasn't been logged in the last 10 seconds
+        last_logged = state.last_alert_log_time.get(alert_key, 0)
+        if current_time - last_logged > 10.0:
+            state.system_logs.append(Log(
+                id=len(state.system_logs) + 1,
+                timestamp=current_time * 1000,
+                event=f"{alert['title']}: {alert['message']}",
+                type="error" if alert['type'] == 'critical' else "warning",
+                user="System",
+                machine_id=machine_id
+            ))
+            state.last_alert_log_time[alert_key] = current_time
+
+
+def reduced_inference(sensor_data) -> dict:
+    """Score the models on the ROM's reduced (window-averaged) joint state."""
+    state.latest_predictions = run_inference(aggregate_signals(state.rom.get_reduced_state(), sensor_data))
+    return state.latest_predictions
+
+
+def build_frame(sensor_data=None) -> Frame:
+    """
+    Compute one frame from the current simulator and sensor state.
+
+    Args:
+        sensor_data: Latest sensor reading (default: generate a new one)
+    """
+    joint_states = state.simulator.get_joint_states()
+    if sensor_data is None:
+        sensor_data = state.sensor_gen.generate()
+    # Scheduled tick time inside the loop, so frame timestamps stay uniform under load
+    scheduler = state.scheduler
+    timestamp = scheduler.timestamp(scheduler.ticks - 1) if scheduler and scheduler.ticks else time.time()
+
+    # Format data for stream clients (flat structure)
+    payload = {
+        "timestamp": timestamp,
+        "machine_id": "armpi_fpv_01",
+        "status": "running" if state.is_running else "stopped",
+    }
+
+    temperatures = sensor_data.temperatures.tolist()
+    for i, (js, temperature) in enumerate(zip(joint_states, temperatures), 1):
+        payload[f"joint_{i}_angle"] = js.angle * (180 / math.pi)  # Degrees
+        payload[f"joint_{i}_velocity"] = js.velocity
+        payload[f"joint_{i}_torque"] = js.torque
+        payload[f"joint_{i}_temperature"] = temperature
+
+    # Add aggregate metrics
+    current_features = aggregate_signals(joint_states, sensor_data)
+    payload["temperature_core"] = current_features['temperature']
+    payload["vibration_level"] = sensor_data.overall_vibration
+    payload["power_consumption"] = sensor_data.power_consumption
+
+    # Predictions come from the reduced-rate inference stage; score the
+    # current state only if that stage has not run yet
+    predictions = state.latest_predictions
+    if predictions is None:
+        predictions = state.latest_predictions = run_inference(current_features)
+    payload.update(predictions)
+
+    alerts = build_alerts(predictions, payload["temperature_core"], payload["vibration_level"])
+    collision_pairs = state.collisions.get(payload["machine_id"], [])
+    payload["self_collision"] = bool(collision_pairs)
+    if collision_pairs:
+        names = ", ".join("/".join(pair) for pair in collision_pairs)
+        alerts.append({"type": "warning", "title": "Self-Collision", "message": f"Links in contact: {names}"})
+    payload["alerts"] = alerts
+
+    return Frame(
+        seq=state.frame_bus.next_seq(),
+        timestamp=timestamp,
+        joint_states=joint_states,
+        sensor_data=sensor_data,
+        predictions=predictions,
+        alerts=alerts,
+        payload=payload
+    )
+
+
+def schedule_collision_check():
+    """
+    Snapshot every machine's configuration and check it on the collision thread.
+
+    A fleet-wide check takes tens of milliseconds, so it runs outside the tick
+    lock; a check that is due while the previous one is still running is skipped.
+    """
+    pending = state.collision_pending
+    if pending is not None and not pending.done():
+        return
+    machine_ids = ["armpi_fpv_01"]
+    angles = [state.simulator.angles[None, :]]
+    if state.fleet:
+        machine_ids += state.fleet.machine_ids
+        angles.append(state.fleet.angles)
+    state.collision_pending = state.collision_executor.submit(
+        check_collisions, machine_ids, np.concatenate(angles), state.collision_generation)
+
+
+def check_collisions(machine_ids: list, angles: np.ndarray, generation: int):
+    """Check a snapshot of every machine's configuration in one batch."""
+    try:
+        with state.pipeline.measure("collision"):
+            hits = state.collision.check(angles)
+    except Exception as e:
+        print(f"Error in collision check: {e}")
+        return
+    names = state.collision.pair_names
+    collisions = {
+        machine_id: [list(names[i]) for i in np.flatnonzero(row)]
+        for machine_id, row in zip(machine_ids, hits)
+    }
+    # A reset while checking makes this snapshot stale
+    if generation == state.collision_generation:
+        state.collisions = collisions
+
+
+def current_frame() -> Frame:
+    """Get the latest published frame, computing one if none exists yet."""
+    if not state.simulator or not state.sensor_gen:
+        raise HTTPException(status_code=503, detail="Simulator not initialized")
+
+    frame = state.frame_bus.latest
+    if frame is None:
+        with state.tick_lock:
+            frame = build_frame()
+        state.frame_bus.publish(frame)
+    return frame
+
+
+def run_tick():
+    """
+    Run one tick of the multi-rate pipeline.
+
+    Physics, sensors and the ROM run every tick; inference runs once per ROM
+    window on the reduced state; frames and sensor logs are produced at their
+    own configured rates.
+    """
+    pipeline = state.pipeline
+    pipeline.advance()
+    sim = state.simulator
+
+    with pipeline.measure("physics"):
+        sim.step()
+        if state.fleet:
+            state.fleet.step()
+
+    with pipeline.measure("sensors"):
+        sensor_data = state.sensor_gen.generate()
+
+    with pipeline.measure("rom"):
+        state.rom.add_arrays(sim.angles, sim.velocities, sim.accelerations, sim.torques)
+
+    if pipeline.due("inference"):
+        with pipeline.measure("inference"):
+            reduced_inference(sensor_data)
+
+    if state.collision and pipeline.due("collision"):
+        schedule_collision_check()
+
+    if pipeline.due("stream"):
+        # Alerts and the stream payload, computed once for all clients
+        with pipeline.measure("stream"):
+            frame = build_frame(sensor_data)
+            log_alerts(frame.alerts, frame.payload["machine_id"], frame.timestamp)
+            state.frame_bus.publish_threadsafe(frame)
+
+    if pipeline.due("logging"):
+        with pipeline.measure("logging"):
+            log_sensor_data(sensor_data)
 
 
 async def simulation_loop():
-    """Background task for running simulation."""
+    """
+    Tick loop run by the simulation worker thread.
+
+    Ticks follow the scheduler's absolute deadlines. Each tick holds the tick
+    lock, so API commands that mutate the simulation wait for a tick boundary.
+    """
+    scheduler = state.scheduler
+    scheduler.reset()
     while state.is_running:
         try:
-            # Step simulation
-            state.simulator.step()
-            
-            # Generate sensor data
-            sensor_data = state.sensor_gen.generate()
-            
-            # Log sensor data
-            log_entry = {
-                'timestamp': sensor_data.timestamp,
-                'overall_vibration': sensor_data.overall_vibration,
-                'power_consumption': sensor_data.power_consumption,
-            }
-            
-            # Add joint-specific data
-            joint_states = state.simulator.get_joint_states()
-            for i, js in enumerate(joint_states):
-                log_entry[f'joint_{i}_angle'] = js.angle
-                log_entry[f'joint_{i}_velocity'] = js.velocity
-                log_entry[f'joint_{i}_torque'] = js.torque
-                log_entry[f'joint_{i}_temperature'] = sensor_data.joint_temperatures.get(js.name, 25.0)
-                log_entry[f'joint_{i}_vibration'] = sensor_data.joint_vibrations.get(js.name, 0.0)
-            
-            state.sensor_logs.append(log_entry)
-            
-            # Keep only last 10000 logs
-            if len(state.sensor_logs) > 10000:
-                state.sensor_logs = state.sensor_logs[-10000:]
-            
-            # Sleep to match simulation frequency
-            await asyncio.sleep(1.0 / settings.simulation_frequency)
-            
+            await scheduler.wait()
+            with state.tick_lock:
+                run_tick()
         except Exception as e:
             print(f"Error in simulation loop: {e}")
             await asyncio.sleep(1.0)
 
 
+def log_sensor_data(sensor_data):
+    """Append the current joint and sensor readings to the sensor log."""
+    sim = state.simulator
+    log_entry = {
+        'timestamp': sensor_data.timestamp,
+        'overall_vibration': sensor_data.overall_vibration,
+        'power_consumption': sensor_data.power_consumption,
+    }
+
+    # Add joint-specific data
+    readings = zip(sim.angles.tolist(), sim.velocities.tolist(), sim.torques.tolist(),
+                   sensor_data.temperatures.tolist(), sensor_data.vibrations.tolist())
+    for i, (angle, velocity, torque, temperature, vibration) in enumerate(readings):
+        log_entry[f'joint_{i}_angle'] = angle
+        log_entry[f'joint_{i}_velocity'] = velocity
+        log_entry[f'joint_{i}_torque'] = torque
+        log_entry[f'joint_{i}_temperature'] = temperature
+        log_entry[f'joint_{i}_vibration'] = vibration
+
+    state.sensor_logs.append(log_entry)
+
+    # Keep only last 10000 logs
+    if len(state.sensor_logs) > 10000:
+        state.sensor_logs = state.sensor_logs[-10000:]
+
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.app_name,
@@ -289,6 +636,16 @@ async def root():
             "/machine/state",
             "/machine/health",
             "/machine/control",
+            "/fleet/state",
+            "/pipeline/stats",
+            "/kinematics/poses",
+            "/kinematics/ik",
+            "/kinematics/reachability",
+            "/collision/status",
+            "/collision/check",
+            "/collision/replay",
+            "/dynamics/torques",
+            "/dynamics/replay",
             "/logs/export",
             "/ws/machines/{machine_id}"
         ]
@@ -298,12 +655,65 @@ async def root():
 @app.get("/machines")
 async def list_machines():
     """List available machines (frontend compatibility)."""
-    return [
+    machines = [
         {
             "id": "armpi_fpv_01",
             "type": "robotic_arm"
         }
     ]
+    if state.fleet:
+        machines.extend(
+            {"id": machine_id, "type": "robotic_arm", "fleet": True}
+            for machine_id in state.fleet.machine_ids
+        )
+    return machines
+
+
+@app.get("/fleet/state")
+async def get_fleet_state():
+    """Get joint states of every fleet machine as (machines x joints) arrays."""
+    if not state.fleet:
+        raise HTTPException(status_code=404, detail="Fleet simulation not enabled")
+    return state.fleet.get_state_dict()
+
+
+@app.get("/fleet/machines/{machine_id}/state")
+async def get_fleet_machine_state(machine_id: str):
+    """Get joint states of a single fleet machine."""
+    if not state.fleet:
+        raise HTTPException(status_code=404, detail="Fleet simulation not enabled")
+    try:
+        joint_states = state.fleet.get_joint_states(machine_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown machine: {machine_id}")
+    return {
+        "machine_id": machine_id,
+        "timestamp": time.time(),
+        "uptime_seconds": state.fleet.sim_time,
+        "joints": [
+            {
+                "name": js.name,
+                "angle": js.angle,
+                "velocity": js.velocity,
+                "torque": js.torque,
+            }
+            for js in joint_states
+        ]
+    }
+
+
+@app.get("/pipeline/stats")
+async def get_pipeline_stats():
+    """Get per-stage rates and timings of the simulation pipeline, the CPU saved by decimation, and tick timing."""
+    if not state.pipeline:
+        raise HTTPException(status_code=503, detail="Simulator not initialized")
+    report = state.pipeline.report()
+    report["scheduler"] = state.scheduler.report()
+    if state.inference:
+        report["models"] = state.inference.report()
+    if state.batcher:
+        report["batcher"] = state.batcher.report()
+    return report
 
 
 @app.get("/machine/meta", response_model=MachineMetadata)
@@ -326,11 +736,9 @@ async def get_machine_metadata():
 @app.get("/machine/state")
 async def get_machine_state():
     """Get current machine state with both structured and flat formats."""
-    if not state.simulator:
-        raise HTTPException(status_code=503, detail="Simulator not initialized")
-    
-    joint_states = state.simulator.get_joint_states()
-    sensor_data = state.sensor_gen.generate()
+    frame = current_frame()
+    joint_states = frame.joint_states
+    sensor_data = frame.sensor_data
     
     # Structured format (original)
     structured_joints = [
@@ -344,18 +752,11 @@ async def get_machine_state():
         for js in joint_states
     ]
     
-    # Flat format for frontend compatibility
-    flat_data = {}
-    for i, js in enumerate(joint_states, 1):
-        flat_data[f"joint_{i}_angle"] = js.angle * (180 / math.pi)  # Convert to degrees
-        flat_data[f"joint_{i}_velocity"] = js.velocity
-        flat_data[f"joint_{i}_torque"] = js.torque
-        flat_data[f"joint_{i}_temperature"] = sensor_data.joint_temperatures.get(js.name, 25.0)
-    
-    # Add aggregate metrics
-    flat_data["temperature_core"] = sum(sensor_data.joint_temperatures.values()) / len(sensor_data.joint_temperatures)
-    flat_data["vibration_level"] = sensor_data.overall_vibration
-    flat_data["power_consumption"] = sensor_data.power_consumption
+    # Flat format for frontend compatibility (already computed by the frame)
+    flat_data = {
+        key: value for key, value in frame.payload.items()
+        if key.startswith("joint_") or key in ("temperature_core", "vibration_level", "power_consumption")
+    }
     
     return {
         "machine_id": "armpi_fpv_01",
@@ -372,53 +773,13 @@ async def get_machine_state():
 @app.get("/machine/health", response_model=HealthPrediction)
 async def get_machine_health():
     """Get health predictions."""
-    if not state.simulator:
-        raise HTTPException(status_code=503, detail="Simulator not initialized")
-    
-    # Get current sensor data
-    sensor_data = state.sensor_gen.generate()
-    joint_states = state.simulator.get_joint_states()
-    
-    # Prepare features
-    num_joints = len(joint_states)
-    if num_joints > 0:
-        avg_temp = sum(sensor_data.joint_temperatures.values()) / len(sensor_data.joint_temperatures)
-        avg_velocity = sum(abs(js.velocity) for js in joint_states) / num_joints
-        avg_torque = sum(abs(js.torque) for js in joint_states) / num_joints
-    else:
-        avg_temp = 25.0
-        avg_velocity = 0.0
-        avg_torque = 0.0
-
-    current_features = {
-        'temperature': avg_temp,
-        'vibration': sensor_data.overall_vibration,
-        'power': sensor_data.power_consumption,
-        'velocity': avg_velocity,
-        'torque': avg_torque,
-    }
-    
-    # Add to feature engineer
-    state.feature_eng.add_sample(current_features)
-    features = state.feature_eng.extract_features(current_features)
-    X = state.feature_eng.prepare_for_ml(features)
+    frame = current_frame()
+    joint_states = frame.joint_states
+    sensor_data = frame.sensor_data
     
-    # Default predictions if models not trained
-    anomaly_score = 0.0
-    failure_prob = 0.0
-    rul_hours = 1000.0
-    
-    try:
-        if state.anomaly_detector.is_trained:
-            anomaly_score = state.anomaly_detector.predict(X)
-        
-        if state.failure_predictor.is_trained:
-            failure_prob = state.failure_predictor.predict_proba(X)
-        
-        if state.rul_estimator.is_trained:
-            rul_hours = state.rul_estimator.predict(X)
-    except Exception as e:
-        print(f"Prediction error: {e}")
+    anomaly_score = frame.predictions['anomaly_score']
+    failure_prob = frame.predictions['failure_probability']
+    rul_hours = frame.predictions['rul_hours']
     
     # Determine health status
     if failure_prob > 0.7 or rul_hours < 50:
@@ -476,7 +837,7 @@ async def control_machine(command: ControlCommand):
     if command.command == "start":
         if not state.is_running:
             state.is_running = True
-            state.simulation_task = asyncio.create_task(simulation_loop())
+            state.worker.start()
             success = True
             message = "Simulation started"
         else:
@@ -486,8 +847,8 @@ async def control_machine(command: ControlCommand):
     elif command.command == "stop":
         if state.is_running:
             state.is_running = False
-            if state.simulation_task:
-                state.simulation_task.cancel()
+            # Joining the worker thread must not block the event loop
+            await asyncio.to_thread(state.worker.stop)
             success = True
             message = "Simulation stopped"
         else:
@@ -495,18 +856,42 @@ async def control_machine(command: ControlCommand):
             success = True
     
     elif command.command == "reset":
-        state.simulator.reset()
-        state.sensor_gen.reset()
-        state.sensor_logs.clear()
+        with state.tick_lock:
+            state.simulator.reset()
+            if state.fleet:
+                state.fleet.reset()
+            state.sensor_gen.reset()
+            state.rom.reset()
+            state.pipeline.reset()
+            state.scheduler.reset()
+            state.latest_predictions = None
+            state.collision_generation += 1
+            state.collisions = {}
+            state.sensor_logs.clear()
+            # Drop the pre-reset frame; the next read or tick builds a fresh one
+            state.frame_bus.reset()
         success = True
         message = "Simulation reset"
     
     elif command.command == "inject_fault":
         fault_type = command.parameters.get("type", "temperature") if command.parameters else "temperature"
         severity = command.parameters.get("severity", 0.5) if command.parameters else 0.5
-        state.sensor_gen.inject_fault(fault_type, severity)
+        machine_id = command.parameters.get("machine_id") if command.parameters else None
+        if machine_id and state.fleet and machine_id in state.fleet.machine_ids:
+            try:
+                with state.tick_lock:
+                    state.fleet.inject_fault(machine_id, fault_type, severity)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            message = f"Injected {fault_type} fault with severity {severity} on {machine_id}"
+        else:
+            try:
+                with state.tick_lock:
+                    state.sensor_gen.inject_fault(fault_type, severity)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            message = f"Injected {fault_type} fault with severity {severity}"
         success = True
-        message = f"Injected {fault_type} fault with severity {severity}"
     
     else:
         raise HTTPException(status_code=400, detail=f"Unknown command: {command.command}")
@@ -571,10 +956,303 @@ async def export_logs(start_time: float = None, end_time: float = None):
     )
 
 
+def joint_angle_history(source: str, start_time: float = None, end_time: float = None):
+    """
+    Timestamps and joint angles (radians) of the logged or replayed trajectory.
+
+    Args:
+        source: 'logs' for the sensor log, 'replay' for the whole replay recording
+        start_time: Optional start of the time range (seconds)
+        end_time: Optional end of the time range (seconds)
+
+    Returns:
+        (timestamps (n,), angles (n, joints))
+    """
+    num_joints = len(state.simulator.joint_names)
+    lower = -np.inf if start_time is None else start_time
+    upper = np.inf if end_time is None else end_time
+
+    if source == "logs":
+        logs = [log for log in state.sensor_logs if lower <= log['timestamp'] <= upper]
+        timestamps = np.array([log['timestamp'] for log in logs], dtype=np.float64)
+        angles = np.array([[log[f'joint_{i}_angle'] for i in range(num_joints)] for log in logs],
+                          dtype=np.float64).reshape(-1, num_joints)
+        return timestamps, angles
+
+    if source == "replay":
+        timestamps, angles, _, _ = replay_trajectory(start_time, end_time)
+        return timestamps, angles
+
+    raise HTTPException(status_code=400, detail=f"Unknown source: {source}")
+
+
+def replay_trajectory(start_time: float = None, end_time: float = None):
+    """
+    Timestamps, angles, velocities and accelerations of the replay recording.
+
+    Streamed and memory-mapped recordings are read block by block, keeping
+    only rows inside the time range.
+    """
+    if not isinstance(state.simulator, RealDataSimulator):
+        raise HTTPException(status_code=400, detail="No replay recording loaded")
+    lower = -np.inf if start_time is None else start_time
+    upper = np.inf if end_time is None else end_time
+
+    blocks = []
+    for start, (angles, velocities, accelerations, _, timestamps) in state.simulator.iter_compiled():
+        if timestamps is None:
+            timestamps = (start + np.arange(angles.shape[0])) * state.simulator.dt
+        mask = (timestamps >= lower) & (timestamps <= upper)
+        blocks.append([np.asarray(array)[mask] for array in (timestamps, angles, velocities, accelerations)])
+    if not blocks:
+        num_joints = len(state.simulator.joint_names)
+        return np.zeros(0), np.zeros((0, num_joints)), np.zeros((0, num_joints)), np.zeros((0, num_joints))
+    return tuple(np.concatenate(arrays) for arrays in zip(*blocks))
+
+
+@app.get("/kinematics/poses")
+def get_link_poses(start_time: float = None, end_time: float = None, link: str = None,
+                   source: str = "logs", max_points: int = 10000):
+    """Get world poses of a link (default: end effector) over a time range of the trajectory."""
+    if not state.kinematics or not state.simulator:
+        raise HTTPException(status_code=503, detail="Simulator not initialized")
+    link = link or state.kinematics.end_effector
+    if link not in state.kinematics.link_index:
+        raise HTTPException(status_code=404, detail=f"Unknown link: {link}")
+
+    timestamps, angles = joint_angle_history(source, start_time, end_time)
+    if len(timestamps) == 0:
+        raise HTTPException(status_code=404, detail="No data in specified time range")
+
+    # Evenly thin long ranges to at most max_points poses
+    stride = max(1, math.ceil(len(timestamps) / max(1, max_points)))
+    timestamps = timestamps[::stride]
+    poses = state.kinematics.link_poses(angles[::stride], [link])[:, 0]
+
+    return {
+        "link": link,
+        "source": source,
+        "timestamps": timestamps.tolist(),
+        "positions": poses[:, :3, 3].tolist(),  # meters, base frame
+        "rotations": poses[:, :3, :3].tolist(),
+    }
+
+
+@app.post("/kinematics/ik", response_model=IKResponse)
+def solve_inverse_kinematics(request: IKRequest):
+    """Solve joint angles reaching a list of end-effector targets in one batched call."""
+    if not state.ik_solver:
+        raise HTTPException(status_code=503, detail="Kinematics not initialized")
+
+    targets = np.asarray(request.targets, dtype=np.float64)
+    if targets.ndim != 2 or targets.shape[1] != 3 or len(targets) == 0:
+        raise HTTPException(status_code=400, detail="targets must be a non-empty list of [x, y, z]")
+
+    initial = None
+    if request.initial is not None:
+        initial = np.asarray(request.initial, dtype=np.float64)
+        num_joints = state.ik_solver.fk.num_joints
+        if initial.ndim != 2 or initial.shape[1] != num_joints or len(initial) not in (1, len(targets)):
+            raise HTTPException(
+                status_code=400,
+                detail=f"initial must hold one or {len(targets)} configurations of {num_joints} angles"
+            )
+
+    start = time.perf_counter()
+    solution = state.ik_solver.solve(targets, initial)
+    solve_ms = (time.perf_counter() - start) * 1000
+
+    return IKResponse(
+        joint_names=state.ik_solver.fk.joint_names,
+        angles=solution.angles.tolist(),
+        positions=solution.positions.tolist(),
+        errors=solution.errors.tolist(),
+        converged=solution.converged.tolist(),
+        iterations=solution.iterations,
+        solve_ms=solve_ms
+    )
+
+
+@app.post("/kinematics/reachability", response_model=ReachabilityResponse)
+def query_reachability(request: ReachabilityRequest):
+    """Look up whether targets are reachable and how well-conditioned the arm is there."""
+    if not state.reachability:
+        raise HTTPException(status_code=503, detail="Reachability map not initialized")
+
+    targets = np.asarray(request.targets, dtype=np.float64)
+    if targets.ndim != 2 or targets.shape[1] != 3 or len(targets) == 0:
+        raise HTTPException(status_code=400, detail="targets must be a non-empty list of [x, y, z]")
+
+    result = state.reachability.query(targets)
+    return ReachabilityResponse(
+        reachable=result['reachable'].tolist(),
+        manipulability=result['manipulability'].tolist(),
+        normalized_manipulability=result['normalized_manipulability'].tolist(),
+        voxel_size=state.reachability.voxel_size
+    )
+
+
+@app.get("/collision/status")
+async def get_collision_status():
+    """Colliding link pairs of every machine at the last live check."""
+    if not state.collision:
+        raise HTTPException(status_code=503, detail="Collision model not initialized")
+    return {
+        "machines": state.collisions,
+        "checked_pairs": len(state.collision.pairs),
+        "frequency_hz": state.pipeline.stages["collision"].rate_hz if state.pipeline else None,
+    }
+
+
+@app.post("/collision/check", response_model=CollisionResponse)
+def check_self_collision(request: CollisionRequest):
+    """Check a batch of joint configurations for self-collision."""
+    if not state.collision:
+        raise HTTPException(status_code=503, detail="Collision model not initialized")
+
+    angles = np.asarray(request.angles, dtype=np.float64)
+    num_joints = state.collision.fk.num_joints
+    if angles.ndim != 2 or angles.shape[1] != num_joints or len(angles) == 0:
+        raise HTTPException(status_code=400, detail=f"angles must be a non-empty list of {num_joints} values per row")
+
+    start = time.perf_counter()
+    hits = state.collision.check(angles)
+    check_ms = (time.perf_counter() - start) * 1000
+
+    names = state.collision.pair_names
+    return CollisionResponse(
+        in_collision=hits.any(axis=1).tolist(),
+        pairs=[[list(names[i]) for i in np.flatnonzero(row)] for row in hits],
+        check_ms=check_ms
+    )
+
+
+@app.get("/collision/replay")
+def get_replay_collisions(start_time: float = None, end_time: float = None):
+    """Find the intervals of the replay recording spent in self-collision."""
+    if not state.collision:
+        raise HTTPException(status_code=503, detail="Collision model not initialized")
+
+    timestamps, angles, _, _ = replay_trajectory(start_time, end_time)
+    if len(timestamps) == 0:
+        raise HTTPException(status_code=404, detail="No data in specified time range")
+
+    start = time.perf_counter()
+    intervals = state.collision.flag_trajectory(angles, timestamps)
+    check_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "num_states": len(timestamps),
+        "colliding_states": sum(interval["samples"] for interval in intervals),
+        "check_ms": check_ms,
+        "intervals": intervals,
+    }
+
+
+@app.post("/dynamics/torques", response_model=DynamicsResponse)
+def compute_torques(request: DynamicsRequest):
+    """Compute rigid-body joint torques for a batch of (angle, velocity, acceleration) states."""
+    if not state.dynamics:
+        raise HTTPException(status_code=503, detail="Dynamics not initialized")
+
+    num_joints = state.dynamics.num_joints
+    arrays = [np.asarray(values, dtype=np.float64)
+              for values in (request.angles, request.velocities, request.accelerations)]
+    if any(array.ndim != 2 or array.shape != arrays[0].shape for array in arrays) or arrays[0].shape[1] != num_joints:
+        raise HTTPException(
+            status_code=400,
+            detail=f"angles, velocities and accelerations must be equal-length lists of {num_joints} values"
+        )
+
+    start = time.perf_counter()
+    torques = state.dynamics.torques(*arrays, gravity=request.gravity)
+    compute_ms = (time.perf_counter() - start) * 1000
+
+    return DynamicsResponse(
+        joint_names=state.dynamics.fk.joint_names,
+        torques=torques.tolist(),
+        compute_ms=compute_ms
+    )
+
+
+@app.post("/predict", response_model=FeatureRowResponse)
+async def predict_row(request: FeatureRowRequest):
+    """Score one sample's engineered features; concurrent requests share a batched prediction."""
+    if not state.batcher or not state.feature_eng.is_fitted:
+        raise HTTPException(status_code=503, detail="Models not initialized")
+    # prepare_for_ml zero-fills missing features; reject requests that match none
+    if not any(name in request.features for name in state.feature_eng.feature_names):
+        raise HTTPException(status_code=400, detail="features contains no known feature names")
+    try:
+        predictions = await state.batcher.predict(state.feature_eng.prepare_for_ml(request.features))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return FeatureRowResponse(**predictions)
+
+
+@app.post("/predict/batch", response_model=PredictionResponse)
+def predict_batch(request: PredictionRequest):
+    """Score a recording of sensor readings with all models, with rolling features as in the live stream."""
+    if not state.inference or not state.feature_eng.is_fitted:
+        raise HTTPException(status_code=503, detail="Models not initialized")
+    if not request.readings:
+        raise HTTPException(status_code=400, detail="readings must not be empty")
+
+    data = pd.DataFrame(request.readings).fillna(0.0)
+    start = time.perf_counter()
+    try:
+        predictions = state.inference.predict_frame(data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    compute_ms = (time.perf_counter() - start) * 1000
+
+    return PredictionResponse(
+        anomaly_score=predictions['anomaly_score'].tolist(),
+        failure_probability=predictions['failure_probability'].tolist(),
+        rul_hours=predictions['rul_hours'].tolist(),
+        compute_ms=compute_ms
+    )
+
+
+@app.get("/dynamics/replay")
+def get_replay_torques(start_time: float = None, end_time: float = None, max_points: int = 10000):
+    """Compute joint torques over a time range of the replay recording, with per-joint peak and RMS."""
+    if not state.dynamics:
+        raise HTTPException(status_code=503, detail="Dynamics not initialized")
+
+    timestamps, angles, velocities, accelerations = replay_trajectory(start_time, end_time)
+    if len(timestamps) == 0:
+        raise HTTPException(status_code=404, detail="No data in specified time range")
+
+    start = time.perf_counter()
+    torques = state.dynamics.torques(angles, velocities, accelerations)
+    compute_ms = (time.perf_counter() - start) * 1000
+
+    # Statistics cover every row; the series is evenly thinned to max_points
+    stride = max(1, math.ceil(len(timestamps) / max(1, max_points)))
+    return {
+        "joint_names": state.dynamics.fk.joint_names,
+        "num_states": len(timestamps),
+        "compute_ms": compute_ms,
+        "peak_torque": np.abs(torques).max(axis=0).tolist(),
+        "rms_torque": np.sqrt(np.mean(torques ** 2, axis=0)).tolist(),
+        "timestamps": timestamps[::stride].tolist(),
+        "torques": torques[::stride].tolist(),
+    }
+
+
 @app.websocket("/ws/machines/{machine_id}")
 async def websocket_machine_stream(websocket: WebSocket, machine_id: str):
-    """WebSocket endpoint for real-time machine data streaming."""
+    """
+    WebSocket endpoint for real-time machine data streaming.
+
+    Clients subscribe to the frame bus and receive the frames produced by
+    simulation_loop; they never step the simulation or run inference.
+    """
     await websocket.accept()
+    queue = state.frame_bus.subscribe()
     
     try:
         while True:
@@ -583,129 +1261,8 @@ async def websocket_machine_stream(websocket: WebSocket, machine_id: str):
                 await asyncio.sleep(1)
                 continue
             
-            # Get current state
-            joint_states = state.simulator.get_joint_states()
-            sensor_data = state.sensor_gen.generate()
-            
-
-            # Format data for frontend (flat structure)
-            data = {
-                "timestamp": time.time(),
-                "machine_id": machine_id,
-                "status": "running" if state.is_running else "stopped",
-            }
-
-            # Add joint data in flat format
-            for i, js in enumerate(joint_states, 1):
-                data[f"joint_{i}_angle"] = js.angle * (180 / math.pi)  # Degrees
-                data[f"joint_{i}_velocity"] = js.velocity
-                data[f"joint_{i}_torque"] = js.torque
-                data[f"joint_{i}_temperature"] = sensor_data.joint_temperatures.get(js.name, 25.0)
-
-            # Add aggregate metrics
-            data["temperature_core"] = sum(sensor_data.joint_temperatures.values()) / len(sensor_data.joint_temperatures)
-            data["vibration_level"] = sensor_data.overall_vibration
-            data["power_consumption"] = sensor_data.power_consumption
-
-            # --- Real-time ML inference integration ---
-            # Prepare features for ML models (matching train_models.py keys)
-            # Calculate aggregates
-            avg_velocity = sum(abs(js.velocity) for js in joint_states) / len(joint_states) if joint_states else 0.0
-            avg_torque = sum(abs(js.torque) for js in joint_states) / len(joint_states) if joint_states else 0.0
-            avg_angle = sum(abs(js.angle) for js in joint_states) / len(joint_states) if joint_states else 0.0
-
-            features_for_eng = {
-                "temperature": data["temperature_core"],
-                "vibration": data["vibration_level"],
-                "power": data["power_consumption"],
-                "velocity": avg_velocity,
-                "torque": avg_torque,
-            }
-
-            # Add sample to rolling buffer
-            state.feature_eng.add_sample(features_for_eng)
-            # Extract features for ML
-            ml_features = state.feature_eng.extract_features(features_for_eng)
-
-            # Convert features to numpy array for model input
-            import numpy as np
-            feature_vector = np.array([v for v in ml_features.values()], dtype=np.float32).reshape(1, -1)
-
-            # Run ML models (with error handling)
-            try:
-                anomaly_score = float(state.anomaly_detector.predict(feature_vector))
-            except Exception as e:
-                anomaly_score = 0.0
-            try:
-                failure_prob = float(state.failure_predictor.predict_proba(feature_vector))
-            except Exception as e:
-                failure_prob = 0.0
-            try:
-                rul_hours = float(state.rul_estimator.predict(feature_vector))
-            except Exception as e:
-                rul_hours = 0.0
-
-            data["anomaly_score"] = anomaly_score
-            data["failure_probability"] = failure_prob
-            data["rul_hours"] = rul_hours
-
-            # Generate alerts for WebSocket
-            alerts = []
-            if anomaly_score > 0.7:
-                alerts.append({"type": "critical", "title": "Critical Anomaly", "message": f"Critical anomaly score: {anomaly_score:.2f}"})
-            elif anomaly_score > 0.4:
-                alerts.append({"type": "warning", "title": "Potential Anomaly", "message": f"Elevated anomaly score: {anomaly_score:.2f}"})
-                
-            if failure_prob > 0.7:
-                alerts.append({"type": "critical", "title": "Failure Imminent", "message": f"Failure probability: {failure_prob:.2f}"})
-            elif failure_prob > 0.4:
-                alerts.append({"type": "warning", "title": "Failure Risk", "message": f"Elevated failure risk: {failure_prob:.2f}"})
-                
-            if rul_hours < 50:
-                alerts.append({"type": "critical", "title": "Critical RUL", "message": f"Remaining Useful Life critical: {rul_hours:.1f} hours"})
-            elif rul_hours < 100:
-                alerts.append({"type": "warning", "title": "Low RUL", "message": f"Remaining Useful Life low: {rul_hours:.1f} hours"})
-            
-            # Check sensor thresholds
-            if data["temperature_core"] > 80:
-                alerts.append({"type": "critical", "title": "Overheating", "message": f"Core temperature critical: {data['temperature_core']:.1f}°C"})
-            elif data["temperature_core"] > 60:
-                alerts.append({"type": "warning", "title": "High Temperature", "message": f"Core temperature high: {data['temperature_core']:.1f}°C"})
-                
-            if data["vibration_level"] > 3.0:
-                alerts.append({"type": "critical", "title": "High Vibration", "message": f"Vibration level critical: {data['vibration_level']:.2f}g"})
-
-            data["alerts"] = alerts
-
-            # Log alerts to system logs (with deduplication)
-            current_time = time.time()
-            for alert in alerts:
-                # Create a unique key for the alert
-                alert_key = f"{alert['title']}:{alert['message']}"
-                
-                # Check if we should log this alert (e.g., if it hasn't been logged in the last 10 seconds)
-                last_logged = state.last_alert_log_time.get(alert_key, 0)
-                if current_time - last_logged > 10.0:
-                    # Log it
-                    state.system_logs.append(Log(
-                        id=len(state.system_logs) + 1,
-                        timestamp=current_time * 1000,
-                        event=f"{alert['title']}: {alert['message']}",
-                        type="error" if alert['type'] == 'critical' else "warning",
-                        user="System",
-                        machine_id=machine_id
-                    ))
-                    # Update last logged time
-                    state.last_alert_log_time[alert_key] = current_time
-
-            # Debug: print outgoing data for troubleshooting
-            print('WebSocket send:', data)
-
-            # Send data
-            await websocket.send_json(data)
-            
-            # Stream at 10 Hz
-            await asyncio.sleep(0.1)
+            frame = await queue.get()
+            await websocket.send_text(frame.to_json())
             
     except WebSocketDisconnect:
         print(f"WebSocket client disconnected from {machine_id}")
@@ -715,6 +1272,8 @@ async def websocket_machine_stream(websocket: WebSocket, machine_id: str):
             await websocket.close()
         except:
             pass
+    finally:
+        state.frame_bus.unsubscribe(queue)
 
 
 # SHAP explainability endpoint (must be after app = FastAPI(...))
@@ -759,11 +1318,8 @@ async def explain_failure(features: dict = Body(...)):
             scaled_features = state.feature_eng.prepare_for_ml(ml_features)
             feature_vector = scaled_features.reshape(1, -1)
             
-            # Get feature names from the scaler to ensure correct order matching the vector
-            if hasattr(state.feature_eng.scaler, 'feature_names_in_'):
-                feature_names = list(state.feature_eng.scaler.feature_names_in_)
-            else:
-                feature_names = list(ml_features.keys())
+            # Names in the frozen schema order, matching the vector
+            feature_names = list(state.feature_eng.feature_names)
             
         else:
             # Assume features are already processed or we can't process them
@@ -51,7 +51,19 @@ class AnomalyDetector:
             X: Feature vector (n_features,) or matrix (n_samples, n_features)
             
         Returns:
-            Anomaly score between 0 (normal) and 1 (anomalous)
+            Anomaly score between 0 (normal) and 1 (anomalous) of the first row
+        """
+        return float(self.predict_batch(X)[0])
+    
+    def predict_batch(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predict anomaly scores for every row.
+        
+        Args:
+            X: Feature vector (n_features,) or matrix (n_samples, n_features)
+            
+        Returns:
+            Anomaly scores (n_samples,) between 0 (normal) and 1 (anomalous)
         """
         if not self.is_trained:
             raise ValueError("Model not trained. Call train() first.")
@@ -65,9 +77,9 @@ class AnomalyDetector:
         
         # Convert to 0-1 range (0=normal, 1=anomalous)
         # Normalize using sigmoid-like transformation
-        anomaly_score = 1.0 / (1.0 + np.exp(scores[0]))
+        anomaly_scores = 1.0 / (1.0 + np.exp(scores))
         
-        return float(np.clip(anomaly_score, 0, 1))
+        return np.clip(anomaly_scores, 0, 1)
     
     def save(self, path: Optional[Path] = None):
         """Save trained model to disk."""
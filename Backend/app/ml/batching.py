@@ -0,0 +1,189 @@
+"""Micro-batching of single-row inference requests."""
+import asyncio
+import queue
+import threading
+import time
+import numpy as np
+from concurrent.futures import Future, InvalidStateError
+from typing import Dict, Optional
+
+from .inference import InferenceEngine
+
+
+class MicroBatcher:
+    """
+    Gathers feature rows from concurrent callers into batched predictions.
+
+    The first row to arrive opens a collection window; rows arriving within
+    ``window_ms`` of it, up to ``max_batch_size``, are scored together in one
+    InferenceEngine call and each caller receives its own row's result. The
+    models carry a large fixed cost per call, so batching raises throughput
+    roughly by the batch size while the window bounds the added latency.
+
+    It serves the /predict endpoint. Batches run on a dedicated thread, so
+    callers on any event loop can await results without blocking it. Requests cancelled while queued (e.g. by a
+    timeout) are dropped from their batch.
+    """
+
+    def __init__(self, engine: InferenceEngine, window_ms: float = 2.0,
+                 max_batch_size: int = 256, window: int = 1000):
+        """
+        Initialize batcher.
+
+        Args:
+            engine: Engine scoring each batch
+            window_ms: Longest wait for more rows after the first arrives
+            max_batch_size: Most rows scored in one call
+            window: Recent requests kept for the latency statistics
+        """
+        self.engine = engine
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()  # Orders submissions against stop()
+        self._stats_lock = threading.Lock()  # Counters and latency, read by report()
+
+        self.batches = 0
+        self.rows = 0
+        self._latency = np.zeros(window)  # Submit-to-result seconds per request
+
+    @property
+    def is_alive(self) -> bool:
+        """Whether the batching thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the batching thread."""
+        if self.is_alive:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Score the rows already queued, then stop the thread."""
+        if not self.is_alive:
+            return
+        with self._lock:
+            # No row can be queued behind the sentinel
+            self._stopping.set()
+            self._queue.put(None)
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            self._fail_pending(RuntimeError("Batcher stopped"))
+
+    def _fail_pending(self, error: Exception):
+        """Fail the futures of any rows left in the queue."""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None:
+                self._resolve(item[1], error=error)
+
+    @staticmethod
+    def _resolve(future: Future, result=None, error: Optional[Exception] = None):
+        """Hand a caller its result, unless the caller already gave up on it."""
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            # Cancelled (or already resolved) by the caller
+            pass
+
+    def submit(self, row: np.ndarray) -> Future:
+        """
+        Queue one scaled feature row.
+
+        Args:
+            row: Scaled features (n_features,)
+
+        Returns:
+            Future resolving to the row's anomaly score, failure probability and RUL
+        """
+        # Copy: the row is scored later, and callers may reuse their buffer
+        row = np.array(row, dtype=np.float64).reshape(-1)
+        num_features = len(self.engine.feature_eng.feature_names)
+        if num_features and len(row) != num_features:
+            raise ValueError(f"Expected {num_features} features, got {len(row)}")
+        future = Future()
+        with self._lock:
+            if self._stopping.is_set() or not self.is_alive:
+                raise RuntimeError("Batcher not running. Call start() first.")
+            self._queue.put((row, future, time.perf_counter()))
+        return future
+
+    async def predict(self, row: np.ndarray) -> Dict[str, float]:
+        """Score one scaled feature row as part of the next batch."""
+        return await asyncio.wrap_future(self.submit(row))
+
+    def _run(self):
+        """Thread body: collect a window of rows, score them, resolve the futures."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                if self._queue.empty():
+                    return
+                # Rows are still queued: score them, then stop
+                self._queue.put(None)
+                continue
+
+            batch = [item]
+            deadline = time.perf_counter() + self.window_ms / 1000.0
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    # Stop requested: finish this batch, then drain the rest
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+            self._score(batch)
+
+    def _score(self, batch: list):
+        """Run one batched prediction and hand each caller its row."""
+        # Rows whose callers cancelled are not scored; the rest can no longer be cancelled
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            predictions = self.engine.predict(np.stack([row for row, _, _ in batch]))
+        except Exception as e:
+            for _, future, _ in batch:
+                self._resolve(future, error=e)
+            return
+
+        now = time.perf_counter()
+        with self._stats_lock:
+            for index, (_, _, submitted) in enumerate(batch):
+                self._latency[(self.rows + index) % len(self._latency)] = now - submitted
+            self.batches += 1
+            self.rows += len(batch)
+        for index, (_, future, _) in enumerate(batch):
+            self._resolve(future, {name: float(values[index]) for name, values in predictions.items()})
+
+    def report(self) -> dict:
+        """Batch sizes and request latency (submit to result) over recent requests."""
+        with self._stats_lock:
+            batches, rows = self.batches, self.rows
+            recent = self._latency[:min(rows, len(self._latency))] * 1000
+        return {
+            "window_ms": self.window_ms,
+            "max_batch_size": self.max_batch_size,
+            "batches": batches,
+            "rows": rows,
+            "mean_batch_size": rows / batches if batches else 0.0,
+            "latency_ms": {
+                "mean": float(recent.mean()) if recent.size else 0.0,
+                "p99": float(np.percentile(recent, 99)) if recent.size else 0.0,
+                "max": float(recent.max()) if recent.size else 0.0,
+            },
+        }
@@ -130,7 +130,19 @@ class FailurePredictor:
             X: Feature vector (n_features,) or matrix (n_samples, n_features)
             
         Returns:
-            Failure probability between 0 and 1
+            Failure probability between 0 and 1 of the first row
+        """
+        return float(self.predict_proba_batch(X)[0])
+    
+    def predict_proba_batch(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predict failure probabilities for every row.
+        
+        Args:
+            X: Feature vector (n_features,) or matrix (n_samples, n_features)
+            
+        Returns:
+            Failure probabilities (n_samples,) between 0 and 1
         """
         if not self.is_trained:
             raise ValueError("Model not trained. Call train() first.")
@@ -140,9 +152,7 @@ class FailurePredictor:
             X = X.reshape(1, -1)
         
         # Get probability of failure (class 1)
-        prob = self.model.predict_proba(X)[0, 1]
-        
-        return float(prob)
+        return self.model.predict_proba(X)[:, 1].astype(np.float64)
     
     def predict(self, X: np.ndarray, threshold: float = None) -> bool:
         """
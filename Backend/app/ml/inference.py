@@ -0,0 +1,147 @@
+"""Fused scoring of the anomaly, failure and RUL models."""
+import threading
+import time
+import numpy as np
+from typing import Dict
+
+from .preprocessing import FeatureEngineer
+from .anomaly_detector import AnomalyDetector
+from .failure_predictor import FailurePredictor
+from .rul_estimator import RULEstimator
+
+# Reported for a model that has not been trained or loaded
+DEFAULT_PREDICTIONS = {
+    'anomaly_score': 0.0,
+    'failure_probability': 0.0,
+    'rul_hours': 1000.0,
+}
+
+
+class ModelLatency:
+    """
+    Call count, scored rows and recent per-call latency of one model.
+
+    The simulation worker and the micro-batcher score on different threads,
+    so updates and reports are serialized by a lock.
+    """
+
+    def __init__(self, window: int = 1000):
+        self.calls = 0
+        self.rows = 0
+        self._seconds = np.zeros(window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, rows: int):
+        """Add one batched call."""
+        with self._lock:
+            self._seconds[self.calls % len(self._seconds)] = seconds
+            self.calls += 1
+            self.rows += rows
+
+    def report(self) -> dict:
+        """Latency statistics over the most recent calls."""
+        with self._lock:
+            calls, rows = self.calls, self.rows
+            recent = self._seconds[:min(calls, len(self._seconds))] * 1000
+        return {
+            "calls": calls,
+            "rows": rows,
+            "mean_ms": float(recent.mean()) if recent.size else 0.0,
+            "p99_ms": float(np.percentile(recent, 99)) if recent.size else 0.0,
+            "max_ms": float(recent.max()) if recent.size else 0.0,
+        }
+
+
+class InferenceEngine:
+    """
+    Scores feature rows with all three models in one pass.
+
+    Input is validated and shaped once against the frozen feature schema,
+    then each trained model runs a single batched prediction over every row.
+    Untrained models contribute their default values.
+    """
+
+    MODELS = ('anomaly_score', 'failure_probability', 'rul_hours')
+
+    def __init__(self, feature_eng: FeatureEngineer, anomaly_detector: AnomalyDetector,
+                 failure_predictor: FailurePredictor, rul_estimator: RULEstimator, window: int = 1000):
+        """
+        Initialize engine.
+
+        Args:
+            feature_eng: Fitted feature engineer providing the schema and scaling
+            anomaly_detector: Isolation Forest anomaly model
+            failure_predictor: XGBoost failure classifier
+            rul_estimator: XGBoost RUL regressor
+            window: Recent calls kept for the latency statistics
+        """
+        self.feature_eng = feature_eng
+        self.anomaly_detector = anomaly_detector
+        self.failure_predictor = failure_predictor
+        self.rul_estimator = rul_estimator
+        self.latency = {name: ModelLatency(window) for name in self.MODELS}
+
+    def _validate(self, X: np.ndarray) -> np.ndarray:
+        """Scaled features as a finite (n_samples, n_features) float array."""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.ndim != 2:
+            raise ValueError(f"Expected a feature vector or matrix, got shape {X.shape}")
+        num_features = len(self.feature_eng.feature_names)
+        if num_features and X.shape[1] != num_features:
+            raise ValueError(f"Expected {num_features} features, got {X.shape[1]}")
+        if not np.all(np.isfinite(X)):
+            X = np.nan_to_num(X, nan=0.0, posinf=0.0, neginf=0.0)
+        return X
+
+    def _run(self, name: str, model, predict, X: np.ndarray) -> np.ndarray:
+        """One timed batched call, or the default for an untrained model."""
+        if not model.is_trained:
+            return np.full(len(X), DEFAULT_PREDICTIONS[name])
+        start = time.perf_counter()
+        values = predict(X)
+        self.latency[name].record(time.perf_counter() - start, len(X))
+        return values
+
+    def predict(self, X: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Score scaled feature rows with every model.
+
+        Args:
+            X: Scaled features (n_features,) or (n_samples, n_features)
+
+        Returns:
+            Anomaly score, failure probability and RUL hours, each (n_samples,)
+        """
+        X = self._validate(X)
+        return {
+            'anomaly_score': self._run('anomaly_score', self.anomaly_detector,
+                                       self.anomaly_detector.predict_batch, X),
+            'failure_probability': self._run('failure_probability', self.failure_predictor,
+                                             self.failure_predictor.predict_proba_batch, X),
+            'rul_hours': self._run('rul_hours', self.rul_estimator,
+                                   self.rul_estimator.predict_batch, X),
+        }
+
+    def predict_one(self, features: Dict[str, float]) -> Dict[str, float]:
+        """Scale one engineered feature dict and score it."""
+        predictions = self.predict(self.feature_eng.prepare_for_ml(features))
+        return {name: float(values[0]) for name, values in predictions.items()}
+
+    def predict_frame(self, data) -> Dict[str, np.ndarray]:
+        """
+        Score every row of a recording of raw signals.
+
+        Args:
+            data: DataFrame of sensor readings, one column per signal
+
+        Returns:
+            Predictions per row, with rolling features as the live stream computes them
+        """
+        features = self.feature_eng.extract_features_batch(data)
+        return self.predict(self.feature_eng.prepare_batch(features))
+
+    def report(self) -> dict:
+        """Per-model call counts and latency."""
+        return {name: latency.report() for name, latency in self.latency.items()}
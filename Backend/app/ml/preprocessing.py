@@ -2,14 +2,94 @@
 
 Reuses patterns from predictive-maintenance/main.py.
 """
+import threading
 import numpy as np
 import pandas as pd
 from sklearn.preprocessing import MinMaxScaler
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple, Union
 from collections import deque
 from pathlib import Path
 
 
+class RollingStats:
+    """
+    Mean, standard deviation, min and max over a sliding window in O(1).
+
+    Mean and variance are updated Welford-style as samples enter and leave
+    the window. Min and max come from monotonic deques of (index, value)
+    pairs whose fronts are the window extremes, so each sample is pushed and
+    popped at most once. Mean and variance are recomputed from the window
+    once per window length, which bounds rounding drift on long runs.
+    """
+
+    def __init__(self, window_size: int):
+        """
+        Initialize statistics.
+
+        Args:
+            window_size: Number of most recent samples covered
+        """
+        self.window_size = window_size
+        self.values: deque = deque(maxlen=window_size)
+        self.mean = 0.0
+        self._m2 = 0.0  # Sum of squared deviations from the mean
+        self._count = 0  # Samples seen, used as a monotonic index
+        self._max: deque = deque()
+        self._min: deque = deque()
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def add(self, value: float):
+        """Push a sample, evicting the oldest once the window is full."""
+        value = float(value)
+        n = len(self.values)
+        index = self._count
+        if n == self.window_size:
+            old = self.values[0]
+            old_mean = self.mean
+            self.mean += (value - old) / n
+            self._m2 += (value - old) * (value - self.mean + old - old_mean)
+        else:
+            delta = value - self.mean
+            self.mean += delta / (n + 1)
+            self._m2 += delta * (value - self.mean)
+        self.values.append(value)
+        if n == self.window_size and index % n == 0:
+            # Resync once per window so rounding error cannot build up (amortized O(1))
+            window = np.fromiter(self.values, dtype=np.float64, count=n)
+            self.mean = float(window.mean())
+            self._m2 = float(np.square(window - self.mean).sum())
+
+        self._count += 1
+        expired = index - self.window_size
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((index, value))
+        if self._max[0][0] <= expired:
+            self._max.popleft()
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((index, value))
+        if self._min[0][0] <= expired:
+            self._min.popleft()
+
+    @property
+    def std(self) -> float:
+        """Population standard deviation over the window."""
+        return float(np.sqrt(max(self._m2, 0.0) / len(self.values)))
+
+    @property
+    def max(self) -> float:
+        """Largest value in the window."""
+        return self._max[0][1]
+
+    @property
+    def min(self) -> float:
+        """Smallest value in the window."""
+        return self._min[0][1]
+
+
 class FeatureEngineer:
     """Feature engineering for time-series sensor data."""
     
@@ -24,15 +104,24 @@ class FeatureEngineer:
         self.scaler = MinMaxScaler()
         self.is_fitted = False
         
-        # Rolling buffers for each feature
-        self.buffers: Dict[str, deque] = {}
+        # Feature schema: column order frozen when the scaler is fitted
+        self.feature_names: List[str] = []
+        self._local = threading.local()  # Per-thread preallocated input and output vectors
+        self._scale = np.zeros(0)
+        self._offset = np.zeros(0)
+        
+        # Rolling statistics for each feature; the simulation worker adds
+        # samples while API handlers read them, so both hold the lock
+        self.buffers: Dict[str, RollingStats] = {}
+        self._lock = threading.Lock()
     
     def add_sample(self, features: Dict[str, float]):
-        """Add a sample to rolling buffers."""
-        for key, value in features.items():
-            if key not in self.buffers:
-                self.buffers[key] = deque(maxlen=self.window_size)
-            self.buffers[key].append(value)
+        """Add a sample to the rolling statistics."""
+        with self._lock:
+            for key, value in features.items():
+                if key not in self.buffers:
+                    self.buffers[key] = RollingStats(self.window_size)
+                self.buffers[key].add(value)
     
     def extract_features(self, current_data: Dict[str, float]) -> Dict[str, float]:
         """
@@ -50,15 +139,15 @@ class FeatureEngineer:
         for key, value in current_data.items():
             features[f'{key}_current'] = value
         
-        # Add rolling statistics if buffer is not empty
-        for key, buffer in self.buffers.items():
-            if buffer:
-                values = list(buffer)
-                features[f'{key}_mean'] = np.mean(values)
-                features[f'{key}_std'] = np.std(values)
-                features[f'{key}_max'] = np.max(values)
-                features[f'{key}_min'] = np.min(values)
-                features[f'{key}_range'] = np.max(values) - np.min(values)
+        # Add rolling statistics if buffer is not empty (constant time per signal)
+        with self._lock:
+            for key, stats in self.buffers.items():
+                if stats:
+                    features[f'{key}_mean'] = stats.mean
+                    features[f'{key}_std'] = stats.std
+                    features[f'{key}_max'] = stats.max
+                    features[f'{key}_min'] = stats.min
+                    features[f'{key}_range'] = stats.max - stats.min
         
         # Add derived features (ratios, etc.)
         if 'temperature_current' in features and 'velocity_current' in features:
@@ -71,79 +160,197 @@ class FeatureEngineer:
         
         return features
     
+    def extract_features_batch(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Engineered features for every row of a recording at once.
+        
+        Row i matches extract_features after adding rows 0..i as samples to
+        empty buffers: rolling statistics cover the last window_size rows,
+        growing from one row at the start. Does not touch the buffers.
+        
+        Args:
+            data: Sensor readings, one column per signal
+            
+        Returns:
+            DataFrame of engineered features, columns in streaming order
+        """
+        rolling = data.rolling(self.window_size, min_periods=1)
+        means = rolling.mean()
+        stds = rolling.std(ddof=0)
+        maxes = rolling.max()
+        mins = rolling.min()
+        
+        columns = {}
+        for key in data.columns:
+            columns[f'{key}_current'] = data[key].to_numpy()
+        for key in data.columns:
+            columns[f'{key}_mean'] = means[key].to_numpy()
+            columns[f'{key}_std'] = stds[key].to_numpy()
+            columns[f'{key}_max'] = maxes[key].to_numpy()
+            columns[f'{key}_min'] = mins[key].to_numpy()
+            columns[f'{key}_range'] = columns[f'{key}_max'] - columns[f'{key}_min']
+        
+        epsilon = 1e-10
+        if 'temperature' in data.columns and 'velocity' in data.columns:
+            columns['temp_velocity_ratio'] = columns['temperature_current'] / (np.abs(columns['velocity_current']) + epsilon)
+        if 'torque' in data.columns and 'angle' in data.columns:
+            columns['torque_angle_ratio'] = columns['torque_current'] / (np.abs(columns['angle_current']) + epsilon)
+        
+        return pd.DataFrame(columns, index=data.index)
+    
+    def fit(self, df: pd.DataFrame):
+        """
+        Fit the scaler and freeze the feature schema to the frame's columns.
+        
+        Args:
+            df: Training features, one column per feature
+        """
+        self.scaler.fit(df)
+        self.feature_names = [str(name) for name in df.columns]
+        self.is_fitted = True
+        self._compile()
+    
+    def _compile(self):
+        """Precompute the fused min/max scaling terms."""
+        # MinMaxScaler.transform is X * scale_ + min_
+        self._scale = np.asarray(self.scaler.scale_, dtype=np.float64)
+        self._offset = np.asarray(self.scaler.min_, dtype=np.float64)
+    
     def prepare_for_ml(self, features: Dict[str, float]) -> np.ndarray:
         """
         Prepare features for ML model input.
         
+        Features are written into a preallocated vector in schema order;
+        missing, NaN and infinite values become 0 and unknown names are
+        ignored, so the column order always matches training. Scaling writes
+        into a second preallocated vector, so a call allocates nothing.
+        
         Args:
             features: Dictionary of features
             
         Returns:
-            Numpy array of scaled features
+            Numpy array of scaled features. The array is reused by the next
+            call on the same thread; copy it to keep it.
         """
-        # Convert to DataFrame for consistent ordering
-        df = pd.DataFrame([features])
+        if not self.is_fitted:
+            # First time: fit scaler on this sample
+            df = pd.DataFrame([features]).fillna(0).replace([np.inf, -np.inf], 0)
+            self.fit(df)
         
-        # Handle NaN and inf values
-        df = df.fillna(0)
-        df = df.replace([np.inf, -np.inf], 0)
+        # One vector per thread: the simulation worker and API handlers both score
+        vector = getattr(self._local, 'vector', None)
+        if vector is None or len(vector) != len(self.feature_names):
+            vector = self._local.vector = np.zeros(len(self.feature_names))
+            self._local.scaled = np.zeros(len(self.feature_names))
+        for index, name in enumerate(self.feature_names):
+            vector[index] = features.get(name, 0.0)
+        np.nan_to_num(vector, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
         
-        # Scale features
-        if not self.is_fitted:
-            # First time: fit scaler
-            scaled = self.scaler.fit_transform(df)
-            self.is_fitted = True
-        else:
-            # Subsequent times: transform only
-            scaled = self.scaler.transform(df)
+        scaled = np.multiply(vector, self._scale, out=self._local.scaled)
+        scaled += self._offset
+        return scaled
+    
+    def prepare_batch(self, features: pd.DataFrame) -> np.ndarray:
+        """
+        Scale a frame of engineered features, one row per sample.
+        
+        Columns are taken in schema order; missing, NaN and infinite values
+        become 0, as in prepare_for_ml.
         
-        return scaled[0]
+        Args:
+            features: Engineered features, e.g. from extract_features_batch
+            
+        Returns:
+            Scaled feature matrix (n_samples, n_features)
+        """
+        if not self.is_fitted:
+            raise ValueError("Feature engineer not fitted. Train or load it first.")
+        X = features.reindex(columns=self.feature_names, fill_value=0.0).to_numpy(dtype=np.float64, copy=True)
+        np.nan_to_num(X, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+        X *= self._scale
+        X += self._offset
+        return X
     
-    def create_training_dataset(self, sensor_logs: List[Dict]) -> Tuple[np.ndarray, List[str]]:
+    def create_training_dataset(self, sensor_logs: Union[List[Dict], pd.DataFrame]) -> Tuple[np.ndarray, List[str]]:
         """
         Create training dataset from sensor logs.
         
+        Logs that all carry the same finite signals are processed in one
+        vectorized pass (extract_features_batch); anything else replays the
+        logs through the streaming buffers. Both give the same features.
+        
         Args:
-            sensor_logs: List of sensor reading dictionaries
+            sensor_logs: List of sensor reading dictionaries, or a DataFrame
+                with one column per signal
             
         Returns:
             Tuple of (feature matrix, feature names)
         """
-        all_features = []
+        data = self._uniform_logs(sensor_logs)
         
         # Reset buffers
         self.buffers.clear()
         
-        for log in sensor_logs:
-            # Add to rolling buffers
-            self.add_sample(log)
+        if data is not None:
+            df = self.extract_features_batch(data)
+            # Leave the buffers holding the final window, as streaming would
+            for log in data.iloc[-self.window_size:].to_dict('records'):
+                self.add_sample(log)
+        else:
+            if isinstance(sensor_logs, pd.DataFrame):
+                sensor_logs = sensor_logs.to_dict('records')
+            all_features = []
+            for log in sensor_logs:
+                # Add to rolling buffers
+                self.add_sample(log)
+                
+                # Extract features
+                features = self.extract_features(log)
+                all_features.append(features)
             
-            # Extract features
-            features = self.extract_features(log)
-            all_features.append(features)
-        
-        # Convert to DataFrame
-        df = pd.DataFrame(all_features)
+            # Convert to DataFrame
+            df = pd.DataFrame(all_features)
         
         # Handle missing values
         df = df.fillna(df.mean())
         df = df.replace([np.inf, -np.inf], 0)
         
-        # Fit scaler on training data
-        X = self.scaler.fit_transform(df)
-        self.is_fitted = True
+        # Fit scaler on training data and freeze the schema
+        self.fit(df)
+        X = self.scaler.transform(df)
         
-        return X, list(df.columns)
+        return X, list(self.feature_names)
+    
+    @staticmethod
+    def _uniform_logs(sensor_logs: Union[List[Dict], pd.DataFrame]) -> Optional[pd.DataFrame]:
+        """Logs as a numeric DataFrame, or None if they need the streaming path."""
+        if isinstance(sensor_logs, pd.DataFrame):
+            data = sensor_logs
+        else:
+            if not sensor_logs:
+                return None
+            keys = sensor_logs[0].keys()
+            if any(log.keys() != keys for log in sensor_logs):
+                return None
+            data = pd.DataFrame(sensor_logs, columns=list(keys))
+        
+        # NaN poisons the streaming statistics but rolling windows skip it
+        values = data.to_numpy()
+        if len(data) == 0 or not np.issubdtype(values.dtype, np.number) or not np.all(np.isfinite(values)):
+            return None
+        return data.astype(np.float64)
     
     def reset(self):
         """Reset buffers and scaler."""
-        self.buffers.clear()
+        with self._lock:
+            self.buffers.clear()
         self.scaler = MinMaxScaler()
         self.is_fitted = False
+        self.feature_names = []
 
     def save(self, path: Path = None):
         """
-        Save the fitted feature engineer (scaler) to disk.
+        Save the fitted feature engineer (scaler and feature schema) to disk.
         """
         if path is None:
             # Use settings if available, else local default
@@ -151,12 +358,16 @@ class FeatureEngineer:
             path = settings.models_dir / "feature_engineer.pkl"
             
         import joblib
-        joblib.dump(self.scaler, path)
-        print(f"Feature engineer (scaler) saved to {path}")
+        joblib.dump({
+            'scaler': self.scaler,
+            'feature_names': self.feature_names,
+            'window_size': self.window_size,
+        }, path)
+        print(f"Feature engineer (scaler, {len(self.feature_names)} features) saved to {path}")
 
     def load(self, path: Path = None):
         """
-        Load the fitted feature engineer (scaler) from disk.
+        Load the fitted feature engineer (scaler and feature schema) from disk.
         """
         if path is None:
             from ..config import settings
@@ -166,6 +377,16 @@ class FeatureEngineer:
             raise FileNotFoundError(f"Feature engineer file not found: {path}")
             
         import joblib
-        self.scaler = joblib.load(path)
+        saved = joblib.load(path)
+        if isinstance(saved, dict):
+            self.scaler = saved['scaler']
+            self.feature_names = list(saved['feature_names'])
+        else:
+            # Older files hold only the scaler; recover the schema from its fit columns
+            self.scaler = saved
+            if not hasattr(saved, 'feature_names_in_'):
+                raise ValueError(f"Feature engineer file has no feature schema: {path}")
+            self.feature_names = [str(name) for name in saved.feature_names_in_]
         self.is_fitted = True
-        print(f"Feature engineer (scaler) loaded from {path}")
+        self._compile()
+        print(f"Feature engineer (scaler, {len(self.feature_names)} features) loaded from {path}")
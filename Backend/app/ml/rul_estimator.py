@@ -71,7 +71,19 @@ class RULEstimator:
             X: Feature vector (n_features,) or matrix (n_samples, n_features)
             
         Returns:
-            Predicted RUL in hours
+            Predicted RUL in hours of the first row
+        """
+        return float(self.predict_batch(X)[0])
+    
+    def predict_batch(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predict remaining useful life for every row.
+        
+        Args:
+            X: Feature vector (n_features,) or matrix (n_samples, n_features)
+            
+        Returns:
+            Predicted RUL in hours (n_samples,), non-negative
         """
         if not self.is_trained:
             raise ValueError("Model not trained. Call train() first.")
@@ -80,13 +92,8 @@ class RULEstimator:
         if X.ndim == 1:
             X = X.reshape(1, -1)
         
-        # Predict RUL
-        rul = self.model.predict(X)[0]
-        
-        # Ensure non-negative
-        rul = max(0.0, float(rul))
-        
-        return rul
+        # Predict RUL, ensuring non-negative
+        return np.maximum(self.model.predict(X).astype(np.float64), 0.0)
     
     def save(self, path: Optional[Path] = None):
         """Save trained model to disk."""
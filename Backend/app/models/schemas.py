@@ -68,6 +68,92 @@ class ControlResponse(BaseModel):
     timestamp: float
 
 
+class IKRequest(BaseModel):
+    """Batched inverse-kinematics request."""
+    targets: List[List[float]] = Field(..., description="End-effector positions [x, y, z] in meters")
+    initial: Optional[List[List[float]]] = Field(
+        None, description="Warm-start joint angles (radians): one configuration, or one per target"
+    )
+
+
+class IKResponse(BaseModel):
+    """Batched inverse-kinematics solution."""
+    joint_names: List[str]
+    angles: List[List[float]] = Field(..., description="Joint angles in radians, one row per target")
+    positions: List[List[float]] = Field(..., description="Reached end-effector positions in meters")
+    errors: List[float] = Field(..., description="Distance to target in meters")
+    converged: List[bool]
+    iterations: int
+    solve_ms: float
+
+
+class ReachabilityRequest(BaseModel):
+    """Batched workspace reachability query."""
+    targets: List[List[float]] = Field(..., description="End-effector positions [x, y, z] in meters")
+
+
+class ReachabilityResponse(BaseModel):
+    """Workspace map lookups for each target."""
+    reachable: List[bool]
+    manipulability: List[float] = Field(..., description="Best sampled sqrt(det(J J^T)) in the target voxel")
+    normalized_manipulability: List[float] = Field(..., description="Relative to the workspace best; near 0 is near-singular")
+    voxel_size: float
+
+
+class CollisionRequest(BaseModel):
+    """Batched self-collision check request."""
+    angles: List[List[float]] = Field(..., description="Joint angles in radians, one row per configuration")
+
+
+class CollisionResponse(BaseModel):
+    """Self-collision result for each configuration."""
+    in_collision: List[bool]
+    pairs: List[List[List[str]]] = Field(..., description="Colliding link pairs per configuration")
+    check_ms: float
+
+
+class DynamicsRequest(BaseModel):
+    """Batched inverse-dynamics request; one row per state."""
+    angles: List[List[float]] = Field(..., description="Joint angles in radians")
+    velocities: List[List[float]] = Field(..., description="Joint velocities in rad/s")
+    accelerations: List[List[float]] = Field(..., description="Joint accelerations in rad/s^2")
+    gravity: bool = True
+
+
+class DynamicsResponse(BaseModel):
+    """Joint torques for each requested state."""
+    joint_names: List[str]
+    torques: List[List[float]] = Field(..., description="Joint torques in Nm, one row per state")
+    compute_ms: float
+
+
+class PredictionRequest(BaseModel):
+    """Recorded sensor readings to score, in time order."""
+    readings: List[Dict[str, float]] = Field(
+        ..., description="Signals per reading: temperature, vibration, power, velocity, torque, angle"
+    )
+
+
+class PredictionResponse(BaseModel):
+    """Model scores for each reading."""
+    anomaly_score: List[float]
+    failure_probability: List[float]
+    rul_hours: List[float]
+    compute_ms: float
+
+
+class FeatureRowRequest(BaseModel):
+    """Engineered features of one sample, keyed by schema name."""
+    features: Dict[str, float]
+
+
+class FeatureRowResponse(BaseModel):
+    """Model scores for one sample."""
+    anomaly_score: float
+    failure_probability: float
+    rul_hours: float
+
+
 class LogExportParams(BaseModel):
     """Log export parameters."""
     start_time: Optional[float] = None
@@ -0,0 +1,102 @@
+"""Real and virtual time sources for the simulation."""
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class Clock(ABC):
+    """
+    Time source shared by the simulators and the tick scheduler.
+
+    ``now()`` is a monotonic reading in seconds for measuring intervals,
+    ``time()`` the matching epoch timestamp, and ``sleep()`` waits until
+    the clock has advanced by the given amount.
+    """
+
+    @abstractmethod
+    def now(self) -> float:
+        """Monotonic time in seconds."""
+
+    @abstractmethod
+    def time(self) -> float:
+        """Epoch time in seconds."""
+
+    @abstractmethod
+    async def sleep(self, seconds: float):
+        """Wait until ``seconds`` have passed on this clock."""
+
+
+class RealClock(Clock):
+    """Wall-clock time."""
+
+    def now(self) -> float:
+        """Monotonic wall time in seconds."""
+        return time.perf_counter()
+
+    def time(self) -> float:
+        """Current epoch time."""
+        return time.time()
+
+    async def sleep(self, seconds: float):
+        """Sleep on the event loop."""
+        await asyncio.sleep(seconds)
+
+
+class VirtualClock(Clock):
+    """
+    Simulated time that only moves when advanced.
+
+    Sleeping advances the clock by the requested amount at once. With a
+    ``speed``, each sleep also waits ``seconds / speed`` of wall time, so the
+    simulation runs at a fixed multiple of real time; without one (turbo),
+    the loop runs as fast as the CPU allows. Runs driven by a virtual clock
+    are reproducible, since no reading depends on wall time.
+    """
+
+    def __init__(self, start: float = 0.0, epoch: Optional[float] = None, speed: Optional[float] = None):
+        """
+        Initialize clock.
+
+        Args:
+            start: Initial monotonic reading in seconds
+            epoch: Epoch time at ``start`` (default: wall time at creation)
+            speed: Simulated seconds per wall second (None or 0 = turbo)
+        """
+        self._now = start
+        self._start = start
+        self.epoch = time.time() if epoch is None else epoch
+        self.speed = speed or None
+
+    def now(self) -> float:
+        """Current simulated time in seconds."""
+        return self._now
+
+    def time(self) -> float:
+        """Epoch time corresponding to the simulated time."""
+        return self.epoch + (self._now - self._start)
+
+    def advance(self, seconds: float):
+        """Move simulated time forward."""
+        self._now += max(0.0, seconds)
+
+    async def sleep(self, seconds: float):
+        """Advance by ``seconds``, pacing against wall time if a speed is set."""
+        self.advance(seconds)
+        # Always yield, so a turbo loop still lets other tasks run
+        await asyncio.sleep(seconds / self.speed if self.speed and seconds > 0 else 0)
+
+
+def create_clock(mode: str = "real", speed: float = 0.0) -> Clock:
+    """
+    Build a clock from configuration.
+
+    Args:
+        mode: 'real' or 'virtual'
+        speed: Virtual clock speed in simulated seconds per wall second (0 = turbo)
+    """
+    if mode == "real":
+        return RealClock()
+    if mode == "virtual":
+        return VirtualClock(speed=speed)
+    raise ValueError(f"Unknown clock mode: {mode} (expected 'real' or 'virtual')")
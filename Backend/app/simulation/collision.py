@@ -0,0 +1,325 @@
+"""Self-collision checking with per-link bounding-sphere hierarchies."""
+import hashlib
+import os
+import pickle
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .urdf_parser import URDFParser
+from .kinematics import ForwardKinematics, origin_transform
+
+# Bump when the cached hierarchy changes shape so stale artifacts are ignored
+BVH_VERSION = 2
+
+_STL_DTYPE = np.dtype([('normal', '<f4', 3), ('vertices', '<f4', (3, 3)), ('attributes', '<u2')])
+
+
+def load_stl(path: Path) -> np.ndarray:
+    """
+    Read the triangles of a binary or ASCII STL file.
+
+    Returns:
+        Triangle vertices (triangles, 3, 3)
+    """
+    data = Path(path).read_bytes()
+    if len(data) >= 84:
+        count = int(np.frombuffer(data, dtype='<u4', count=1, offset=80)[0])
+        if len(data) == 84 + count * _STL_DTYPE.itemsize:
+            records = np.frombuffer(data, dtype=_STL_DTYPE, count=count, offset=84)
+            return records['vertices'].astype(np.float64)
+
+    vertices = [line.split()[1:4] for line in data.decode('ascii', errors='ignore').splitlines()
+                if line.strip().startswith('vertex')]
+    return np.array(vertices, dtype=np.float64).reshape(-1, 3, 3)
+
+
+def build_sphere_tree(triangles: np.ndarray, leaf_radius: float = 0.005):
+    """
+    Top-down binary bounding-sphere hierarchy over a triangle mesh.
+
+    Each node's sphere encloses every vertex of its triangles. Nodes are
+    split at the median triangle centroid along their longest extent until
+    their sphere is no larger than ``leaf_radius`` or one triangle remains,
+    so tree depth follows the mesh size rather than its tessellation.
+
+    Args:
+        triangles: Triangle vertices (triangles, 3, 3)
+        leaf_radius: Sphere radius in meters below which nodes are not split
+
+    Returns:
+        (centers (nodes, 3), radii (nodes,), children (nodes, 2)); node 0 is
+        the root and leaves have children -1
+    """
+    centroids = triangles.mean(axis=1)
+    centers, radii, children = [], [], []
+    stack = [(np.arange(len(triangles)), -1, 0)]  # (triangle indices, parent node, child slot)
+    while stack:
+        indices, parent, slot = stack.pop()
+        node = len(centers)
+        if parent >= 0:
+            children[parent][slot] = node
+
+        points = triangles[indices].reshape(-1, 3)
+        low, high = points.min(axis=0), points.max(axis=0)
+        center = (low + high) / 2
+        radius = np.sqrt(np.max(np.sum((points - center) ** 2, axis=1)))
+        centers.append(center)
+        radii.append(radius)
+        children.append([-1, -1])
+
+        if radius > leaf_radius and len(indices) > 1:
+            axis = int(np.argmax(high - low))
+            order = indices[np.argsort(centroids[indices, axis], kind='stable')]
+            half = len(order) // 2
+            stack.append((order[half:], node, 1))
+            stack.append((order[:half], node, 0))
+
+    return np.array(centers), np.array(radii), np.array(children, dtype=np.int64)
+
+
+class SelfCollisionChecker:
+    """
+    Batched self-collision checks from URDF collision meshes.
+
+    Every link's collision mesh gets a bounding-sphere hierarchy in its link
+    frame. A batch of configurations is checked by one FK pass followed by a
+    breadth-first descent of all link pairs at once: candidate (configuration,
+    pair, node, node) rows are tested for sphere overlap with array
+    operations, and overlapping rows are expanded into their children until
+    two leaves overlap or nothing is left.
+
+    Leaf spheres slightly over-approximate their triangles, so the check is
+    conservative at the leaf scale (a few millimeters). Pairs joined by a
+    joint, or touching at the zero configuration anywhere along the travel of
+    the joints that others mimic (the gripper linkage parts), are never
+    checked, as in an SRDF disable list.
+    """
+
+    def __init__(self, urdf_parser: URDFParser, mesh_dir: Path,
+                 fk: Optional[ForwardKinematics] = None, cache_dir: Optional[Path] = None,
+                 leaf_radius: float = 0.005, margin: float = 0.0, chunk_rows: int = 256):
+        """
+        Initialize checker.
+
+        Args:
+            urdf_parser: Parsed URDF data
+            mesh_dir: Directory holding the collision mesh files
+            fk: Kinematic tree to reuse (default: built from urdf_parser)
+            cache_dir: Directory for hierarchy artifacts (default: no caching)
+            leaf_radius: Resolution of the hierarchy: leaf sphere radius in meters
+            margin: Extra clearance in meters required between links
+            chunk_rows: Configurations descended together, bounding candidate memory
+        """
+        self.fk = fk or ForwardKinematics(urdf_parser)
+        self.mesh_dir = Path(mesh_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.leaf_radius = leaf_radius
+        self.margin = margin
+        self.chunk_rows = chunk_rows
+        self.loaded_from_cache = False
+        joints = {joint.name: joint for joint in urdf_parser.get_revolute_joints()}
+        self._limits = np.array([[joints[name].lower_limit, joints[name].upper_limit]
+                                 for name in self.fk.joint_names]).reshape(-1, 2)
+
+        # Links with a collision mesh, in kinematic tree order
+        self.link_names: List[str] = []
+        self._mesh_paths: List[Path] = []
+        self._mesh_origins: List[np.ndarray] = []
+        for name in self.fk.link_names:
+            link = urdf_parser.get_link_by_name(name)
+            if link is None or not link.collision_mesh:
+                continue
+            self.link_names.append(name)
+            # package:// and file:// URIs resolve to the mesh directory by file name
+            self._mesh_paths.append(self.mesh_dir / Path(link.collision_mesh).name)
+            origin = origin_transform(link.collision_xyz, link.collision_rpy)
+            origin[:3, :3] = origin[:3, :3] * np.asarray(link.collision_scale)
+            self._mesh_origins.append(origin)
+
+        self.key = self._cache_key(urdf_parser.content_hash)
+        if not self._load_cache():
+            self._build()
+            self._save_cache()
+
+    def _cache_key(self, content_hash: str) -> str:
+        """Hash of the URDF, every collision mesh and the build parameters."""
+        digest = hashlib.sha256(f"{content_hash}:{self.leaf_radius}".encode())
+        for path in self._mesh_paths:
+            digest.update(path.read_bytes())
+        return digest.hexdigest()
+
+    @property
+    def cache_path(self) -> Optional[Path]:
+        """Artifact path for the current URDF and meshes (None without a cache_dir)."""
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"collision-{self.key[:16]}.pkl"
+
+    def _build(self):
+        """Build the hierarchies and the list of checked link pairs."""
+        centers, radii, children, roots, node_links = [], [], [], [], []
+        offset = 0
+        for index, (path, origin) in enumerate(zip(self._mesh_paths, self._mesh_origins)):
+            triangles = load_stl(path) @ origin[:3, :3].T + origin[:3, 3]
+            link_centers, link_radii, link_children = build_sphere_tree(triangles, self.leaf_radius)
+            # Child indices become global so all links share one node table
+            link_children[link_children >= 0] += offset
+            centers.append(link_centers)
+            radii.append(link_radii)
+            children.append(link_children)
+            node_links.append(np.full(len(link_radii), index))
+            roots.append(offset)
+            offset += len(link_radii)
+
+        self.centers = np.concatenate(centers)
+        self.radii = np.concatenate(radii)
+        self.children = np.concatenate(children)
+        self.node_links = np.concatenate(node_links)
+        self.roots = np.array(roots)
+
+        # Every pair not joined by a joint, minus pairs touching at rest as the
+        # mimicked joints (and the linkages that follow them) sweep their range
+        parents = {self.fk.link_names[i]: self.fk.link_names[p]
+                   for i, p in enumerate(self.fk.parent_index) if p >= 0}
+        pairs = [(a, b) for a in range(len(self.link_names)) for b in range(a + 1, len(self.link_names))
+                 if parents.get(self.link_names[b]) != self.link_names[a]
+                 and parents.get(self.link_names[a]) != self.link_names[b]]
+        self.pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+        at_rest = np.zeros((1, self.fk.num_joints))
+        for column in self.fk.mimic_columns:
+            sweep = np.repeat(at_rest, 9, axis=0)
+            sweep[:, column] = np.tile(np.linspace(*self._limits[column], 9), len(at_rest))
+            at_rest = np.vstack([at_rest, sweep])
+        self.pairs = self.pairs[~self.check(at_rest).any(axis=0)]
+
+    @property
+    def pair_names(self) -> List[Tuple[str, str]]:
+        """Link name pairs that are checked, in column order of ``check()``."""
+        return [(self.link_names[a], self.link_names[b]) for a, b in self.pairs]
+
+    def check(self, q: np.ndarray) -> np.ndarray:
+        """
+        Overlapping link pairs for a batch of configurations.
+
+        Args:
+            q: Joint angles (n, joints) or (joints,)
+
+        Returns:
+            Boolean array (n, pairs), True where the pair is in collision
+        """
+        q = np.atleast_2d(np.asarray(q, dtype=np.float64))
+        hits = np.zeros((q.shape[0], len(self.pairs)), dtype=bool)
+        for start in range(0, q.shape[0], self.chunk_rows):
+            hits[start:start + self.chunk_rows] = self._check_chunk(q[start:start + self.chunk_rows])
+        return hits
+
+    def _check_chunk(self, q: np.ndarray) -> np.ndarray:
+        """Hierarchy descent for one chunk of (n, joints) configurations."""
+        n = q.shape[0]
+        poses = self.fk.link_poses(q, self.link_names)
+        rotations = poses[..., :3, :3]
+        translations = poses[..., :3, 3]
+
+        num_pairs = len(self.pairs)
+        hits = np.zeros((n, num_pairs), dtype=bool)
+        # Candidate rows: (configuration, pair, node on first link, node on second link)
+        config = np.repeat(np.arange(n), num_pairs)
+        pair = np.tile(np.arange(num_pairs), n)
+        a = self.roots[self.pairs[pair, 0]]
+        b = self.roots[self.pairs[pair, 1]]
+
+        while config.size:
+            link_a, link_b = self.node_links[a], self.node_links[b]
+            center_a = np.einsum('kij,kj->ki', rotations[config, link_a], self.centers[a]) + translations[config, link_a]
+            center_b = np.einsum('kij,kj->ki', rotations[config, link_b], self.centers[b]) + translations[config, link_b]
+            reach = self.radii[a] + self.radii[b] + self.margin
+            overlap = np.sum((center_a - center_b) ** 2, axis=1) <= reach ** 2
+            config, pair, a, b = config[overlap], pair[overlap], a[overlap], b[overlap]
+
+            leaf_a = self.children[a, 0] < 0
+            leaf_b = self.children[b, 0] < 0
+            both = leaf_a & leaf_b
+            hits[config[both], pair[both]] = True
+
+            # Drop rows whose pair is already known to collide
+            open_rows = ~hits[config, pair]
+            config, pair, a, b = config[open_rows], pair[open_rows], a[open_rows], b[open_rows]
+            leaf_a, leaf_b = leaf_a[open_rows], leaf_b[open_rows]
+
+            # Descend into the larger sphere, or the only one that is not a leaf
+            split_a = ~leaf_a & (leaf_b | (self.radii[a] >= self.radii[b]))
+            config = np.concatenate([config, config])
+            pair = np.concatenate([pair, pair])
+            a = np.concatenate([np.where(split_a, self.children[a, 0], a), np.where(split_a, self.children[a, 1], a)])
+            b = np.concatenate([np.where(split_a, b, self.children[b, 0]), np.where(split_a, b, self.children[b, 1])])
+
+        return hits
+
+    def in_collision(self, q: np.ndarray) -> np.ndarray:
+        """Whether each configuration (n,) has any self-collision."""
+        return self.check(q).any(axis=1)
+
+    def flag_trajectory(self, q: np.ndarray, timestamps: np.ndarray) -> List[Dict]:
+        """
+        Time intervals of a trajectory spent in self-collision.
+
+        Args:
+            q: Joint angles (n, joints), in time order
+            timestamps: Sample times (n,) in seconds
+
+        Returns:
+            One dict per contiguous colliding run, with its start and end time
+            and the link pairs that collided during it
+        """
+        hits = self.check(q)
+        colliding = hits.any(axis=1)
+        edges = np.diff(np.concatenate([[0], colliding.astype(np.int8), [0]]))
+        starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+        names = self.pair_names
+        return [
+            {
+                "start_time": float(timestamps[start]),
+                "end_time": float(timestamps[end - 1]),
+                "samples": int(end - start),
+                "pairs": [names[i] for i in np.flatnonzero(hits[start:end].any(axis=0))],
+            }
+            for start, end in zip(starts, ends)
+        ]
+
+    def _load_cache(self) -> bool:
+        """Load the hierarchies from the cache. Returns False on a miss."""
+        path = self.cache_path
+        if path is None or not path.exists():
+            return False
+        try:
+            with open(path, 'rb') as f:
+                cached = pickle.load(f)
+        except Exception as e:
+            print(f"Ignoring unreadable collision cache {path}: {e}")
+            return False
+        if cached.get('version') != BVH_VERSION or cached.get('key') != self.key:
+            return False
+
+        for name in ('centers', 'radii', 'children', 'node_links', 'roots', 'pairs'):
+            setattr(self, name, cached[name])
+        self.loaded_from_cache = True
+        return True
+
+    def _save_cache(self):
+        """Write the hierarchies to the cache, if enabled."""
+        path = self.cache_path
+        if path is None:
+            return
+        artifact = {'version': BVH_VERSION, 'key': self.key}
+        for name in ('centers', 'radii', 'children', 'node_links', 'roots', 'pairs'):
+            artifact[name] = getattr(self, name)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename, so concurrent workers never read a partial file
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not write collision cache {path}: {e}")
@@ -0,0 +1,233 @@
+"""Vectorized recursive Newton-Euler inverse dynamics from URDF inertials."""
+import numpy as np
+from typing import Optional
+
+from .urdf_parser import URDFParser
+from .kinematics import ForwardKinematics, rpy_to_matrix
+
+GRAVITY = 9.81  # m/s^2, along -z of the base frame
+
+
+def skew(v: np.ndarray) -> np.ndarray:
+    """Matrix S(v) with a @ S(v) == cross(a, v) for row vectors a."""
+    x, y, z = v
+    return np.array([[0.0, -z, y], [z, 0.0, -x], [-y, x, 0.0]])
+
+
+def _cross(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Row-wise cross product of (n, 3) arrays (cheaper than np.cross for small n)."""
+    a0, a1, a2 = a[:, 0], a[:, 1], a[:, 2]
+    b0, b1, b2 = b[:, 0], b[:, 1], b[:, 2]
+    return np.stack((a1 * b2 - a2 * b1, a2 * b0 - a0 * b2, a0 * b1 - a1 * b0), axis=1)
+
+
+def _matmul(vectors: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """vectors @ matrix for stacked (..., 3) rows, as one 2-D product (much faster than batched matmul)."""
+    product = vectors.reshape(-1, 3) @ matrix
+    return product.reshape(vectors.shape[:-1] + matrix.shape[1:])
+
+
+def _cross_cross(w: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """w x (w x c) for rows w (n, 3) and a constant vector c, as w (w.c) - c |w|^2."""
+    return w * (w @ c)[:, None] - np.einsum('ij,ij->i', w, w)[:, None] * c
+
+
+class InverseDynamics:
+    """
+    Joint torques for batches of (q, q_dot, q_ddot) states.
+
+    Recursive Newton-Euler over the URDF kinematic tree: an outward pass
+    propagates link velocities and accelerations (gravity enters as a base
+    acceleration), and an inward pass accumulates link forces and moments
+    back to each joint. Every quantity is an (n, 3) array, so a batch costs
+    one pass over the links. Link masses, centers of mass and inertia tensors
+    come from the URDF <inertial> elements; links without one are massless.
+    Mimic joints move with the joint they follow, and their load is carried by
+    that joint's torque.
+    """
+
+    def __init__(self, urdf_parser: URDFParser, fk: Optional[ForwardKinematics] = None,
+                 gravity: float = GRAVITY, chunk_rows: int = 2048):
+        """
+        Initialize from a parsed URDF.
+
+        Args:
+            urdf_parser: Parsed URDF data
+            fk: Kinematic tree to reuse (default: built from urdf_parser)
+            gravity: Gravitational acceleration in m/s^2
+            chunk_rows: States processed per pass for large batches
+        """
+        self.fk = fk or ForwardKinematics(urdf_parser)
+        self.gravity = gravity
+        self.chunk_rows = chunk_rows
+        self.num_joints = self.fk.num_joints
+        num_links = len(self.fk.link_names)
+
+        # Inertial parameters per link, in link frame order of the kinematic tree
+        self.masses = np.zeros(num_links)
+        self.coms = np.zeros((num_links, 3))
+        self.inertias = np.zeros((num_links, 3, 3))
+        for index, name in enumerate(self.fk.link_names):
+            link = urdf_parser.get_link_by_name(name)
+            if link is None or not link.has_inertial:
+                continue
+            self.masses[index] = link.mass
+            self.coms[index] = link.inertial_xyz
+            if link.inertia:
+                i = link.inertia
+                tensor = np.array([
+                    [i['ixx'], i['ixy'], i['ixz']],
+                    [i['ixy'], i['iyy'], i['iyz']],
+                    [i['ixz'], i['iyz'], i['izz']],
+                ])
+                # Express the COM inertia in the link frame
+                R = rpy_to_matrix(link.inertial_rpy)
+                self.inertias[index] = R @ tensor @ R.T
+        self._skew_coms = np.array([skew(com) for com in self.coms])
+
+        # Static frame data per link: (R_static, offset, S(offset), axis, S(axis),
+        # column driving the link, mimic (multiplier, offset) or None)
+        self._frames = []
+        for index in range(num_links):
+            static = self.fk.static_transforms[index]
+            axis = self.fk.axes[index]
+            column = self.fk.pose_columns[index]
+            mimic = None
+            if column >= 0 and column != self.fk.columns[index]:
+                mimic = (self.fk.multipliers[index], self.fk.offsets[index])
+            self._frames.append((static[:3, :3], static[:3, 3], skew(static[:3, 3]),
+                                 axis, skew(axis), column, mimic))
+
+        # Only links carrying mass somewhere in their subtree affect any torque
+        subtree_mass = self.masses.copy()
+        for index in range(num_links - 1, 0, -1):
+            subtree_mass[self.fk.parent_index[index]] += subtree_mass[index]
+        self._links = [0] + [index for index in range(1, num_links) if subtree_mass[index] > 0.0]
+
+    def torques(self, q: np.ndarray, qd: np.ndarray, qdd: np.ndarray,
+                gravity: bool = True) -> np.ndarray:
+        """
+        Joint torques required to produce the given motion.
+
+        Args:
+            q: Joint angles (..., joints) in radians
+            qd: Joint velocities (..., joints) in rad/s
+            qdd: Joint accelerations (..., joints) in rad/s^2
+            gravity: Include gravity loading
+
+        Returns:
+            Joint torques (..., joints) in Nm
+        """
+        q = np.asarray(q, dtype=np.float64)
+        batch_shape = q.shape[:-1]
+        q = q.reshape(-1, self.num_joints)
+        qd = np.asarray(qd, dtype=np.float64).reshape(q.shape)
+        qdd = np.asarray(qdd, dtype=np.float64).reshape(q.shape)
+
+        # Bounded chunks keep the per-link intermediates in cache
+        torques = np.empty_like(q)
+        for start in range(0, q.shape[0], self.chunk_rows):
+            rows = slice(start, start + self.chunk_rows)
+            torques[rows] = self._rnea(q[rows], qd[rows], qdd[rows], gravity)
+        return torques.reshape(batch_shape + (self.num_joints,))
+
+    def _rnea(self, q: np.ndarray, qd: np.ndarray, qdd: np.ndarray, gravity: bool) -> np.ndarray:
+        """Newton-Euler passes for one chunk of (n, joints) states."""
+        n = q.shape[0]
+        omega = {}
+        alpha = {}
+        accel = {}  # Linear acceleration of each link frame origin
+        joint_cos = {}
+        joint_sin = {}
+
+        root = self._links[0]
+        omega[root] = np.zeros((n, 3))
+        alpha[root] = np.zeros((n, 3))
+        # Gravity as an upward acceleration of the base
+        accel[root] = np.tile([0.0, 0.0, self.gravity if gravity else 0.0], (n, 1))
+
+        # Outward pass: velocities and accelerations in each link's frame
+        for index in self._links[1:]:
+            parent = self.fk.parent_index[index]
+            R_static, offset, S_offset, axis, S_axis, column, mimic = self._frames[index]
+            parent_omega = omega[parent]
+            origin_accel = accel[parent] + alpha[parent] @ S_offset + _cross_cross(parent_omega, offset)
+
+            # Parent quantities expressed in the joint frame (R_static^T v, as v @ R_static)
+            vectors = _matmul(np.stack((parent_omega, alpha[parent], origin_accel), axis=1), R_static)
+            if column < 0:
+                omega[index], alpha[index], accel[index] = vectors[:, 0], vectors[:, 1], vectors[:, 2]
+                continue
+
+            angle, rate, rate_dot = q[:, column], qd[:, column, None], qdd[:, column, None]
+            if mimic is not None:
+                # Mimic joint: scaled (and offset) copy of the joint it follows
+                scale, shift = mimic
+                angle, rate, rate_dot = angle * scale + shift, rate * scale, rate_dot * scale
+
+            # Rotate by -q about the joint axis (Rodrigues), all three vectors at once
+            cos = np.cos(angle)[:, None, None]
+            sin = np.sin(angle)[:, None, None]
+            vectors = (vectors * cos + _matmul(vectors, S_axis) * sin
+                       + (1.0 - cos) * _matmul(vectors, axis)[..., None] * axis)
+            joint_cos[index], joint_sin[index] = cos, sin
+
+            omega_in = vectors[:, 0]
+            omega[index] = omega_in + rate * axis
+            alpha[index] = (vectors[:, 1] + rate_dot * axis
+                            + rate * (omega_in @ S_axis))
+            accel[index] = vectors[:, 2]
+
+        # Inward pass: forces and moments about each link frame origin
+        force = {index: np.zeros((n, 3)) for index in self._links}
+        moment = {index: np.zeros((n, 3)) for index in self._links}
+        torques = np.zeros((n, self.num_joints))
+        for index in reversed(self._links):
+            mass = self.masses[index]
+            if mass > 0.0:
+                com = self.coms[index]
+                w, a = omega[index], alpha[index]
+                inertial_force = mass * (accel[index] + a @ self._skew_coms[index] + _cross_cross(w, com))
+                inertia_T = self.inertias[index].T
+                force[index] += inertial_force
+                moment[index] += (a @ inertia_T + _cross(w, w @ inertia_T)
+                                  - inertial_force @ self._skew_coms[index])
+
+            R_static, offset, S_offset, axis, S_axis, column, mimic = self._frames[index]
+            if column >= 0:
+                # A mimic joint is not a degree of freedom of its own: its load
+                # acts on the joint it follows, through the multiplier
+                torques[:, column] += (moment[index] @ axis) * (1.0 if mimic is None else mimic[0])
+
+            parent = self.fk.parent_index[index]
+            if parent < 0:
+                continue
+            vectors = np.stack((force[index], moment[index]), axis=1)
+            if column >= 0:
+                # Rotate by +q about the joint axis back into the static joint frame
+                cos, sin = joint_cos[index], joint_sin[index]
+                vectors = (vectors * cos - _matmul(vectors, S_axis) * sin
+                           + (1.0 - cos) * _matmul(vectors, axis)[..., None] * axis)
+            vectors = _matmul(vectors, R_static.T)
+            parent_force = vectors[:, 0]
+            force[parent] += parent_force
+            moment[parent] += vectors[:, 1] - parent_force @ S_offset
+
+        return torques
+
+    def gravity_torques(self, q: np.ndarray) -> np.ndarray:
+        """Static holding torques (..., joints) at configurations q."""
+        zeros = np.zeros_like(np.asarray(q, dtype=np.float64))
+        return self.torques(q, zeros, zeros)
+
+    def mass_matrix(self, q: np.ndarray) -> np.ndarray:
+        """
+        Joint-space inertia matrix at one configuration.
+
+        Column j is the torque for a unit acceleration of joint j at rest
+        without gravity.
+        """
+        q = np.asarray(q, dtype=np.float64)
+        eye = np.eye(self.num_joints)
+        batch = np.broadcast_to(q, eye.shape)
+        return self.torques(batch, np.zeros_like(eye), eye, gravity=False).T
@@ -0,0 +1,217 @@
+"""Batched simulator for a fleet of identical robotic arms.
+
+All machines share one parsed URDF model and advance together in a single
+vectorized step over (machines x joints) arrays.
+"""
+import numpy as np
+from typing import Dict, List, Optional
+
+from .urdf_parser import URDFParser
+from .physics_sim import JointState, motion_amplitudes
+from .sensor_generator import FAULT_TYPES
+from .dynamics import InverseDynamics
+from .clock import Clock, RealClock
+
+
+class FleetSimulator:
+    """Vectorized simulator for N machines built from the same URDF."""
+
+    def __init__(self, urdf_parser: URDFParser, num_machines: int, frequency: float = 10.0,
+                 machine_ids: Optional[List[str]] = None, seed: Optional[int] = None,
+                 clock: Optional[Clock] = None):
+        """
+        Initialize fleet simulator.
+
+        Args:
+            urdf_parser: Parsed URDF data shared by every machine
+            num_machines: Number of machines in the fleet
+            frequency: Simulation frequency in Hz
+            machine_ids: Optional machine identifiers (default: <robot>_01, <robot>_02, ...)
+            seed: Seed for phase offsets and noise (random if None)
+            clock: Time source for the motion (default: wall clock)
+        """
+        self.urdf_parser = urdf_parser
+        self.frequency = frequency
+        self.dt = 1.0 / frequency
+        self.num_machines = num_machines
+
+        if machine_ids is None:
+            machine_ids = [f"{urdf_parser.robot_name}_{i + 1:02d}" for i in range(num_machines)]
+        if len(machine_ids) != num_machines:
+            raise ValueError("machine_ids must have one entry per machine")
+        self.machine_ids = list(machine_ids)
+        self._machine_index: Dict[str, int] = {mid: i for i, mid in enumerate(self.machine_ids)}
+
+        self.revolute_joints = urdf_parser.get_revolute_joints()
+        self.joint_names: List[str] = [joint.name for joint in self.revolute_joints]
+        num_joints = len(self.revolute_joints)
+        self.num_joints = num_joints
+
+        # Shared joint model, shape (joints,) and broadcast over machines
+        self.lower_limits = np.array([j.lower_limit for j in self.revolute_joints], dtype=np.float64)
+        self.upper_limits = np.array([j.upper_limit for j in self.revolute_joints], dtype=np.float64)
+        self.effort_limits = np.array([j.effort_limit for j in self.revolute_joints], dtype=np.float64)
+        self.frequencies = 0.3 + np.arange(num_joints, dtype=np.float64) * 0.1
+        self.omega = 2 * np.pi * self.frequencies
+        self.amplitudes = motion_amplitudes(self.revolute_joints)
+        self.centers = (self.lower_limits + self.upper_limits) / 2.0
+        self._velocity_gain = self.amplitudes * self.omega
+        self._acceleration_gain = -self.amplitudes * self.omega ** 2
+
+        # One random stream per machine, so a machine's motion depends only
+        # on the seed and its index, not on the rest of the fleet
+        self.rngs = [np.random.default_rng(child) for child in np.random.SeedSequence(seed).spawn(num_machines)]
+        shape = (num_machines, num_joints)
+
+        # Per-machine phase offsets so machines are not moving in lockstep
+        self.phase_offsets = np.array([[rng.uniform(0.0, 2 * np.pi)] for rng in self.rngs]).reshape(num_machines, 1)
+
+        # Per-machine noise (angle, velocity) standard deviations
+        self.base_noise_std = np.array([0.01, 0.05])
+        self.noise_gain = np.ones(num_machines, dtype=np.float64)
+        self._noise = np.zeros((num_machines, 2, num_joints), dtype=np.float64)
+
+        # Rigid-body torques from the URDF inertials, batched over machines,
+        # as in PhysicsSimulator; unit inertia if the URDF has no masses
+        self.dynamics = InverseDynamics(urdf_parser)
+        if not np.any(self.dynamics.masses > 0.0):
+            self.dynamics = None
+
+        # Per-machine fault state
+        self.friction_coeffs = np.full(num_machines, 0.1, dtype=np.float64)
+        self.seized = np.zeros(shape, dtype=bool)
+
+        # Joint state arrays, shape (machines, joints)
+        self.angles = np.zeros(shape, dtype=np.float64)
+        self.velocities = np.zeros(shape, dtype=np.float64)
+        self.accelerations = np.zeros(shape, dtype=np.float64)
+        self.torques = np.zeros(shape, dtype=np.float64)
+        self._phase = np.zeros(shape, dtype=np.float64)
+        self._sin = np.zeros(shape, dtype=np.float64)
+
+        self.clock = clock or RealClock()
+        self.start_time = self.clock.now()
+        self.sim_time = 0.0
+
+        self._initialize_joints()
+
+    def _initialize_joints(self):
+        """Initialize every machine to the neutral position."""
+        self.angles[:] = self.centers
+        self.velocities.fill(0.0)
+        self.accelerations.fill(0.0)
+        self.torques.fill(0.0)
+
+    def step(self):
+        """Advance every machine by one timestep."""
+        self.sim_time += self.dt
+        elapsed = self.clock.now() - self.start_time
+
+        np.multiply(self.omega, elapsed, out=self._phase)
+        self._phase += self.phase_offsets
+        sin = np.sin(self._phase, out=self._sin)
+        cos = np.cos(self._phase)
+
+        for rng, machine_noise in zip(self.rngs, self._noise):
+            rng.standard_normal(out=machine_noise)
+        noise = (self._noise * self.noise_gain[:, None, None]).transpose(1, 0, 2)
+
+        held_angles = self.angles[self.seized]
+
+        np.clip(self.centers + self.amplitudes * sin + self.base_noise_std[0] * noise[0],
+                self.lower_limits, self.upper_limits, out=self.angles)
+        np.add(self._velocity_gain * cos, self.base_noise_std[1] * noise[1], out=self.velocities)
+        np.multiply(self._acceleration_gain, sin, out=self.accelerations)
+
+        # Seized joints hold their angle and stop moving
+        if held_angles.size:
+            self.angles[self.seized] = held_angles
+            self.velocities[self.seized] = 0.0
+            self.accelerations[self.seized] = 0.0
+
+        # Torque from inverse dynamics for all machines at once, clipped to effort limits
+        if self.dynamics is not None:
+            rigid_body = self.dynamics.torques(self.angles, self.velocities, self.accelerations)
+        else:
+            rigid_body = self.accelerations
+        np.clip(rigid_body + self.friction_coeffs[:, None] * self.velocities,
+                -self.effort_limits, self.effort_limits, out=self.torques)
+
+    def machine_index(self, machine_id: str) -> int:
+        """Get the row index of a machine."""
+        if machine_id not in self._machine_index:
+            raise KeyError(f"Unknown machine: {machine_id}")
+        return self._machine_index[machine_id]
+
+    def inject_fault(self, machine_id: str, fault_type: str = "overload", severity: float = 0.5,
+                     joint_index: Optional[int] = None):
+        """
+        Inject a fault into a single machine.
+
+        Args:
+            machine_id: Target machine
+            fault_type: Type of fault: seizure, or one of the sensor fault
+                types, mapped onto joint behaviour (temperature/overload add
+                friction torque, vibration/pressure_loss add motion noise,
+                degradation/drift add both)
+            severity: Fault severity (0-1)
+            joint_index: Joint to seize (seizure only, default: all joints)
+        """
+        i = self.machine_index(machine_id)
+
+        if fault_type in ("overload", "temperature"):
+            # Worn gearing increases friction torque
+            self.friction_coeffs[i] += severity
+        elif fault_type in ("vibration", "pressure_loss"):
+            self.noise_gain[i] += severity * 10.0
+        elif fault_type in ("degradation", "drift"):
+            # Gradual wear: some extra friction and play
+            self.friction_coeffs[i] += severity * 0.5
+            self.noise_gain[i] += severity * 5.0
+        elif fault_type == "seizure":
+            if joint_index is None:
+                self.seized[i, :] = True
+            else:
+                self.seized[i, joint_index] = True
+        else:
+            raise ValueError(f"Unknown fault type: {fault_type} (expected one of {FAULT_TYPES + ('seizure',)})")
+
+    def clear_faults(self, machine_id: Optional[str] = None):
+        """Clear faults on one machine, or the whole fleet if machine_id is None."""
+        rows = slice(None) if machine_id is None else self.machine_index(machine_id)
+        self.friction_coeffs[rows] = 0.1
+        self.noise_gain[rows] = 1.0
+        self.seized[rows] = False
+
+    def get_joint_states(self, machine_id: str) -> List[JointState]:
+        """Get current joint states of one machine."""
+        i = self.machine_index(machine_id)
+        return [
+            JointState(name=name, angle=angle, velocity=velocity,
+                       acceleration=acceleration, torque=torque)
+            for name, angle, velocity, acceleration, torque in zip(
+                self.joint_names,
+                self.angles[i].tolist(),
+                self.velocities[i].tolist(),
+                self.accelerations[i].tolist(),
+                self.torques[i].tolist()
+            )
+        ]
+
+    def get_state_dict(self) -> Dict:
+        """Get the whole fleet state in columnar (machines x joints) form."""
+        return {
+            'timestamp': self.clock.time(),
+            'sim_time': self.sim_time,
+            'machine_ids': self.machine_ids,
+            'joint_names': self.joint_names,
+            'angles': self.angles.tolist(),
+            'velocities': self.velocities.tolist(),
+            'torques': self.torques.tolist(),
+        }
+
+    def reset(self):
+        """Reset the fleet to its initial state (faults are kept)."""
+        self.start_time = self.clock.now()
+        self.sim_time = 0.0
+        self._initialize_joints()
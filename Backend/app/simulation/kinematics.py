@@ -0,0 +1,358 @@
+"""Batched forward and inverse kinematics from URDF joint origins and axes."""
+import numpy as np
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from .urdf_parser import URDFParser
+
+
+def rpy_to_matrix(rpy: Sequence[float]) -> np.ndarray:
+    """Rotation matrix for URDF roll-pitch-yaw angles (R = Rz(yaw) Ry(pitch) Rx(roll))."""
+    roll, pitch, yaw = rpy
+    cr, sr = np.cos(roll), np.sin(roll)
+    cp, sp = np.cos(pitch), np.sin(pitch)
+    cy, sy = np.cos(yaw), np.sin(yaw)
+    return np.array([
+        [cy * cp, cy * sp * sr - sy * cr, cy * sp * cr + sy * sr],
+        [sy * cp, sy * sp * sr + cy * cr, sy * sp * cr - cy * sr],
+        [-sp, cp * sr, cp * cr],
+    ])
+
+
+def origin_transform(xyz: Sequence[float], rpy: Sequence[float]) -> np.ndarray:
+    """Homogeneous 4x4 transform of a URDF <origin>."""
+    transform = np.eye(4)
+    transform[:3, :3] = rpy_to_matrix(rpy)
+    transform[:3, 3] = xyz
+    return transform
+
+
+def axis_rotations(axis: np.ndarray, angles: np.ndarray) -> np.ndarray:
+    """
+    Rotations about a fixed unit axis for a batch of angles (Rodrigues' formula).
+
+    Args:
+        axis: Unit rotation axis (3,)
+        angles: Rotation angles (n,)
+
+    Returns:
+        Rotation matrices (n, 3, 3)
+    """
+    x, y, z = axis
+    K = np.array([[0.0, -z, y], [z, 0.0, -x], [-y, x, 0.0]])
+    sin = np.sin(angles)[:, None, None]
+    cos = np.cos(angles)[:, None, None]
+    return np.eye(3) + sin * K + (1.0 - cos) * (K @ K)
+
+
+class ForwardKinematics:
+    """
+    Link poses for batches of joint configurations.
+
+    The kinematic tree and every joint's static origin transform are computed
+    once from the URDF. A batch of configurations is then propagated root to
+    leaf with one batched 4x4 product per joint, visiting only the joints on
+    the path to the requested links. Configurations follow the revolute joint
+    order of ``URDFParser.get_revolute_joints()`` (the simulators' order).
+    Joints with a URDF <mimic> follow the joint they mimic, whatever their own
+    column holds; other passive joints are held at zero.
+    """
+
+    def __init__(self, urdf_parser: URDFParser, end_effector: str = "grasping_frame"):
+        """
+        Initialize from a parsed URDF.
+
+        Args:
+            urdf_parser: Parsed URDF data
+            end_effector: Link used by ``end_effector_poses()``
+        """
+        self.joint_names: List[str] = [j.name for j in urdf_parser.get_revolute_joints()]
+        self.num_joints = len(self.joint_names)
+        column = {name: i for i, name in enumerate(self.joint_names)}
+
+        joints = urdf_parser.joints
+        child_links = {j.child_link for j in joints}
+        roots = [link.name for link in urdf_parser.links if link.name not in child_links]
+        if len(roots) != 1:
+            raise ValueError(f"URDF must have exactly one root link, found {roots}")
+        self.root_link = roots[0]
+
+        # Breadth-first joint order, so every parent pose is computed before its children
+        children = defaultdict(list)
+        for joint in joints:
+            children[joint.parent_link].append(joint)
+        ordered = []
+        frontier = [self.root_link]
+        while frontier:
+            link = frontier.pop(0)
+            for joint in children[link]:
+                ordered.append(joint)
+                frontier.append(joint.child_link)
+
+        self.link_names: List[str] = [self.root_link] + [j.child_link for j in ordered]
+        self.link_index: Dict[str, int] = {name: i for i, name in enumerate(self.link_names)}
+        self.parent_index = np.full(len(self.link_names), -1, dtype=np.int64)
+
+        # Per child link: static origin transform, unit axis and configuration column
+        self.static_transforms = np.tile(np.eye(4), (len(self.link_names), 1, 1))
+        self.axes = np.zeros((len(self.link_names), 3))
+        self.columns = np.full(len(self.link_names), -1, dtype=np.int64)
+        # Column that sets each link's pose, with its mimic scale and offset
+        self.pose_columns = np.full(len(self.link_names), -1, dtype=np.int64)
+        self.multipliers = np.ones(len(self.link_names))
+        self.offsets = np.zeros(len(self.link_names))
+        for joint in ordered:
+            child = self.link_index[joint.child_link]
+            self.parent_index[child] = self.link_index[joint.parent_link]
+            self.static_transforms[child] = origin_transform(joint.origin_xyz, joint.origin_rpy)
+            driven_by = joint.mimic_joint if joint.mimic_joint in column else joint.name
+            if driven_by in column:
+                axis = np.asarray(joint.axis, dtype=np.float64)
+                self.axes[child] = axis / np.linalg.norm(axis)
+                self.pose_columns[child] = column[driven_by]
+                if driven_by != joint.name:
+                    self.multipliers[child] = joint.mimic_multiplier
+                    self.offsets[child] = joint.mimic_offset
+            if joint.name in column:
+                self.columns[child] = column[joint.name]
+        self.mimic_columns = sorted({int(c) for c, own in zip(self.pose_columns, self.columns) if c >= 0 and c != own})
+
+        if end_effector not in self.link_index:
+            raise ValueError(f"Unknown end-effector link: {end_effector}")
+        self.end_effector = end_effector
+
+    def _chain(self, targets: List[int]) -> List[int]:
+        """Link indices needed to reach ``targets``, in computation order."""
+        needed = set()
+        for index in targets:
+            while index >= 0 and index not in needed:
+                needed.add(index)
+                index = self.parent_index[index]
+        # Link order is breadth-first, so sorting keeps parents first
+        return sorted(needed)
+
+    def link_poses(self, q: np.ndarray, links: Optional[List[str]] = None) -> np.ndarray:
+        """
+        World poses of links for a batch of configurations.
+
+        Args:
+            q: Joint angles (..., joints), any batch shape (e.g. replay rows or
+                machines x joints for a fleet tick)
+            links: Links to return (default: all, in ``link_names`` order)
+
+        Returns:
+            Homogeneous transforms (..., links, 4, 4)
+        """
+        q = np.asarray(q, dtype=np.float64)
+        if q.shape[-1] != self.num_joints:
+            raise ValueError(f"Expected {self.num_joints} joint angles, got {q.shape[-1]}")
+        batch_shape = q.shape[:-1]
+        q = q.reshape(-1, self.num_joints)
+        n = q.shape[0]
+
+        targets = [self.link_index[name] for name in links] if links else list(range(len(self.link_names)))
+        poses = {}
+        for index in self._chain(targets):
+            parent = self.parent_index[index]
+            if parent < 0:
+                poses[index] = np.broadcast_to(np.eye(4), (n, 4, 4))
+                continue
+
+            static = self.static_transforms[index]
+            column = self.pose_columns[index]
+            if column < 0:
+                poses[index] = poses[parent] @ static
+            else:
+                angles = q[:, column] * self.multipliers[index] + self.offsets[index]
+                local = np.zeros((n, 4, 4))
+                local[:, :3, :3] = static[:3, :3] @ axis_rotations(self.axes[index], angles)
+                local[:, :3, 3] = static[:3, 3]
+                local[:, 3, 3] = 1.0
+                poses[index] = poses[parent] @ local
+
+        result = np.stack([poses[index] for index in targets], axis=1)
+        return result.reshape(batch_shape + (len(targets), 4, 4))
+
+    def end_effector_poses(self, q: np.ndarray) -> np.ndarray:
+        """End-effector poses (..., 4, 4) for a batch of configurations."""
+        return self.link_poses(q, [self.end_effector])[..., 0, :, :]
+
+
+@dataclass
+class IKSolution:
+    """Result of a batched inverse-kinematics solve."""
+    angles: np.ndarray  # (n, joints) radians, within joint limits
+    positions: np.ndarray  # (n, 3) reached end-effector positions
+    errors: np.ndarray  # (n,) distance to target in meters
+    converged: np.ndarray  # (n,) bool
+    iterations: int
+
+
+class InverseKinematics:
+    """
+    Batched damped-least-squares (Levenberg-Marquardt) position IK.
+
+    All targets are solved together as (targets x joints) arrays. Each
+    iteration computes the end-effector positions and the analytic position
+    Jacobian of the unconverged rows with one batched FK pass, takes the step
+    dq = J^T (J J^T + lambda^2 I)^-1 e, and clips to the URDF joint limits.
+
+    Without a warm start, each target starts from the nearest of a fixed set
+    of sampled configurations (their end-effector positions are computed
+    once), which puts it on a reachable branch within the joint limits.
+    Targets still unconverged are retried from their next-nearest samples.
+    When a ``reachability`` map is attached, targets inside its reached
+    voxels start from the voxel's best-conditioned configuration instead.
+    """
+
+    def __init__(self, urdf_parser: URDFParser, fk: Optional[ForwardKinematics] = None,
+                 damping: float = 0.02, tolerance: float = 1e-4, max_iterations: int = 100,
+                 max_step: float = 0.3, restarts: int = 3, num_seeds: int = 512,
+                 seed: Optional[int] = None):
+        """
+        Initialize solver.
+
+        Args:
+            urdf_parser: Parsed URDF data (joint limits)
+            fk: Forward kinematics to use (default: built from urdf_parser)
+            damping: Damping factor lambda, in meters
+            tolerance: Position error at which a target counts as reached (meters)
+            max_iterations: Iterations per attempt
+            max_step: Largest joint change per iteration (radians)
+            restarts: Retries for targets the first attempt misses
+            num_seeds: Sampled start configurations
+            seed: Seed for the sampled configurations
+        """
+        self.fk = fk or ForwardKinematics(urdf_parser)
+        joints = urdf_parser.get_revolute_joints()
+        self.lower_limits = np.array([j.lower_limit for j in joints], dtype=np.float64)
+        self.upper_limits = np.array([j.upper_limit for j in joints], dtype=np.float64)
+        self.damping = damping
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.max_step = max_step
+        self.restarts = restarts
+
+        # Actuated joints between the root and the end effector
+        fk = self.fk
+        chain = fk._chain([fk.link_index[fk.end_effector]])
+        self._joint_links = [index for index in chain if fk.columns[index] >= 0]
+        self._joint_columns = fk.columns[self._joint_links]
+        self._chain_links = [fk.link_names[index] for index in self._joint_links] + [fk.end_effector]
+
+        rng = np.random.default_rng(seed)
+        self.seeds = rng.uniform(self.lower_limits, self.upper_limits, size=(num_seeds, fk.num_joints))
+        self.seed_positions = fk.end_effector_poses(self.seeds)[:, :3, 3]
+        self.reachability = None  # Optional ReachabilityMap used for cold starts
+
+    def jacobian(self, q: np.ndarray):
+        """
+        End-effector positions and position Jacobians for a batch of configurations.
+
+        Args:
+            q: Joint angles (n, joints)
+
+        Returns:
+            (positions (n, 3), jacobians (n, 3, joints))
+        """
+        poses = self.fk.link_poses(q, self._chain_links)
+        positions = poses[:, -1, :3, 3]
+        joint_poses = poses[:, :-1]
+
+        # Revolute column: world axis x (end effector - joint origin)
+        axes = np.einsum('nkij,kj->nki', joint_poses[..., :3, :3], self.fk.axes[self._joint_links])
+        lever = positions[:, None, :] - joint_poses[..., :3, 3]
+        jacobians = np.zeros((q.shape[0], 3, self.fk.num_joints))
+        jacobians[:, :, self._joint_columns] = np.cross(axes, lever).transpose(0, 2, 1)
+        return positions, jacobians
+
+    @staticmethod
+    def _dls_step(J: np.ndarray, error: np.ndarray, damping: np.ndarray) -> np.ndarray:
+        """Damped least-squares joint step for (n, 3, joints) Jacobians."""
+        JT = J.transpose(0, 2, 1)
+        return (JT @ np.linalg.solve(J @ JT + damping, error[..., None]))[..., 0]
+
+    def _iterate(self, q: np.ndarray, targets: np.ndarray) -> int:
+        """Run DLS iterations in place on q; returns iterations used."""
+        damping = self.damping ** 2 * np.eye(3)
+        active = np.arange(q.shape[0])
+        for iteration in range(1, self.max_iterations + 1):
+            positions, J = self.jacobian(q[active])
+            error = targets[active] - positions
+            done = np.linalg.norm(error, axis=1) < self.tolerance
+            active, error, J = active[~done], error[~done], J[~done]
+            if active.size == 0:
+                return iteration
+
+            step = self._dls_step(J, error, damping)
+
+            # Joints pinned at a limit and pushed outward drop out of the
+            # Jacobian, so the remaining joints make progress instead of stalling
+            current = q[active]
+            blocked = (((current <= self.lower_limits) & (step < 0))
+                       | ((current >= self.upper_limits) & (step > 0)))
+            rows = np.flatnonzero(blocked.any(axis=1))
+            if rows.size:
+                J_free = J[rows] * ~blocked[rows][:, None, :]
+                step[rows] = self._dls_step(J_free, error[rows], damping)
+
+            largest = np.abs(step).max(axis=1, keepdims=True)
+            step *= np.minimum(1.0, self.max_step / np.maximum(largest, 1e-12))
+            q[active] = np.clip(q[active] + step, self.lower_limits, self.upper_limits)
+        return self.max_iterations
+
+    def solve(self, targets: np.ndarray, initial: Optional[np.ndarray] = None) -> IKSolution:
+        """
+        Solve position IK for a batch of Cartesian targets.
+
+        Args:
+            targets: End-effector positions (n, 3) in meters, base frame
+            initial: Warm-start configuration(s), (joints,) or (n, joints)
+                (default: reachability map seed, else nearest sampled configuration)
+
+        Returns:
+            IKSolution for every target, in input order
+        """
+        targets = np.atleast_2d(np.asarray(targets, dtype=np.float64))
+        n = targets.shape[0]
+        # Sampled configurations ordered by distance to each target, (n, num_seeds)
+        distances = np.linalg.norm(targets[:, None, :] - self.seed_positions[None, :, :], axis=2)
+        ranked = np.argsort(distances, axis=1)[:, :self.restarts + 1]
+
+        if initial is None:
+            q = self.seeds[ranked[:, 0]]
+            first_retry = np.ones(n, dtype=np.int64)
+            if self.reachability is not None:
+                # Map seeds replace the first sample, which stays available for retries
+                mapped = self.reachability.seed_configurations(targets)
+                rows = ~np.isnan(mapped).any(axis=1)
+                q[rows] = np.clip(mapped[rows], self.lower_limits, self.upper_limits)
+                first_retry[rows] = 0
+        else:
+            first_retry = np.zeros(n, dtype=np.int64)
+            q = np.clip(np.broadcast_to(np.asarray(initial, dtype=np.float64), (n, self.fk.num_joints)),
+                        self.lower_limits, self.upper_limits)
+
+        iterations = self._iterate(q, targets)
+        positions = self.fk.end_effector_poses(q)[:, :3, 3]
+        errors = np.linalg.norm(positions - targets, axis=1)
+        for attempt in range(self.restarts):
+            missed = np.flatnonzero(errors >= self.tolerance)
+            if missed.size == 0:
+                break
+            # Next-nearest unused sample (warm-started rows have not used any yet)
+            retry = self.seeds[ranked[missed, attempt + first_retry[missed]]].copy()
+            iterations += self._iterate(retry, targets[missed])
+            retry_positions = self.fk.end_effector_poses(retry)[:, :3, 3]
+            retry_errors = np.linalg.norm(retry_positions - targets[missed], axis=1)
+
+            # Keep whichever attempt got closer
+            better = retry_errors < errors[missed]
+            rows = missed[better]
+            q[rows] = retry[better]
+            positions[rows] = retry_positions[better]
+            errors[rows] = retry_errors[better]
+
+        return IKSolution(angles=q, positions=positions, errors=errors,
+                          converged=errors < self.tolerance, iterations=iterations)
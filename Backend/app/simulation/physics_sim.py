@@ -3,11 +3,23 @@
 Reuses patterns from mock_generator/simulator.py.
 """
 import numpy as np
-import time
-from typing import Dict, List
+from typing import Dict, List, Optional
 from dataclasses import dataclass
 
-from .urdf_parser import URDFParser, Joint
+from .urdf_parser import URDFParser
+from .dynamics import InverseDynamics
+from .clock import Clock, RealClock
+
+# Fraction of each joint's range swept by the synthetic motion. The shoulder,
+# elbow and wrist pitch sweep less, so the arm never folds onto its base plate.
+MOTION_RANGE = 0.3
+MOTION_RANGE_OVERRIDES = {'joint2': 0.2, 'joint3': 0.2, 'joint4': 0.2}
+
+
+def motion_amplitudes(joints) -> np.ndarray:
+    """Sinusoid amplitude (radians) of each joint's synthetic motion."""
+    return np.array([(j.upper_limit - j.lower_limit) * MOTION_RANGE_OVERRIDES.get(j.name, MOTION_RANGE)
+                     for j in joints], dtype=np.float64)
 
 
 @dataclass
@@ -21,25 +33,71 @@ class JointState:
 
 
 class PhysicsSimulator:
-    """Lightweight physics simulator for robotic arm."""
+    """
+    Lightweight physics simulator for robotic arm.
+
+    Joint state is kept as contiguous NumPy arrays (struct-of-arrays) and all
+    joints advance in one vectorized expression per step. ``JointState``
+    objects are only materialized on demand via ``get_joint_states()``.
+    Motion follows the elapsed time of ``clock``, so a virtual clock runs the
+    simulation faster than real time.
+    """
     
-    def __init__(self, urdf_parser: URDFParser, frequency: float = 10.0):
+    def __init__(self, urdf_parser: URDFParser, frequency: float = 10.0,
+                 clock: Optional[Clock] = None, seed: Optional[int] = None):
         """
         Initialize simulator.
         
         Args:
             urdf_parser: Parsed URDF data
             frequency: Simulation frequency in Hz
+            clock: Time source for the motion (default: wall clock)
+            seed: Seed for the joint angle and velocity noise (random if None)
         """
         self.urdf_parser = urdf_parser
         self.frequency = frequency
         self.dt = 1.0 / frequency
         
         self.revolute_joints = urdf_parser.get_revolute_joints()
-        self.joint_states: Dict[str, JointState] = {}
+        self.joint_names: List[str] = [joint.name for joint in self.revolute_joints]
+        num_joints = len(self.revolute_joints)
+        
+        # Joint limits
+        self.lower_limits = np.array([j.lower_limit for j in self.revolute_joints], dtype=np.float64)
+        self.upper_limits = np.array([j.upper_limit for j in self.revolute_joints], dtype=np.float64)
+        self.effort_limits = np.array([j.effort_limit for j in self.revolute_joints], dtype=np.float64)
+        
+        # Sinusoidal motion pattern, different frequency for each joint
+        self.frequencies = 0.3 + np.arange(num_joints, dtype=np.float64) * 0.1
+        self.omega = 2 * np.pi * self.frequencies
+        self.amplitudes = motion_amplitudes(self.revolute_joints)
+        self.centers = (self.lower_limits + self.upper_limits) / 2.0
+        self._velocity_gain = self.amplitudes * self.omega
+        self._acceleration_gain = -self.amplitudes * self.omega ** 2
+        
+        # Noise standard deviations for (angle, velocity)
+        self.noise_std = np.array([[0.01], [0.05]])
+        self._noise_shape = (2, num_joints)
+        self.rng = np.random.default_rng(seed)
+        
+        # Rigid-body torques from the URDF inertials (recursive Newton-Euler)
+        # plus viscous friction; unit inertia if the URDF has no masses
+        self.dynamics = InverseDynamics(urdf_parser)
+        if not np.any(self.dynamics.masses > 0.0):
+            self.dynamics = None
+        self.friction_coeff = 0.1
+        
+        # Joint state arrays
+        self.angles = np.zeros(num_joints, dtype=np.float64)  # radians
+        self.velocities = np.zeros(num_joints, dtype=np.float64)  # rad/s
+        self.accelerations = np.zeros(num_joints, dtype=np.float64)  # rad/s^2
+        self.torques = np.zeros(num_joints, dtype=np.float64)  # Nm
+        self._phase = np.zeros(num_joints, dtype=np.float64)
+        self._sin = np.zeros(num_joints, dtype=np.float64)
         
         # Simulation parameters
-        self.start_time = time.time()
+        self.clock = clock or RealClock()
+        self.start_time = self.clock.now()
         self.sim_time = 0.0
         
         # Initialize joint states
@@ -47,80 +105,80 @@ class PhysicsSimulator:
         
     def _initialize_joints(self):
         """Initialize joint states to neutral positions."""
-        for joint in self.revolute_joints:
-            # Start at midpoint of joint range
-            mid_angle = (joint.lower_limit + joint.upper_limit) / 2.0
-            
-            self.joint_states[joint.name] = JointState(
-                name=joint.name,
-                angle=mid_angle,
-                velocity=0.0,
-                acceleration=0.0,
-                torque=0.0
-            )
+        # Start at midpoint of joint range
+        self.angles[:] = self.centers
+        self.velocities.fill(0.0)
+        self.accelerations.fill(0.0)
+        self.torques.fill(0.0)
     
     def step(self):
         """Advance simulation by one timestep."""
         self.sim_time += self.dt
-        elapsed = time.time() - self.start_time
+        elapsed = self.clock.now() - self.start_time
+        
+        # Sinusoidal trajectory and its derivatives for all joints at once
+        np.multiply(self.omega, elapsed, out=self._phase)
+        sin = np.sin(self._phase, out=self._sin)
+        cos = np.cos(self._phase)
+        
+        # Small random noise on angle and velocity
+        noise = self.rng.normal(0.0, self.noise_std, size=self._noise_shape)
         
-        # Update each joint with sinusoidal motion pattern
-        for i, joint in enumerate(self.revolute_joints):
-            state = self.joint_states[joint.name]
-            
-            # Different frequency for each joint to create realistic motion
-            freq = 0.3 + i * 0.1
-            amplitude = (joint.upper_limit - joint.lower_limit) * 0.3
-            center = (joint.lower_limit + joint.upper_limit) / 2.0
-            
-            # Position (sinusoidal trajectory)
-            target_angle = center + amplitude * np.sin(2 * np.pi * freq * elapsed)
-            
-            # Velocity (derivative of position)
-            target_velocity = amplitude * 2 * np.pi * freq * np.cos(2 * np.pi * freq * elapsed)
-            
-            # Acceleration (derivative of velocity)
-            target_acceleration = -amplitude * (2 * np.pi * freq) ** 2 * np.sin(2 * np.pi * freq * elapsed)
-            
-            # Add small random noise
-            noise_angle = np.random.normal(0, 0.01)
-            noise_velocity = np.random.normal(0, 0.05)
-            
-            # Update state
-            state.angle = np.clip(target_angle + noise_angle, joint.lower_limit, joint.upper_limit)
-            state.velocity = target_velocity + noise_velocity
-            state.acceleration = target_acceleration
-            
-            # Calculate torque (simplified dynamics: torque = I * alpha + friction)
-            # Assume unit inertia and simple friction model
-            friction_coeff = 0.1
-            state.torque = state.acceleration + friction_coeff * state.velocity
-            
-            # Clip torque to joint limits
-            state.torque = np.clip(state.torque, -joint.effort_limit, joint.effort_limit)
+        np.clip(self.centers + self.amplitudes * sin + noise[0],
+                self.lower_limits, self.upper_limits, out=self.angles)
+        np.add(self._velocity_gain * cos, noise[1], out=self.velocities)
+        np.multiply(self._acceleration_gain, sin, out=self.accelerations)
+        
+        # Torque from inverse dynamics, clipped to joint effort limits
+        if self.dynamics is not None:
+            rigid_body = self.dynamics.torques(self.angles, self.velocities, self.accelerations)
+        else:
+            rigid_body = self.accelerations
+        np.clip(rigid_body + self.friction_coeff * self.velocities,
+                -self.effort_limits, self.effort_limits, out=self.torques)
+    
+    @property
+    def joint_states(self) -> Dict[str, JointState]:
+        """Joint states keyed by name (materialized on demand)."""
+        return {state.name: state for state in self.get_joint_states()}
     
     def get_joint_states(self) -> List[JointState]:
         """Get current states of all joints."""
-        return list(self.joint_states.values())
+        return [
+            JointState(name=name, angle=angle, velocity=velocity,
+                       acceleration=acceleration, torque=torque)
+            for name, angle, velocity, acceleration, torque in zip(
+                self.joint_names,
+                self.angles.tolist(),
+                self.velocities.tolist(),
+                self.accelerations.tolist(),
+                self.torques.tolist()
+            )
+        ]
     
     def get_state_dict(self) -> Dict:
         """Get joint states as dictionary."""
         return {
-            'timestamp': time.time(),
+            'timestamp': self.clock.time(),
             'sim_time': self.sim_time,
             'joints': [
                 {
-                    'name': state.name,
-                    'angle': float(state.angle),
-                    'velocity': float(state.velocity),
-                    'torque': float(state.torque),
+                    'name': name,
+                    'angle': angle,
+                    'velocity': velocity,
+                    'torque': torque,
                 }
-                for state in self.joint_states.values()
+                for name, angle, velocity, torque in zip(
+                    self.joint_names,
+                    self.angles.tolist(),
+                    self.velocities.tolist(),
+                    self.torques.tolist()
+                )
             ]
         }
     
     def reset(self):
         """Reset simulation to initial state."""
-        self.start_time = time.time()
+        self.start_time = self.clock.now()
         self.sim_time = 0.0
         self._initialize_joints()
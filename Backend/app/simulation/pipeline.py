@@ -0,0 +1,244 @@
+"""Multi-rate scheduling and timing for the simulation loop stages."""
+import time
+import numpy as np
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from .clock import Clock, RealClock
+
+
+@dataclass
+class StageStats:
+    """Call count and accumulated run time of one pipeline stage."""
+    rate_hz: float
+    decimation: int
+    calls: int = 0
+    total_seconds: float = 0.0
+
+    @property
+    def mean_seconds(self) -> float:
+        """Average run time per call."""
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+
+class MultiRatePipeline:
+    """
+    Runs each stage every N-th tick of the base (physics) rate.
+
+    Stage rates are rounded to an integer decimation of the base rate, so all
+    stages stay phase-locked to the physics tick.
+    """
+
+    def __init__(self, base_frequency: float, stage_frequencies: Dict[str, float]):
+        """
+        Initialize pipeline.
+
+        Args:
+            base_frequency: Tick rate of the loop in Hz
+            stage_frequencies: Requested rate of each stage in Hz
+        """
+        self.base_frequency = base_frequency
+        self.stages: Dict[str, StageStats] = {}
+        for name, frequency in stage_frequencies.items():
+            decimation = max(1, int(round(base_frequency / frequency)))
+            self.stages[name] = StageStats(rate_hz=base_frequency / decimation, decimation=decimation)
+        self.tick = 0
+
+    def advance(self):
+        """Start the next base tick."""
+        self.tick += 1
+
+    def due(self, stage: str) -> bool:
+        """Whether ``stage`` runs on the current tick."""
+        return self.tick % self.stages[stage].decimation == 0
+
+    @contextmanager
+    def measure(self, stage: str):
+        """Time one run of ``stage``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats = self.stages[stage]
+            stats.calls += 1
+            stats.total_seconds += time.perf_counter() - start
+
+    def report(self) -> dict:
+        """
+        Per-stage rates and timings, and the CPU saved by decimation.
+
+        Savings compare the measured cost per simulated second against running
+        every stage at the base rate.
+        """
+        stages = {}
+        cost = 0.0
+        full_rate_cost = 0.0
+        for name, stats in self.stages.items():
+            stages[name] = {
+                "rate_hz": stats.rate_hz,
+                "decimation": stats.decimation,
+                "calls": stats.calls,
+                "total_ms": stats.total_seconds * 1000,
+                "mean_ms": stats.mean_seconds * 1000,
+            }
+            cost += stats.mean_seconds * stats.rate_hz
+            full_rate_cost += stats.mean_seconds * self.base_frequency
+
+        return {
+            "base_frequency_hz": self.base_frequency,
+            "ticks": self.tick,
+            "stages": stages,
+            "cpu_ms_per_second": cost * 1000,
+            "full_rate_cpu_ms_per_second": full_rate_cost * 1000,
+            "cpu_savings_percent": 100.0 * (1.0 - cost / full_rate_cost) if full_rate_cost > 0 else 0.0,
+        }
+
+    def reset(self):
+        """Restart the tick count and clear timings."""
+        self.tick = 0
+        for stats in self.stages.values():
+            stats.calls = 0
+            stats.total_seconds = 0.0
+
+
+class FixedRateScheduler:
+    """
+    Absolute-deadline tick clock for a fixed-rate loop.
+
+    Tick k is due at start + k * period, so time spent working never shifts
+    later ticks the way sleeping one period after the work does. When the loop
+    falls behind, the ``catch_up`` policy runs missed ticks back to back (at
+    most ``max_catch_up`` of them, dropping the rest), and the ``skip`` policy
+    drops all of them and waits for the next deadline. Either way ticks stay
+    on the uniform grid, and ``timestamp()`` gives each one's scheduled time.
+
+    Deadlines are kept on ``clock``; with a virtual clock, waiting advances
+    simulated time instead of sleeping, so the loop runs faster than real time.
+    """
+
+    POLICIES = ('catch_up', 'skip')
+
+    def __init__(self, frequency: float, policy: str = 'catch_up', max_catch_up: int = 10,
+                 window: int = 1000, clock: Optional[Clock] = None):
+        """
+        Initialize scheduler.
+
+        Args:
+            frequency: Tick rate in Hz
+            policy: 'catch_up' or 'skip', what to do with missed ticks
+            max_catch_up: Most missed ticks run back to back under 'catch_up'
+            window: Recent ticks kept for the jitter statistics
+            clock: Time source for deadlines and waiting (default: wall clock)
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown schedule policy: {policy} (expected one of {self.POLICIES})")
+        self.frequency = frequency
+        self.period = 1.0 / frequency
+        self.policy = policy
+        self.max_catch_up = max_catch_up
+        self.clock = clock or RealClock()
+        self._lateness = np.zeros(window)
+        self._clear()
+
+    def reset(self):
+        """
+        Restart the tick grid at the next tick and clear statistics.
+
+        Safe to call from another thread while ``wait()`` is pending: the
+        request is only recorded here, and the waiting loop re-anchors the
+        grid itself when its sleep ends.
+        """
+        self._reset_pending = True
+
+    def _clear(self):
+        """Drop the tick grid and statistics; the next ``wait()`` anchors a new grid."""
+        self._reset_pending = False
+        self.ticks = 0  # Ticks scheduled so far, executed or skipped
+        self.skipped = 0
+        self.overruns = 0
+        self._start = None
+        self._epoch_start = None
+        self._wall_start = None
+        self._recorded = 0
+
+    @property
+    def deadline(self) -> float:
+        """Clock time at which the next tick is due."""
+        return self._start + self.ticks * self.period
+
+    def _anchor(self, now: float):
+        """Start the tick grid at clock time ``now``."""
+        self._start = now
+        self._epoch_start = self.clock.time()
+        self._wall_start = time.perf_counter()
+
+    def timestamp(self, tick: int) -> float:
+        """Scheduled epoch time of a tick, on the scheduler's clock."""
+        return self._epoch_start + tick * self.period
+
+    async def wait(self) -> int:
+        """
+        Wait until the next tick is due.
+
+        Returns:
+            Index of the tick to run
+        """
+        if self._reset_pending:
+            self._clear()
+        now = self.clock.now()
+        if self._start is None:
+            self._anchor(now)
+        elif now > self.deadline:
+            # The previous tick's work ran into this tick's slot
+            self.overruns += 1
+            missed = int((now - self.deadline) // self.period)
+            drop = missed if self.policy == 'skip' else max(0, missed - self.max_catch_up)
+            self.ticks += drop
+            self.skipped += drop
+
+        delay = self.deadline - now
+        if delay > 0:
+            await self.clock.sleep(delay)
+            if self._reset_pending:
+                # Reset while sleeping: start the new grid with this tick
+                self._clear()
+                self._anchor(self.clock.now())
+
+        self._lateness[self._recorded % len(self._lateness)] = self.clock.now() - self.deadline
+        self._recorded += 1
+        tick = self.ticks
+        self.ticks += 1
+        return tick
+
+    def report(self) -> dict:
+        """
+        Achieved rate, dropped and overrun ticks, and start-time jitter.
+
+        Jitter is how late each tick started relative to its deadline, over
+        the most recent ``window`` ticks. Speedup is clock time elapsed per
+        wall second (1 on a real clock).
+        """
+        executed = self.ticks - self.skipped
+        elapsed = self.clock.now() - self._start if self._start is not None else 0.0
+        wall_elapsed = time.perf_counter() - self._wall_start if self._start is not None else 0.0
+        lateness = self._lateness[:min(self._recorded, len(self._lateness))] * 1000
+        jitter = {"mean": 0.0, "std": 0.0, "p99": 0.0, "max": 0.0}
+        if lateness.size:
+            jitter = {
+                "mean": float(lateness.mean()),
+                "std": float(lateness.std()),
+                "p99": float(np.percentile(lateness, 99)),
+                "max": float(lateness.max()),
+            }
+        return {
+            "frequency_hz": self.frequency,
+            "policy": self.policy,
+            "ticks": self.ticks,
+            "executed_ticks": executed,
+            "skipped_ticks": self.skipped,
+            "overruns": self.overruns,
+            "achieved_rate_hz": executed / elapsed if elapsed > 0 else 0.0,
+            "speedup": elapsed / wall_elapsed if wall_elapsed > 0 else 0.0,
+            "jitter_ms": jitter,
+        }
@@ -4,122 +4,344 @@ Replays data from a CSV file instead of generating synthetic physics.
 """
 import pandas as pd
 import numpy as np
-import time
-from typing import Dict, List
-from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
 from pathlib import Path
 
 from .urdf_parser import URDFParser
-
-@dataclass
-class JointState:
-    """Current state of a joint."""
-    name: str
-    angle: float  # radians
-    velocity: float  # rad/s
-    acceleration: float  # rad/s^2
-    torque: float  # Nm
+from .physics_sim import JointState
+from .replay_stream import StreamingReplaySource
+from .replay_format import RECORDING_SUFFIX, open_recording
+from .interpolation import INTERPOLATION_METHODS, resample, uniform_grid
+from ..config import settings
 
 
 class RealDataSimulator:
-    """Simulator that replays real data from a CSV file."""
-    
-    def __init__(self, urdf_parser: URDFParser, data_path: Path, frequency: float = 10.0):
+    """
+    Simulator that replays real data from a CSV file or a binary recording.
+
+    The recording is compiled once at load time into contiguous float64
+    (steps x joints) arrays of angles (radians), velocities, accelerations
+    and torques, so each step only indexes a row. Large recordings are
+    streamed in chunks and compiled one chunk at a time. Binary ``.npy``
+    recordings (see replay_format) are already compiled and memory-mapped.
+    """
+
+    def __init__(self, urdf_parser: URDFParser, data_path: Path, frequency: float = 10.0,
+                 streaming: Optional[bool] = None, chunk_rows: Optional[int] = None,
+                 interpolation: Optional[str] = None, speed: Optional[float] = None):
         """
         Initialize simulator with real data.
-        
+
         Args:
             urdf_parser: Parsed URDF data
-            data_path: Path to CSV file containing real data
+            data_path: Path to CSV file or binary .npy recording
             frequency: Simulation frequency in Hz
+            streaming: Replay in bounded chunks instead of loading the whole
+                file (default: only for files above replay_stream_threshold_mb)
+            chunk_rows: Rows per streamed chunk (default from settings)
+            interpolation: Resample the recording onto the simulation rate
+                using its timestamps: none, linear or cubic (default from settings)
+            speed: Replay speed multiplier for resampled replay (default from settings)
         """
         self.urdf_parser = urdf_parser
         self.frequency = frequency
         self.dt = 1.0 / frequency
         self.data_path = data_path
-        
+        self.streaming = streaming
+        self.chunk_rows = chunk_rows or settings.replay_chunk_rows
+        self.source: Optional[StreamingReplaySource] = None
+        self._chunk_pos = 0
+        self.interpolation = interpolation or settings.replay_interpolation
+        self.speed = speed or settings.replay_speed
+        if self.interpolation not in INTERPOLATION_METHODS:
+            raise ValueError(f"Unknown interpolation method: {self.interpolation}")
+
         self.revolute_joints = urdf_parser.get_revolute_joints()
-        self.joint_states: Dict[str, JointState] = {}
-        
-        self.data = None
+        self.joint_names: List[str] = [joint.name for joint in self.revolute_joints]
+        num_joints = len(self.revolute_joints)
+        self.effort_limits = np.array([j.effort_limit for j in self.revolute_joints], dtype=np.float64)
+
+        # Simplified dynamics used to derive torque (unit inertia + friction)
+        self.friction_coeff = 0.1
+
+        # Column name per joint, resolved once at load time (None = not recorded)
+        self.column_map: List[Optional[str]] = [None] * num_joints
+
+        # Compiled trajectory, shape (steps, joints)
+        empty = np.zeros((0, num_joints), dtype=np.float64)
+        self.angle_data = empty
+        self.velocity_data = empty
+        self.acceleration_data = empty
+        self.torque_data = empty
+        self.timestamp_data: Optional[np.ndarray] = None
+
         self.current_index = 0
         self.sim_time = 0.0
-        
+
         self._load_data()
+        if self.interpolation != "none":
+            self._resample()
         self._initialize_joints()
-        
+
+    @property
+    def num_steps(self) -> int:
+        """Number of recorded timesteps."""
+        if self.source is not None:
+            return self.source.num_rows
+        return self.angle_data.shape[0]
+
+    def _resolve_columns(self, columns) -> List[Optional[str]]:
+        """Map each revolute joint to a CSV column."""
+        columns = set(columns)
+        column_map = []
+        for i, joint in enumerate(self.revolute_joints):
+            # Try exact name, then 'joint_N' (1-based index), then 'jN'
+            for candidate in (joint.name, f"joint_{i+1}", f"j{i+1}"):
+                if candidate in columns:
+                    column_map.append(candidate)
+                    break
+            else:
+                column_map.append(None)
+        return column_map
+
     def _load_data(self):
-        """Load data from CSV file."""
-        if self.data_path.exists():
-            try:
-                self.data = pd.read_csv(self.data_path)
-                print(f"Loaded real data from {self.data_path}: {len(self.data)} rows")
-                # print columns to help debugging
-                print(f"Columns: {self.data.columns.tolist()}")
-            except Exception as e:
-                print(f"Error loading real data: {e}")
-                self.data = None
-        else:
+        """Load data from CSV file and compile it into trajectory arrays."""
+        if not self.data_path.exists():
             print(f"Real data file not found: {self.data_path}")
-            self.data = None
+            return
+
+        if self.data_path.suffix == RECORDING_SUFFIX:
+            self._open_binary()
+            return
+
+        size_mb = self.data_path.stat().st_size / (1024 * 1024)
+        if self.streaming is None:
+            self.streaming = size_mb >= settings.replay_stream_threshold_mb
+        if self.streaming:
+            self._open_stream()
+            return
+
+        try:
+            data = pd.read_csv(self.data_path)
+            print(f"Loaded real data from {self.data_path}: {len(data)} rows")
+            # print columns to help debugging
+            print(f"Columns: {data.columns.tolist()}")
+        except Exception as e:
+            print(f"Error loading real data: {e}")
+            return
+
+        self.column_map = self._resolve_columns(data.columns)
+        columns = self._used_columns(data.columns)
+        (self.angle_data, self.velocity_data, self.acceleration_data,
+         self.torque_data, self.timestamp_data) = self._compile(data[columns].to_numpy(dtype=np.float64), columns)
+
+    def _open_binary(self):
+        """Memory-map a precompiled binary recording (no copy, shared page cache)."""
+        try:
+            data = open_recording(self.data_path)
+        except Exception as e:
+            print(f"Error loading binary real data: {e}")
+            return
+
+        if data['angle'].shape[1] != len(self.revolute_joints):
+            print(f"Binary recording has {data['angle'].shape[1]} joints, "
+                  f"URDF has {len(self.revolute_joints)}; ignoring {self.data_path}")
+            return
+
+        self.angle_data = data['angle']
+        self.velocity_data = data['velocity']
+        self.acceleration_data = data['acceleration']
+        self.timestamp_data = data['timestamp']
+        # Torque is derived per row so the mapping stays read-only and shared
+        self.torque_data = None
+        print(f"Memory-mapped real data from {self.data_path}: {len(data)} rows")
+
+    def _used_columns(self, columns) -> List[str]:
+        """Columns needed for replay: the mapped joints plus timestamps."""
+        wanted = set(c for c in self.column_map if c is not None)
+        if 'timestamp' in columns:
+            wanted.add('timestamp')
+        return [c for c in columns if c in wanted]
+
+    def _open_stream(self):
+        """Open the recording as a chunked stream instead of loading it whole."""
+        try:
+            self.source = StreamingReplaySource(self.data_path, chunk_rows=self.chunk_rows)
+            self.column_map = self._resolve_columns(self.source.columns)
+            self.source.open(self._used_columns(self.source.columns))
+            print(f"Streaming real data from {self.data_path}: {self.source.num_rows} rows")
+            print(f"Columns: {self.source.columns}")
+        except Exception as e:
+            print(f"Error opening real data stream: {e}")
+            self.source = None
+
+    def _compile(self, values: np.ndarray, columns: List[str]):
+        """Convert recorded joint columns to radians and precompute derivatives."""
+        index = {column: i for i, column in enumerate(columns)}
+        angles = np.zeros((values.shape[0], len(self.revolute_joints)), dtype=np.float64)
+        for i, column in enumerate(self.column_map):
+            if column is not None:
+                # Assuming data is in DEGREES, convert to RADIANS
+                angles[:, i] = np.deg2rad(values[:, index[column]])
+
+        timestamps = values[:, index['timestamp']] if 'timestamp' in index else None
+        velocities, accelerations, torques = self._derive(angles, timestamps)
+        return angles, velocities, accelerations, torques, timestamps
+
+    def _derive(self, angles: np.ndarray, timestamps: Optional[np.ndarray] = None):
+        """Finite-difference velocity and acceleration, and torque from them."""
+        num_steps = angles.shape[0]
+        if num_steps < 2:
+            zeros = np.zeros_like(angles)
+            return zeros, zeros.copy(), zeros.copy()
+
+        # Use recorded timestamps when they are strictly increasing
+        spacing = self.dt
+        if timestamps is not None and np.all(np.diff(timestamps) > 0):
+            spacing = timestamps
+
+        velocities = np.gradient(angles, spacing, axis=0)
+        accelerations = np.gradient(velocities, spacing, axis=0)
+        return velocities, accelerations, self._torque(velocities, accelerations)
+
+    def _torque(self, velocities: np.ndarray, accelerations: np.ndarray) -> np.ndarray:
+        """Torque from simplified dynamics, clipped to joint effort limits."""
+        return np.clip(accelerations + self.friction_coeff * velocities,
+                       -self.effort_limits, self.effort_limits)
+
+    def _resample(self):
+        """
+        Precompute the recording on a uniform grid at the simulation rate.
+
+        Each tick advances ``dt * speed`` seconds of recorded time, so a 10 Hz
+        recording can be replayed at 100 Hz, or much faster than real time,
+        with no per-tick interpolation. Streamed and memory-mapped recordings
+        are replayed row by row instead: resampling would materialize the
+        whole upsampled recording in private memory.
+        """
+        if self.source is not None:
+            print("Resampling is not supported for streamed recordings; replaying row by row")
+            return
+        if isinstance(self.angle_data, np.memmap):
+            print("Resampling is not supported for memory-mapped recordings; replaying row by row")
+            return
+
+        timestamps = self.timestamp_data
+        if timestamps is None or len(timestamps) < 2 or not np.all(np.diff(timestamps) > 0):
+            print("Recording has no increasing timestamps; replaying row by row")
+            return
+
+        grid = uniform_grid(np.asarray(timestamps), self.dt * self.speed)
+        self.angle_data = resample(timestamps, self.angle_data, grid, self.interpolation)
+        self.velocity_data = resample(timestamps, self.velocity_data, grid, self.interpolation)
+        self.acceleration_data = resample(timestamps, self.acceleration_data, grid, self.interpolation)
+        self.torque_data = self._torque(self.velocity_data, self.acceleration_data)
+        self.timestamp_data = grid
+        print(f"Resampled recording to {len(grid)} steps "
+              f"({self.interpolation}, {self.frequency} Hz, {self.speed}x speed)")
 
     def _initialize_joints(self):
         """Initialize joint states."""
-        for joint in self.revolute_joints:
-            self.joint_states[joint.name] = JointState(
-                name=joint.name,
-                angle=0.0,
-                velocity=0.0,
-                acceleration=0.0,
-                torque=0.0
-            )
-            
+        zeros = np.zeros(len(self.revolute_joints), dtype=np.float64)
+        self.angles = zeros
+        self.velocities = zeros
+        self.accelerations = zeros
+        self.torques = zeros
+
+    def _load_chunk(self):
+        """Compile the next streamed chunk into the trajectory arrays."""
+        chunk = self.source.next_chunk()
+        rows = slice(chunk.lead, chunk.lead + chunk.num_rows)
+        compiled = self._compile(chunk.values, chunk.columns)
+        (self.angle_data, self.velocity_data, self.acceleration_data,
+         self.torque_data, self.timestamp_data) = \
+            (None if array is None else np.ascontiguousarray(array[rows]) for array in compiled)
+        self._chunk_pos = 0
+
+    def iter_compiled(self) -> Iterator[Tuple[int, Tuple[np.ndarray, ...]]]:
+        """
+        Iterate once over the whole recording in compiled form.
+
+        Streamed recordings are read through a separate pass over the file,
+        so this can run alongside step() on another thread.
+
+        Yields:
+            (start_row, (angles, velocities, accelerations, torques, timestamps))
+            blocks in row order; a single block unless streaming.
+        """
+        if self.source is None:
+            torques = self.torque_data
+            if torques is None:
+                torques = self._torque(self.velocity_data, self.acceleration_data)
+            yield 0, (self.angle_data, self.velocity_data, self.acceleration_data,
+                      torques, self.timestamp_data)
+            return
+
+        for chunk in self.source.iter_chunks():
+            rows = slice(chunk.lead, chunk.lead + chunk.num_rows)
+            compiled = self._compile(chunk.values, chunk.columns)
+            yield chunk.start_row, tuple(None if array is None else array[rows] for array in compiled)
+
     def step(self):
         """Advance simulation by one timestep (read next row)."""
         self.sim_time += self.dt
-        
-        if self.data is not None and not self.data.empty:
-            # Loop through data
-            row_idx = self.current_index % len(self.data)
-            row = self.data.iloc[row_idx]
-            
-            # Update joints from CSV columns
-            for i, joint in enumerate(self.revolute_joints):
-                angle = 0.0
-                found = False
-                
-                # Try exact name match
-                if joint.name in row:
-                    angle = row[joint.name]
-                    found = True
-                # Try 'joint_N' format (1-based index)
-                elif f"joint_{i+1}" in row:
-                    angle = row[f"joint_{i+1}"]
-                    found = True
-                # Try 'jN' format
-                elif f"j{i+1}" in row:
-                    angle = row[f"j{i+1}"]
-                    found = True
-                
-                if found:
-                    state = self.joint_states[joint.name]
-                    # Assuming data is in DEGREES, convert to RADIANS
-                    state.angle = np.deg2rad(float(angle))
-                    
-                    # We could estimate velocity if we wanted, but for now 0
-                    state.velocity = 0.0
-                    state.torque = 0.0
-            
+
+        if self.num_steps > 0:
+            if self.source is not None:
+                # Streaming: rows index into the current chunk
+                if self._chunk_pos >= self.angle_data.shape[0]:
+                    self._load_chunk()
+                row_idx = self._chunk_pos
+                self._chunk_pos += 1
+            else:
+                # Loop through data; rows are views into the compiled arrays
+                row_idx = self.current_index % self.num_steps
+
+            self.angles = self.angle_data[row_idx]
+            self.velocities = self.velocity_data[row_idx]
+            self.accelerations = self.acceleration_data[row_idx]
+            if self.torque_data is not None:
+                self.torques = self.torque_data[row_idx]
+            else:
+                self.torques = self._torque(self.velocities, self.accelerations)
+
             self.current_index += 1
         else:
             # Fallback if no data
             pass
 
+    def seek(self, row: int):
+        """Jump replay to a row index (the next step() replays that row)."""
+        if self.source is not None:
+            self.source.seek(row)
+            self._chunk_pos = self.angle_data.shape[0]
+        self.current_index = row % self.num_steps if self.num_steps else 0
+
+    @property
+    def joint_states(self) -> Dict[str, JointState]:
+        """Joint states keyed by name (materialized on demand)."""
+        return {state.name: state for state in self.get_joint_states()}
+
     def get_joint_states(self) -> List[JointState]:
         """Get current state of all joints."""
-        return list(self.joint_states.values())
-        
+        return [
+            JointState(name=name, angle=angle, velocity=velocity,
+                       acceleration=acceleration, torque=torque)
+            for name, angle, velocity, acceleration, torque in zip(
+                self.joint_names,
+                self.angles.tolist(),
+                self.velocities.tolist(),
+                self.accelerations.tolist(),
+                self.torques.tolist()
+            )
+        ]
+
     def reset(self):
         """Reset simulation to beginning."""
-        self.current_index = 0
+        self.seek(0)
         self.sim_time = 0.0
+
+    def close(self):
+        """Stop background streaming, if any."""
+        if self.source is not None:
+            self.source.close()
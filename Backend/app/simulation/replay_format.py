@@ -0,0 +1,111 @@
+"""Binary replay format for recorded trajectories.
+
+A recording is a single ``.npy`` file holding a structured array with one
+record per timestep::
+
+    timestamp     float64
+    angle         float64[joints]  (radians)
+    velocity      float64[joints]  (rad/s)
+    acceleration  float64[joints]  (rad/s^2)
+
+Joints follow the URDF's revolute joint order. The file is opened with
+``mmap_mode='r'`` so startup does no parsing and every process replaying
+the same file shares the OS page cache.
+
+Convert a CSV recording with::
+
+    python -m app.simulation.replay_format data/real_data.csv [output.npy]
+"""
+import argparse
+import os
+import numpy as np
+from pathlib import Path
+from typing import Optional
+
+RECORDING_SUFFIX = ".npy"
+
+
+def recording_dtype(num_joints: int) -> np.dtype:
+    """Structured dtype of one recording row."""
+    return np.dtype([
+        ('timestamp', '<f8'),
+        ('angle', '<f8', (num_joints,)),
+        ('velocity', '<f8', (num_joints,)),
+        ('acceleration', '<f8', (num_joints,)),
+    ])
+
+
+def open_recording(path: Path) -> np.ndarray:
+    """Memory-map a binary recording read-only."""
+    data = np.load(path, mmap_mode='r')
+    if data.dtype.names is None or 'angle' not in data.dtype.names:
+        raise ValueError(f"Not a replay recording: {path}")
+    return data
+
+
+def convert_recording(csv_path: Path, output_path: Optional[Path] = None, urdf_parser=None,
+                      frequency: Optional[float] = None, chunk_rows: Optional[int] = None) -> Path:
+    """
+    Convert a CSV recording to the binary replay format.
+
+    The CSV is streamed in chunks and written through a memory map, so
+    recordings larger than RAM can be converted.
+
+    Args:
+        csv_path: CSV recording (e.g. data/real_data.csv)
+        output_path: Output file (default: csv_path with .npy suffix)
+        urdf_parser: Parsed URDF (default: parse settings.urdf_path)
+        frequency: Replay frequency used when the CSV has no timestamps
+        chunk_rows: Rows per conversion chunk (default from settings)
+
+    Returns:
+        Path of the written recording
+    """
+    from ..config import settings
+    from .urdf_parser import URDFParser
+    from .real_data_sim import RealDataSimulator
+
+    csv_path = Path(csv_path)
+    output_path = Path(output_path) if output_path else csv_path.with_suffix(RECORDING_SUFFIX)
+    if urdf_parser is None:
+        urdf_parser = URDFParser(settings.urdf_path, cache_dir=settings.cache_dir)
+        if not urdf_parser.parse():
+            raise RuntimeError("Failed to parse URDF file")
+    if frequency is None:
+        frequency = settings.simulation_frequency
+
+    simulator = RealDataSimulator(urdf_parser, csv_path, frequency,
+                                  streaming=True, chunk_rows=chunk_rows)
+    try:
+        if simulator.source is None:
+            raise ValueError(f"Could not read recording: {csv_path}")
+
+        num_joints = len(simulator.revolute_joints)
+        # Write next to the target and rename, so readers never see a partial file
+        tmp_path = output_path.with_name(output_path.name + ".tmp")
+        out = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=recording_dtype(num_joints),
+                                        shape=(simulator.num_steps,))
+        for start, (angles, velocities, accelerations, _, timestamps) in simulator.iter_compiled():
+            rows = slice(start, start + angles.shape[0])
+            if timestamps is None:
+                timestamps = np.arange(rows.start, rows.stop) * simulator.dt
+            out['timestamp'][rows] = timestamps
+            out['angle'][rows] = angles
+            out['velocity'][rows] = velocities
+            out['acceleration'][rows] = accelerations
+        out.flush()
+        del out
+        os.replace(tmp_path, output_path)
+    finally:
+        simulator.close()
+
+    print(f"Wrote binary recording {output_path} ({simulator.num_steps} rows, {num_joints} joints)")
+    return output_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a CSV recording to the binary replay format")
+    parser.add_argument("csv_path", type=Path)
+    parser.add_argument("output_path", type=Path, nargs="?")
+    args = parser.parse_args()
+    convert_recording(args.csv_path, args.output_path)
@@ -0,0 +1,224 @@
+"""Chunked streaming reader for large telemetry recordings.
+
+Reads a CSV recording in bounded chunks on a background prefetch thread so
+memory stays constant regardless of file size. A sparse byte-offset index
+(one entry every ``index_stride`` rows) is built on first open and makes
+seeking to any row cheap.
+"""
+import queue
+import threading
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+
+@dataclass
+class ReplayChunk:
+    """A block of consecutive rows read from the recording."""
+    start_row: int  # Index of the first row belonging to the chunk
+    num_rows: int  # Rows belonging to the chunk
+    lead: int  # Halo rows before start_row included in values
+    values: np.ndarray  # (lead + num_rows + trailing halo, columns) float64
+    columns: List[str]
+
+
+@dataclass
+class _PrefetchError:
+    """Placed on the queue when the prefetch thread fails."""
+    error: Exception
+
+
+class StreamingReplaySource:
+    """Bounded-memory, looping CSV row source with background prefetch."""
+
+    def __init__(self, path: Path, chunk_rows: int = 65536, index_stride: Optional[int] = None,
+                 halo: int = 2, block_bytes: int = 16 * 1024 * 1024, timeout: float = 5.0):
+        """
+        Initialize source and read the CSV header.
+
+        Args:
+            path: Path to CSV recording
+            chunk_rows: Rows per chunk handed to the consumer
+            index_stride: Rows between sparse index entries (default: chunk_rows)
+            halo: Neighbouring rows read on each side of a chunk so finite
+                differences at chunk edges match a whole-file computation
+            block_bytes: Read size used while building the byte-offset index
+            timeout: Longest wait in next_chunk() for the prefetch thread
+        """
+        self.path = Path(path)
+        self.chunk_rows = chunk_rows
+        self.index_stride = index_stride or chunk_rows
+        self.halo = halo
+        self.block_bytes = block_bytes
+        self.timeout = timeout
+
+        with open(self.path, 'rb') as f:
+            header = f.readline()
+            self._data_start = f.tell()
+        self.columns: List[str] = header.decode('utf-8').strip().split(',')
+
+        self.offsets: Optional[np.ndarray] = None
+        self.num_rows = 0
+        self.usecols: List[str] = list(self.columns)
+
+        self._queue: Optional[queue.Queue] = None
+        self._stop: Optional[threading.Event] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _build_index(self):
+        """Scan the file once, recording the byte offset of every stride-th row."""
+        offsets = []
+        newlines = 0
+        last_newline = -1
+        position = self._data_start
+        stride = self.index_stride
+
+        with open(self.path, 'rb') as f:
+            f.seek(self._data_start)
+            while True:
+                block = f.read(self.block_bytes)
+                if not block:
+                    break
+                positions = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == ord('\n'))
+                if positions.size:
+                    # Row k starts right after the newline ending row k-1
+                    row_numbers = newlines + 1 + np.arange(positions.size)
+                    starts = positions[row_numbers % stride == 0] + position + 1
+                    offsets.append(starts)
+                    newlines += positions.size
+                    last_newline = position + int(positions[-1])
+                position += len(block)
+
+        file_size = position
+        num_rows = newlines
+        if file_size > self._data_start and last_newline != file_size - 1:
+            # Last row has no trailing newline
+            num_rows += 1
+
+        starts = np.concatenate([np.array([self._data_start], dtype=np.int64)] + offsets)
+        self.offsets = starts[starts < file_size] if num_rows else starts[:0]
+        self.num_rows = num_rows
+
+    def open(self, usecols: Optional[List[str]] = None):
+        """
+        Build the row index (first open only) and start prefetching from row 0.
+
+        Args:
+            usecols: Columns to parse (default: all)
+        """
+        if usecols is not None:
+            self.usecols = [c for c in self.columns if c in set(usecols)]
+        if self.offsets is None:
+            self._build_index()
+        self.seek(0)
+
+    def _read_rows(self, handle, start: int, count: int) -> np.ndarray:
+        """Parse ``count`` rows starting at row ``start``."""
+        block = start // self.index_stride
+        handle.seek(int(self.offsets[block]))
+        frame = pd.read_csv(
+            handle,
+            header=None,
+            names=self.columns,
+            usecols=self.usecols,
+            skiprows=start - block * self.index_stride,
+            nrows=count,
+        )
+        return frame[self.usecols].to_numpy(dtype=np.float64)
+
+    def _read_chunk(self, handle, start: int) -> ReplayChunk:
+        """Read one chunk plus halo rows on each side for derivatives."""
+        num_rows = min(self.chunk_rows, self.num_rows - start)
+        lead = min(self.halo, start)
+        end = min(start + num_rows + self.halo, self.num_rows)
+        values = self._read_rows(handle, start - lead, end - (start - lead))
+        return ReplayChunk(start_row=start, num_rows=num_rows, lead=lead,
+                           values=values, columns=self.usecols)
+
+    def _prefetch(self, start: int, chunks: queue.Queue, stop: threading.Event):
+        """Background loop reading chunks ahead of the consumer, looping at EOF."""
+        row = start
+        try:
+            with open(self.path, 'rb') as handle:
+                while not stop.is_set():
+                    chunk = self._read_chunk(handle, row)
+                    self._put(chunks, chunk, stop)
+                    row = (row + chunk.num_rows) % self.num_rows
+        except Exception as e:
+            # Hand the failure to the consumer instead of dying silently
+            self._put(chunks, _PrefetchError(e), stop)
+
+    @staticmethod
+    def _put(chunks: queue.Queue, item, stop: threading.Event):
+        """Queue ``item`` once there is room, giving up if prefetching stops."""
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def iter_chunks(self) -> Iterator[ReplayChunk]:
+        """
+        Read every chunk once, in row order, on the calling thread.
+
+        Uses its own file handle and leaves the prefetch stream alone, so a
+        full pass can run while another thread consumes next_chunk().
+        """
+        with open(self.path, 'rb') as handle:
+            for start in range(0, self.num_rows, self.chunk_rows):
+                yield self._read_chunk(handle, start)
+
+    def seek(self, row: int):
+        """Restart prefetching at ``row`` (wrapped to the recording length)."""
+        self._stop_prefetch()
+        if self.num_rows == 0:
+            return
+
+        # One chunk being consumed, one ready in the queue (double-buffering)
+        self._queue = queue.Queue(maxsize=1)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._prefetch,
+            args=(row % self.num_rows, self._queue, self._stop),
+            daemon=True,
+        )
+        self._thread.start()
+
+    def next_chunk(self, timeout: Optional[float] = None) -> Optional[ReplayChunk]:
+        """
+        Get the next chunk in replay order (None if the recording is empty).
+
+        Args:
+            timeout: Longest wait for the prefetch thread (default: self.timeout)
+
+        Raises:
+            RuntimeError: If reading the recording failed
+            TimeoutError: If no chunk arrived in time
+        """
+        if self._queue is None:
+            return None
+        try:
+            item = self._queue.get(timeout=self.timeout if timeout is None else timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No replay chunk from {self.path} within {self.timeout if timeout is None else timeout}s")
+        if isinstance(item, _PrefetchError):
+            # Keep the error queued so every later call fails the same way
+            self._queue.put(item)
+            raise RuntimeError(f"Reading {self.path} failed: {item.error}") from item.error
+        return item
+
+    def _stop_prefetch(self):
+        """Stop the prefetch thread, if running."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+        self._thread = None
+        self._queue = None
+        self._stop = None
+
+    def close(self):
+        """Stop prefetching."""
+        self._stop_prefetch()
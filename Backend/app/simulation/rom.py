@@ -1,7 +1,6 @@
 """Reduced Order Model (ROM) for efficient computation."""
 import numpy as np
-from typing import List, Dict
-from collections import deque
+from typing import List, Dict, Optional
 
 from .physics_sim import JointState
 
@@ -9,62 +8,300 @@ from .physics_sim import JointState
 class ReducedOrderModel:
     """
     Reduced Order Model using linear approximation and timestep reduction.
-    
+
     Reduces computational load while maintaining accuracy for ML feature extraction.
+    States are kept in a preallocated (window x joints x 4) ring buffer with
+    running sums, so adding a state and reading the reduced state are both
+    O(joints).
     """
-    
-    def __init__(self, reduction_factor: int = 10):
+
+    # Quantities stored per joint, in buffer order
+    QUANTITIES = ('angle', 'velocity', 'acceleration', 'torque')
+
+    def __init__(self, reduction_factor: int = 10, joint_names: Optional[List[str]] = None):
         """
         Initialize ROM.
-        
+
         Args:
             reduction_factor: Factor by which to reduce timesteps (e.g., 10 = 100Hz -> 10Hz)
+            joint_names: Joint names (default: taken from the first added state)
         """
         self.reduction_factor = reduction_factor
-        self.buffer: deque = deque(maxlen=reduction_factor)
-        self.reduced_state: Dict[str, JointState] = {}
-    
+        self.joint_names: List[str] = list(joint_names) if joint_names else []
+        self.buffer: Optional[np.ndarray] = None
+        self._sums: Optional[np.ndarray] = None
+        self._head = 0
+        self._count = 0
+        if self.joint_names:
+            self._allocate(len(self.joint_names))
+
+    def _allocate(self, num_joints: int):
+        """Allocate the ring buffer and running sums."""
+        self.buffer = np.zeros((self.reduction_factor, num_joints, len(self.QUANTITIES)), dtype=np.float64)
+        self._sums = np.zeros((num_joints, len(self.QUANTITIES)), dtype=np.float64)
+        self._head = 0
+        self._count = 0
+
     def add_state(self, joint_states: List[JointState]):
         """Add a high-frequency state to the buffer."""
-        self.buffer.append(joint_states)
-    
+        if not self.joint_names:
+            self.joint_names = [state.name for state in joint_states]
+        self.add_arrays(
+            np.array([state.angle for state in joint_states]),
+            np.array([state.velocity for state in joint_states]),
+            np.array([state.acceleration for state in joint_states]),
+            np.array([state.torque for state in joint_states])
+        )
+
+    def add_arrays(self, angles: np.ndarray, velocities: np.ndarray,
+                   accelerations: np.ndarray, torques: np.ndarray):
+        """Add a high-frequency state given as per-joint arrays."""
+        if self.buffer is None:
+            self._allocate(len(angles))
+
+        slot = self.buffer[self._head]
+        if self._count == self.reduction_factor:
+            # Evict the oldest state from the running sums
+            self._sums -= slot
+        else:
+            self._count += 1
+
+        slot[:, 0] = angles
+        slot[:, 1] = velocities
+        slot[:, 2] = accelerations
+        slot[:, 3] = torques
+        self._sums += slot
+
+        self._head += 1
+        if self._head == self.reduction_factor:
+            self._head = 0
+            # Resynchronize once per window so rounding error cannot accumulate
+            np.sum(self.buffer[:self._count], axis=0, out=self._sums)
+
+    def get_reduced_array(self) -> np.ndarray:
+        """Averaged state over the buffer window, shape (joints, 4)."""
+        if self._count == 0:
+            return np.zeros((0, len(self.QUANTITIES)))
+        return self._sums / self._count
+
     def get_reduced_state(self) -> List[JointState]:
         """
         Get reduced-order state using linear approximation.
-        
+
         Returns averaged state over the buffer window.
         """
-        if len(self.buffer) == 0:
+        if self._count == 0:
             return []
-        
-        # Average states over the buffer
-        joint_names = [state.name for state in self.buffer[0]]
-        reduced_states = []
-        
-        for i, joint_name in enumerate(joint_names):
-            angles = [states[i].angle for states in self.buffer]
-            velocities = [states[i].velocity for states in self.buffer]
-            accelerations = [states[i].acceleration for states in self.buffer]
-            torques = [states[i].torque for states in self.buffer]
-            
-            # Linear approximation (averaging)
-            avg_state = JointState(
-                name=joint_name,
-                angle=float(np.mean(angles)),
-                velocity=float(np.mean(velocities)),
-                acceleration=float(np.mean(accelerations)),
-                torque=float(np.mean(torques))
+
+        # Linear approximation (averaging)
+        return [
+            JointState(name=name, angle=angle, velocity=velocity,
+                       acceleration=acceleration, torque=torque)
+            for name, (angle, velocity, acceleration, torque) in zip(
+                self.joint_names, self.get_reduced_array().tolist()
             )
-            
-            reduced_states.append(avg_state)
-        
-        return reduced_states
-    
+        ]
+
     def is_ready(self) -> bool:
         """Check if buffer is full and ready for reduction."""
-        return len(self.buffer) == self.reduction_factor
-    
+        return self._count == self.reduction_factor
+
     def reset(self):
         """Reset the ROM buffer."""
-        self.buffer.clear()
-        self.reduced_state.clear()
+        if self.buffer is not None:
+            self.buffer.fill(0.0)
+            self._sums.fill(0.0)
+        self._head = 0
+        self._count = 0
+
+
+def record_trajectory(simulator, num_steps: int):
+    """
+    Step a simulator and log its joint angles and velocities.
+
+    Args:
+        simulator: Any simulator exposing ``angles``/``velocities`` arrays
+            (single machine or fleet)
+        num_steps: Number of steps to record
+
+    Returns:
+        (angles, velocities), each (steps, joints) or (steps, machines, joints)
+    """
+    angles = np.empty((num_steps,) + simulator.angles.shape)
+    velocities = np.empty((num_steps,) + simulator.velocities.shape)
+    for k in range(num_steps):
+        simulator.step()
+        angles[k] = simulator.angles
+        velocities[k] = simulator.velocities
+    return angles, velocities
+
+
+class DMDSurrogate:
+    """
+    Data-driven reduced-order surrogate fitted by dynamic mode decomposition.
+
+    The full state x = [angles, velocities, 1] is projected onto a POD basis
+    U (truncated SVD of the logged snapshots), and a linear operator A is fitted
+    so that z[k+1] = A z[k] in the reduced coordinates z = U^T x. The constant
+    term makes the model affine, so joint offsets are captured exactly.
+
+    Propagation costs O(rank^2) per step (batched over machines), and any step
+    can be reached directly through the eigendecomposition of A. Joint values
+    are reconstructed only when ``reconstruct()`` is called.
+
+    This is an offline tool: fit it on a ``record_trajectory()`` log. The live
+    simulation keeps no trajectory history, so no endpoint serves it.
+    """
+
+    def __init__(self, rank: Optional[int] = None, energy: float = 0.99999, debias: bool = True):
+        """
+        Initialize surrogate.
+
+        Args:
+            rank: Number of POD modes to keep (default: chosen from ``energy``)
+            energy: Fraction of snapshot energy the kept modes must capture
+            debias: Use total-least-squares DMD, which removes the damping bias
+                sensor noise otherwise introduces in the fitted eigenvalues
+        """
+        self.rank = rank
+        self.energy = energy
+        self.debias = debias
+        self.num_joints = 0
+        self.basis: Optional[np.ndarray] = None  # (state, rank)
+        self.operator: Optional[np.ndarray] = None  # (rank, rank)
+        self.eigenvalues: Optional[np.ndarray] = None
+        self._modes: Optional[np.ndarray] = None
+        self._modes_inv: Optional[np.ndarray] = None
+        self.projection_error = 0.0
+        self.one_step_error = 0.0
+
+    @property
+    def is_fitted(self) -> bool:
+        """Whether ``fit()`` has been called."""
+        return self.operator is not None
+
+    @staticmethod
+    def _stack(angles: np.ndarray, velocities: np.ndarray) -> np.ndarray:
+        """Full state vectors [angles, velocities, 1] along the last axis."""
+        ones = np.ones(angles.shape[:-1] + (1,))
+        return np.concatenate([angles, velocities, ones], axis=-1)
+
+    def fit(self, angles: np.ndarray, velocities: np.ndarray) -> 'DMDSurrogate':
+        """
+        Fit the surrogate to a uniformly sampled trajectory.
+
+        Args:
+            angles: Logged angles (steps, joints) or (steps, machines, joints)
+            velocities: Logged velocities, same shape as ``angles``
+
+        Returns:
+            self
+        """
+        if angles.shape[0] < 3:
+            raise ValueError("Need at least 3 snapshots to fit a surrogate")
+        self.num_joints = angles.shape[-1]
+        snapshots = self._stack(np.asarray(angles, dtype=np.float64),
+                                np.asarray(velocities, dtype=np.float64))
+        state_size = snapshots.shape[-1]
+
+        # Consecutive snapshot pairs, machines treated as extra samples
+        X = snapshots[:-1].reshape(-1, state_size).T
+        Y = snapshots[1:].reshape(-1, state_size).T
+
+        energy = np.linalg.svd(X, compute_uv=False) ** 2
+        rank = self.rank
+        if rank is None:
+            rank = int(np.searchsorted(np.cumsum(energy) / np.sum(energy), self.energy)) + 1
+        rank = min(rank, state_size)
+        self.projection_error = float(np.sqrt(np.sum(energy[rank:]) / np.sum(energy)))
+
+        X_fit, Y_fit = X, Y
+        if self.debias:
+            # Project both snapshot sets onto the dominant subspace of [X; Y]
+            _, _, Vh = np.linalg.svd(np.vstack([X, Y]), full_matrices=False)
+            V_r = Vh[:rank].T
+            X_fit = (X @ V_r) @ V_r.T
+            Y_fit = (Y @ V_r) @ V_r.T
+
+        U, s, Vh = np.linalg.svd(X_fit, full_matrices=False)
+
+        U_r = U[:, :rank]
+        self.basis = U_r
+        self.operator = (U_r.T @ Y_fit @ Vh[:rank].T) / s[:rank]
+
+        predicted = U_r @ (self.operator @ (U_r.T @ X))
+        self.one_step_error = float(np.linalg.norm(predicted - Y) / np.linalg.norm(Y))
+
+        self.eigenvalues, self._modes = np.linalg.eig(self.operator)
+        self._modes_inv = np.linalg.inv(self._modes)
+
+        # Growing modes are fitting artefacts for these bounded trajectories;
+        # clamp them to the unit circle so long rollouts stay bounded
+        magnitudes = np.abs(self.eigenvalues)
+        if np.any(magnitudes > 1.0):
+            self.eigenvalues = self.eigenvalues / np.maximum(magnitudes, 1.0)
+            self.operator = np.real((self._modes * self.eigenvalues) @ self._modes_inv)
+        return self
+
+    def encode(self, angles: np.ndarray, velocities: np.ndarray) -> np.ndarray:
+        """Project full states (..., joints) to reduced coordinates (..., rank)."""
+        return self._stack(angles, velocities) @ self.basis
+
+    def step(self, z: np.ndarray) -> np.ndarray:
+        """Advance reduced states (..., rank) by one step."""
+        return z @ self.operator.T
+
+    def advance(self, z: np.ndarray, steps: int) -> np.ndarray:
+        """Advance reduced states (..., rank) by ``steps`` steps in closed form."""
+        return self.rollout(z, np.array([steps]))[0]
+
+    def rollout(self, z: np.ndarray, steps: np.ndarray) -> np.ndarray:
+        """
+        Reduced states at each requested step count, without iterating.
+
+        Args:
+            z: Initial reduced state(s) (..., rank)
+            steps: Step counts (n,)
+
+        Returns:
+            Reduced states (n, ..., rank)
+        """
+        coefficients = z @ self._modes_inv.T  # (..., rank) in the eigenbasis
+        powers = self.eigenvalues ** np.asarray(steps)[:, None]  # (n, rank)
+        powers = powers.reshape((len(powers),) + (1,) * (coefficients.ndim - 1) + (-1,))
+        return np.real((coefficients * powers) @ self._modes.T)
+
+    def reconstruct(self, z: np.ndarray):
+        """Full (angles, velocities) from reduced states (..., rank)."""
+        x = z @ self.basis.T
+        J = self.num_joints
+        return x[..., :J], x[..., J:2 * J]
+
+    def error_bound(self, angles: np.ndarray, velocities: np.ndarray) -> Dict[str, float]:
+        """
+        Compare a surrogate rollout against a full-simulator trajectory.
+
+        The surrogate starts from the first logged state and is propagated for
+        the length of the trajectory.
+
+        Args:
+            angles: Reference angles (steps, joints) or (steps, machines, joints)
+            velocities: Reference velocities, same shape
+
+        Returns:
+            Maximum absolute and relative RMS errors, with the fit diagnostics
+        """
+        z0 = self.encode(angles[0], velocities[0])
+        predicted_angles, predicted_velocities = self.reconstruct(
+            self.rollout(z0, np.arange(angles.shape[0]))
+        )
+        reference = self._stack(angles, velocities)[..., :-1]
+        predicted = np.concatenate([predicted_angles, predicted_velocities], axis=-1)
+        return {
+            'max_angle_error': float(np.max(np.abs(predicted_angles - angles))),
+            'max_velocity_error': float(np.max(np.abs(predicted_velocities - velocities))),
+            'relative_error': float(np.linalg.norm(predicted - reference) / np.linalg.norm(reference)),
+            'projection_error': self.projection_error,
+            'one_step_error': self.one_step_error,
+            'rank': int(self.basis.shape[1]),
+        }
@@ -3,103 +3,142 @@
 Reuses patterns from predictive-maintenance/main.py.
 """
 import numpy as np
-from typing import Dict, List
+from functools import cached_property
+from typing import Dict, List, Optional
 from dataclasses import dataclass
 
-from .physics_sim import PhysicsSimulator, JointState
+from .physics_sim import PhysicsSimulator
 from ..config import settings
 
+# Fault types accepted by SensorGenerator.inject_fault and FleetSimulator.inject_fault
+FAULT_TYPES = ("temperature", "vibration", "degradation", "overload", "pressure_loss", "drift")
+
 
 @dataclass
 class SensorData:
     """Sensor readings for the machine."""
     timestamp: float
-    joint_temperatures: Dict[str, float]
-    joint_vibrations: Dict[str, float]
+    joint_names: List[str]
+    temperatures: np.ndarray  # Celsius, per joint
+    vibrations: np.ndarray  # g, per joint
     overall_vibration: float
     power_consumption: float
 
+    @cached_property
+    def joint_temperatures(self) -> Dict[str, float]:
+        """Joint temperatures keyed by joint name (built on first access)."""
+        return dict(zip(self.joint_names, self.temperatures.tolist()))
+
+    @cached_property
+    def joint_vibrations(self) -> Dict[str, float]:
+        """Joint vibrations keyed by joint name (built on first access)."""
+        return dict(zip(self.joint_names, self.vibrations.tolist()))
+
+
+class NoiseBlock:
+    """
+    Standard normal noise drawn in large blocks and handed out per tick.
+
+    One Generator call fills ``block_ticks`` ticks of noise, so the per-tick
+    cost is a slice instead of several small RNG calls.
+    """
+
+    def __init__(self, shape: tuple, block_ticks: int = 4096, seed: Optional[int] = None):
+        """
+        Initialize noise block.
+
+        Args:
+            shape: Shape of the noise needed per tick
+            block_ticks: Ticks of noise drawn per refill
+            seed: Generator seed (random if None)
+        """
+        self.shape = shape
+        self.block_ticks = block_ticks
+        self.rng = np.random.default_rng(seed)
+        self._block = np.empty((block_ticks,) + tuple(shape))
+        self._pos = block_ticks
+
+    def next(self) -> np.ndarray:
+        """Noise for one tick, shape ``self.shape``."""
+        if self._pos >= self.block_ticks:
+            self.rng.standard_normal(out=self._block)
+            self._pos = 0
+        noise = self._block[self._pos]
+        self._pos += 1
+        return noise
+
 
 class SensorGenerator:
     """Generate synthetic sensor data from simulation."""
     
-    def __init__(self, simulator: PhysicsSimulator):
+    def __init__(self, simulator: PhysicsSimulator, seed: Optional[int] = None):
         """Initialize sensor generator."""
         self.simulator = simulator
+        self.joint_names: List[str] = list(simulator.joint_names)
+        num_joints = len(self.joint_names)
+        
+        # Thermal and wear rates are tuned per 10 Hz tick; scale them so the
+        # model behaves the same at any simulation frequency
+        self.rate_scale = simulator.dt / 0.1
         
         # Degradation tracking (simulates wear over time)
         self.degradation_factor = 0.0
         self.cycles_count = 0
         
         # Temperature accumulation (thermal inertia)
-        self.joint_temps: Dict[str, float] = {}
-        for joint_name in simulator.joint_states.keys():
-            self.joint_temps[joint_name] = settings.base_temperature
+        self.joint_temps = np.full(num_joints, settings.base_temperature, dtype=np.float64)
+        
+        # Noise standard deviations for (temperature, vibration)
+        self.noise_std = np.array([[0.5], [0.05]])
+        self.noise = NoiseBlock((2, num_joints), seed=seed)
     
     def generate(self) -> SensorData:
         """Generate sensor data based on current simulation state."""
-        joint_states = self.simulator.get_joint_states()
+        torques = np.abs(self.simulator.torques)
+        velocities = np.abs(self.simulator.velocities)
         timestamp = self.simulator.sim_time
         
         # Update degradation (increases over time)
         self.cycles_count += 1
-        self.degradation_factor = min(1.0, self.cycles_count / 100000.0)
-        
-        # Generate sensor data for each joint
-        joint_temperatures = {}
-        joint_vibrations = {}
-        total_vibration = 0.0
-        total_power = 0.0
-        
-        for state in joint_states:
-            # Temperature: function of torque and accumulated heat
-            # Higher torque -> more heat generation
-            heat_generation = abs(state.torque) * 2.0
-            heat_dissipation = (self.joint_temps[state.name] - settings.base_temperature) * 0.1
-            
-            # Thermal model with degradation
-            temp_change = (heat_generation - heat_dissipation) * 0.01
-            self.joint_temps[state.name] += temp_change
-            
-            # Add degradation effect (worn joints run hotter)
-            degradation_temp = self.degradation_factor * 10.0
-            
-            # Add noise
-            noise = np.random.normal(0, 0.5)
-            
-            final_temp = self.joint_temps[state.name] + degradation_temp + noise
-            final_temp = np.clip(final_temp, settings.base_temperature, settings.max_temperature)
-            joint_temperatures[state.name] = float(final_temp)
-            
-            # Vibration: function of velocity and degradation
-            # Higher velocity -> more vibration
-            # Degradation increases vibration
-            base_vibration = abs(state.velocity) * 0.1
-            degradation_vibration = self.degradation_factor * 0.5
-            vibration_noise = np.random.normal(0, 0.05)
-            
-            vibration = settings.vibration_base + base_vibration + degradation_vibration + vibration_noise
-            vibration = np.clip(vibration, 0, settings.vibration_max)
-            joint_vibrations[state.name] = float(vibration)
-            
-            total_vibration += vibration
-            
-            # Power consumption: function of torque and velocity
-            power = abs(state.torque * state.velocity) * 10.0  # Watts
-            total_power += power
+        self.degradation_factor = min(1.0, self.cycles_count * self.rate_scale / 100000.0)
+        
+        noise = self.noise.next() * self.noise_std
+        
+        # Temperature: function of torque and accumulated heat
+        # Higher torque -> more heat generation
+        heat_generation = torques * 2.0
+        heat_dissipation = (self.joint_temps - settings.base_temperature) * 0.1
+        
+        # Thermal model
+        self.joint_temps += (heat_generation - heat_dissipation) * 0.01 * self.rate_scale
+        
+        # Add degradation effect (worn joints run hotter) and noise
+        degradation_temp = self.degradation_factor * 10.0
+        temperatures = np.clip(self.joint_temps + degradation_temp + noise[0],
+                               settings.base_temperature, settings.max_temperature)
+        
+        # Vibration: function of velocity and degradation
+        # Higher velocity -> more vibration, degradation increases vibration
+        degradation_vibration = self.degradation_factor * 0.5
+        vibrations = np.clip(settings.vibration_base + velocities * 0.1 + degradation_vibration + noise[1],
+                             0, settings.vibration_max)
+        
+        # Power consumption: function of torque and velocity (Watts)
+        total_power = float(np.dot(torques, velocities)) * 10.0
         
         # Overall vibration (RMS of all joints)
-        if joint_states:
-            overall_vibration = float(np.sqrt(total_vibration / len(joint_states)))
+        if len(self.joint_names):
+            overall_vibration = float(np.sqrt(vibrations.sum() / len(self.joint_names)))
         else:
             overall_vibration = 0.0
         
         return SensorData(
             timestamp=timestamp,
-            joint_temperatures=joint_temperatures,
-            joint_vibrations=joint_vibrations,
+            joint_names=self.joint_names,
+            temperatures=temperatures,
+            vibrations=vibrations,
             overall_vibration=overall_vibration,
-            power_consumption=float(total_power)
+            power_consumption=total_power
         )
     
     def inject_fault(self, fault_type: str = "temperature", severity: float = 0.5):
@@ -110,10 +149,12 @@ class SensorGenerator:
             fault_type: Type of fault (temperature, vibration, degradation, overload, pressure_loss, drift)
             severity: Fault severity (0-1)
         """
+        if fault_type not in FAULT_TYPES:
+            raise ValueError(f"Unknown fault type: {fault_type} (expected one of {FAULT_TYPES})")
+        
         if fault_type == "temperature" or fault_type == "overload":
             # Increase all joint temperatures
-            for joint_name in self.joint_temps.keys():
-                self.joint_temps[joint_name] += severity * 30.0
+            self.joint_temps += severity * 30.0
         
         elif fault_type == "vibration" or fault_type == "pressure_loss":
             # Increase degradation factor temporarily or permanently
@@ -121,12 +162,11 @@ class SensorGenerator:
         
         elif fault_type == "degradation" or fault_type == "drift":
             # Simulate wear
-            self.cycles_count += int(severity * 50000)
-            self.degradation_factor = min(1.0, self.cycles_count / 100000.0)
+            self.cycles_count += int(severity * 50000 / self.rate_scale)
+            self.degradation_factor = min(1.0, self.cycles_count * self.rate_scale / 100000.0)
     
     def reset(self):
         """Reset sensor state."""
         self.degradation_factor = 0.0
         self.cycles_count = 0
-        for joint_name in self.joint_temps.keys():
-            self.joint_temps[joint_name] = settings.base_temperature
+        self.joint_temps.fill(settings.base_temperature)
@@ -2,6 +2,9 @@
 
 Reuses patterns from digital_twin_robot project.
 """
+import hashlib
+import os
+import pickle
 import xml.etree.ElementTree as ET
 from typing import List, Dict, Tuple, Optional
 from pathlib import Path
@@ -22,6 +25,9 @@ class Joint:
     upper_limit: float = 3.14
     effort_limit: float = 1000.0
     velocity_limit: float = 10.0
+    mimic_joint: Optional[str] = None  # Joint this one follows: angle = multiplier * source + offset
+    mimic_multiplier: float = 1.0
+    mimic_offset: float = 0.0
 
 
 @dataclass
@@ -31,45 +37,148 @@ class Link:
     has_inertial: bool = False
     mass: float = 0.0
     inertia: Optional[Dict[str, float]] = None
+    inertial_xyz: Tuple[float, float, float] = (0.0, 0.0, 0.0)  # Center of mass in link frame
+    inertial_rpy: Tuple[float, float, float] = (0.0, 0.0, 0.0)  # Orientation of the inertia frame
+    collision_mesh: Optional[str] = None  # Mesh filename from the <collision> geometry
+    collision_xyz: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+    collision_rpy: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+    collision_scale: Tuple[float, float, float] = (1.0, 1.0, 1.0)
+
+
+# Bump when the cached model changes shape so stale artifacts are ignored
+CACHE_VERSION = 4
 
 
 class URDFParser:
-    """Parse URDF files and extract metadata."""
+    """
+    Parse URDF files and extract metadata.
+
+    With a ``cache_dir``, the parsed model is stored in a pickle keyed by the
+    SHA-256 of the URDF contents, and later parses of an unchanged file skip
+    XML parsing entirely.
+    """
     
-    def __init__(self, urdf_path: Path):
-        """Initialize parser with URDF file path."""
+    def __init__(self, urdf_path: Path, cache_dir: Optional[Path] = None):
+        """
+        Initialize parser with URDF file path.
+
+        Args:
+            urdf_path: Path to the URDF file
+            cache_dir: Directory for parsed-model artifacts (default: no caching)
+        """
         self.urdf_path = urdf_path
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
         self.tree = None
         self.root = None
         self.joints: List[Joint] = []
         self.links: List[Link] = []
         self.robot_name: str = ""
+        self.content_hash: str = ""
+        self.loaded_from_cache = False
+        self._joint_index: Dict[str, Joint] = {}
+        self._link_index: Dict[str, Link] = {}
+        self._metadata: Optional[Dict] = None
         
     def parse(self) -> bool:
-        """Parse the URDF file."""
+        """Parse the URDF file, or load its cached model if the contents are unchanged."""
         try:
-            self.tree = ET.parse(self.urdf_path)
-            self.root = self.tree.getroot()
-            self.robot_name = self.root.get('name', 'unknown')
+            data = Path(self.urdf_path).read_bytes()
+            self.content_hash = hashlib.sha256(data).hexdigest()
+            self.joints = []
+            self.links = []
+            self._metadata = None
             
-            self._parse_links()
-            self._parse_joints()
+            self.loaded_from_cache = self._load_cache()
+            if not self.loaded_from_cache:
+                self.root = ET.fromstring(data)
+                self.tree = ET.ElementTree(self.root)
+                self.robot_name = self.root.get('name', 'unknown')
+                
+                self._parse_links()
+                self._parse_joints()
+                self._build_indexes()
+                self._save_cache()
             
             return True
         except Exception as e:
             print(f"Error parsing URDF: {e}")
             return False
     
+    @property
+    def cache_path(self) -> Optional[Path]:
+        """Artifact path for the current URDF contents (None without a cache_dir)."""
+        if self.cache_dir is None or not self.content_hash:
+            return None
+        return self.cache_dir / f"{Path(self.urdf_path).stem}-{self.content_hash[:16]}.pkl"
+    
+    def _load_cache(self) -> bool:
+        """Load the parsed model from the cache. Returns False on a miss."""
+        path = self.cache_path
+        if path is None or not path.exists():
+            return False
+        try:
+            with open(path, 'rb') as f:
+                cached = pickle.load(f)
+        except Exception as e:
+            print(f"Ignoring unreadable URDF cache {path}: {e}")
+            return False
+        if cached.get('version') != CACHE_VERSION or cached.get('content_hash') != self.content_hash:
+            return False
+        
+        self.robot_name = cached['robot_name']
+        self.joints = cached['joints']
+        self.links = cached['links']
+        self._metadata = cached['metadata']
+        self._build_indexes()
+        return True
+    
+    def _save_cache(self):
+        """Write the parsed model to the cache, if enabled."""
+        path = self.cache_path
+        if path is None:
+            return
+        artifact = {
+            'version': CACHE_VERSION,
+            'content_hash': self.content_hash,
+            'robot_name': self.robot_name,
+            'joints': self.joints,
+            'links': self.links,
+            'metadata': self.get_metadata_dict(),
+        }
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename, so concurrent workers never read a partial file
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not write URDF cache {path}: {e}")
+    
+    def _build_indexes(self):
+        """Build name -> joint and name -> link lookups."""
+        self._joint_index = {joint.name: joint for joint in self.joints}
+        self._link_index = {link.name: link for link in self.links}
+    
     def _parse_links(self):
         """Extract link information."""
         for link_elem in self.root.findall('link'):
             name = link_elem.get('name')
             inertial_elem = link_elem.find('inertial')
+            link = Link(name=name)
             
             if inertial_elem is not None:
                 mass_elem = inertial_elem.find('mass')
                 mass = float(mass_elem.get('value', 0.0)) if mass_elem is not None else 0.0
                 
+                origin_elem = inertial_elem.find('origin')
+                if origin_elem is not None:
+                    inertial_xyz = tuple(map(float, origin_elem.get('xyz', '0 0 0').split()))
+                    inertial_rpy = tuple(map(float, origin_elem.get('rpy', '0 0 0').split()))
+                else:
+                    inertial_xyz = (0.0, 0.0, 0.0)
+                    inertial_rpy = (0.0, 0.0, 0.0)
+                
                 inertia_elem = inertial_elem.find('inertia')
                 inertia = None
                 if inertia_elem is not None:
@@ -82,9 +191,19 @@ class URDFParser:
                         'izz': float(inertia_elem.get('izz', 0)),
                     }
                 
-                self.links.append(Link(name=name, has_inertial=True, mass=mass, inertia=inertia))
-            else:
-                self.links.append(Link(name=name, has_inertial=False))
+                link = Link(name=name, has_inertial=True, mass=mass, inertia=inertia,
+                            inertial_xyz=inertial_xyz, inertial_rpy=inertial_rpy)
+            
+            mesh_elem = link_elem.find('collision/geometry/mesh')
+            if mesh_elem is not None:
+                link.collision_mesh = mesh_elem.get('filename')
+                link.collision_scale = tuple(map(float, mesh_elem.get('scale', '1 1 1').split()))
+                origin_elem = link_elem.find('collision/origin')
+                if origin_elem is not None:
+                    link.collision_xyz = tuple(map(float, origin_elem.get('xyz', '0 0 0').split()))
+                    link.collision_rpy = tuple(map(float, origin_elem.get('rpy', '0 0 0').split()))
+            
+            self.links.append(link)
     
     def _parse_joints(self):
         """Extract joint information."""
@@ -127,6 +246,12 @@ class URDFParser:
             else:
                 lower, upper, effort, velocity = -3.14, 3.14, 1000.0, 10.0
             
+            # Mimic (passive joint coupled to another joint)
+            mimic_elem = joint_elem.find('mimic')
+            mimic_joint = mimic_elem.get('joint') if mimic_elem is not None else None
+            mimic_multiplier = float(mimic_elem.get('multiplier', 1.0)) if mimic_elem is not None else 1.0
+            mimic_offset = float(mimic_elem.get('offset', 0.0)) if mimic_elem is not None else 0.0
+            
             joint = Joint(
                 name=name,
                 joint_type=joint_type,
@@ -138,7 +263,10 @@ class URDFParser:
                 lower_limit=lower,
                 upper_limit=upper,
                 effort_limit=effort,
-                velocity_limit=velocity
+                velocity_limit=velocity,
+                mimic_joint=mimic_joint,
+                mimic_multiplier=mimic_multiplier,
+                mimic_offset=mimic_offset
             )
             
             self.joints.append(joint)
@@ -149,13 +277,20 @@ class URDFParser:
     
     def get_joint_by_name(self, name: str) -> Optional[Joint]:
         """Get joint by name."""
-        for joint in self.joints:
-            if joint.name == name:
-                return joint
-        return None
+        return self._joint_index.get(name)
+    
+    def get_link_by_name(self, name: str) -> Optional[Link]:
+        """Get link by name."""
+        return self._link_index.get(name)
     
     def get_metadata_dict(self) -> Dict:
-        """Get metadata as dictionary for API response."""
+        """Get metadata as dictionary for API response (computed once; treat as read-only)."""
+        if self._metadata is None:
+            self._metadata = self._build_metadata()
+        return self._metadata
+    
+    def _build_metadata(self) -> Dict:
+        """Assemble the metadata dictionary from the parsed model."""
         revolute_joints = self.get_revolute_joints()
         
         return {
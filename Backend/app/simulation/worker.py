@@ -0,0 +1,63 @@
+"""Dedicated thread running the simulation loop off the API event loop."""
+import asyncio
+import threading
+from typing import Awaitable, Callable, Optional
+
+
+class SimulationWorker:
+    """
+    Runs an async tick loop on its own thread with a private event loop.
+
+    The API's event loop then only serves requests: slow handlers (exports,
+    explanations, many WebSocket clients) no longer delay simulation ticks,
+    and the loop's sleeps no longer compete with request handling.
+    """
+
+    def __init__(self, loop_factory: Callable[[], Awaitable[None]], name: str = "simulation-worker"):
+        """
+        Initialize worker.
+
+        Args:
+            loop_factory: Coroutine function running the tick loop until cancelled
+            name: Thread name
+        """
+        self.loop_factory = loop_factory
+        self.name = name
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._ready = threading.Event()
+
+    @property
+    def is_alive(self) -> bool:
+        """Whether the worker thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the worker thread and wait until its loop is running."""
+        if self.is_alive:
+            return
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run(self):
+        """Thread body: run the tick loop on a fresh event loop."""
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._task = self._loop.create_task(self.loop_factory())
+        self._ready.set()
+        try:
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+
+    def stop(self, timeout: float = 5.0):
+        """Cancel the tick loop and wait for the thread to exit."""
+        if not self.is_alive:
+            return
+        self._loop.call_soon_threadsafe(self._task.cancel)
+        self._thread.join(timeout)
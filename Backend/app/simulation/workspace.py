@@ -0,0 +1,218 @@
+"""Voxelized workspace reachability and manipulability map."""
+import json
+import os
+import shutil
+import time
+import numpy as np
+from pathlib import Path
+from typing import Dict, Optional
+
+from .kinematics import InverseKinematics
+
+# Bump when the stored arrays change meaning so stale maps are rebuilt
+MAP_VERSION = 1
+
+
+class ReachabilityMap:
+    """
+    End-effector workspace sampled once and stored as voxel grids.
+
+    Joint configurations are drawn uniformly within the URDF limits and
+    pushed through batched forward kinematics. Each voxel the end effector
+    lands in records the best Yoshikawa manipulability seen there,
+    sqrt(det(J J^T)) of the position Jacobian (0 means never reached), and
+    the configuration that achieved it, which is a well-conditioned IK start.
+
+    With a ``cache_dir``, the grids are written as ``.npy`` files keyed by
+    the URDF content hash and build parameters and opened memory-mapped, so
+    every worker shares one copy and queries are a single index lookup.
+    A voxel counts as reachable only if a sample landed in it, so the map is
+    accurate to the voxel size and the sampling density.
+    """
+
+    def __init__(self, ik: InverseKinematics, content_hash: str = "",
+                 cache_dir: Optional[Path] = None, voxel_size: float = 0.02,
+                 num_samples: int = 500_000, seed: int = 0, chunk_size: int = 20_000):
+        """
+        Initialize map.
+
+        Args:
+            ik: Solver providing joint limits and the position Jacobian
+            content_hash: URDF content hash the map is keyed by
+            cache_dir: Directory for map artifacts (default: no caching)
+            voxel_size: Voxel edge length in meters
+            num_samples: Sampled joint configurations
+            seed: Seed for the sampled configurations
+            chunk_size: Configurations evaluated per FK batch while building
+        """
+        self.ik = ik
+        self.content_hash = content_hash
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.voxel_size = voxel_size
+        self.num_samples = num_samples
+        self.seed = seed
+        self.chunk_size = chunk_size
+
+        self.origin = np.zeros(3)
+        self.shape = (0, 0, 0)
+        self.manipulability: Optional[np.ndarray] = None  # (nx, ny, nz) float32
+        self.seeds: Optional[np.ndarray] = None  # (nx, ny, nz, joints) float32
+        self.max_manipulability = 0.0
+        self.loaded_from_cache = False
+
+    @property
+    def cache_path(self) -> Optional[Path]:
+        """Artifact directory for the current URDF and build parameters (None without a cache_dir)."""
+        if self.cache_dir is None or not self.content_hash:
+            return None
+        voxel_mm = int(round(self.voxel_size * 1000))
+        return self.cache_dir / f"reachability-{self.content_hash[:16]}-{voxel_mm}mm-{self.num_samples}-{self.seed}"
+
+    def build(self) -> 'ReachabilityMap':
+        """Load the map from the cache, or sample it and store it."""
+        self.loaded_from_cache = self._load_cache()
+        if not self.loaded_from_cache:
+            self._sample()
+            self._save_cache()
+        return self
+
+    def _sample(self):
+        """Sample configurations and fill the voxel grids."""
+        ik = self.ik
+        num_joints = ik.fk.num_joints
+        rng = np.random.default_rng(self.seed)
+
+        # Joints off the end-effector chain do not move it; hold them at zero
+        fixed = np.clip(0.0, ik.lower_limits, ik.upper_limits)
+        configurations = np.broadcast_to(fixed, (self.num_samples, num_joints)).copy()
+        columns = ik._joint_columns
+        configurations[:, columns] = rng.uniform(ik.lower_limits[columns], ik.upper_limits[columns],
+                                                 size=(self.num_samples, len(columns)))
+
+        positions = np.empty((self.num_samples, 3))
+        scores = np.empty(self.num_samples)
+        for start in range(0, self.num_samples, self.chunk_size):
+            rows = slice(start, start + self.chunk_size)
+            positions[rows], J = ik.jacobian(configurations[rows])
+            scores[rows] = np.sqrt(np.abs(np.linalg.det(J @ J.transpose(0, 2, 1))))
+
+        # Grid bounds: the sampled extent padded by one voxel on each side
+        self.origin = np.floor(positions.min(axis=0) / self.voxel_size) * self.voxel_size - self.voxel_size
+        upper = positions.max(axis=0) + self.voxel_size
+        self.shape = tuple(int(n) for n in np.ceil((upper - self.origin) / self.voxel_size))
+
+        # Best sample per voxel: sort by score, then keep each voxel's last row
+        cells = np.ravel_multi_index(self._cells(positions).T, self.shape)
+        order = np.lexsort((scores, cells))
+        last = np.r_[cells[order][1:] != cells[order][:-1], True]
+        best = order[last]
+
+        num_voxels = int(np.prod(self.shape))
+        manipulability = np.zeros(num_voxels, dtype=np.float32)
+        seeds = np.full((num_voxels, num_joints), np.nan, dtype=np.float32)
+        manipulability[cells[best]] = scores[best]
+        seeds[cells[best]] = configurations[best]
+        self.manipulability = manipulability.reshape(self.shape)
+        self.seeds = seeds.reshape(self.shape + (num_joints,))
+        self.max_manipulability = float(scores.max())
+
+    def _cells(self, points: np.ndarray) -> np.ndarray:
+        """Integer voxel coordinates (n, 3) of points, unclipped."""
+        return np.floor((points - self.origin) / self.voxel_size).astype(np.int64)
+
+    def _lookup(self, points: np.ndarray):
+        """Flat voxel indices of points, and which of them fall inside the grid."""
+        points = np.atleast_2d(np.asarray(points, dtype=np.float64))
+        cells = self._cells(points)
+        inside = np.all((cells >= 0) & (cells < np.array(self.shape)), axis=1)
+        indices = np.zeros(len(points), dtype=np.int64)
+        indices[inside] = np.ravel_multi_index(cells[inside].T, self.shape)
+        return indices, inside
+
+    def manipulability_at(self, points: np.ndarray) -> np.ndarray:
+        """Best sampled manipulability (n,) at each point's voxel; 0 if never reached."""
+        indices, inside = self._lookup(points)
+        values = np.zeros(len(indices))
+        values[inside] = self.manipulability.reshape(-1)[indices[inside]]
+        return values
+
+    def is_reachable(self, points: np.ndarray) -> np.ndarray:
+        """Whether each point's voxel was reached by any sample."""
+        return self.manipulability_at(points) > 0.0
+
+    def seed_configurations(self, points: np.ndarray) -> np.ndarray:
+        """Best-conditioned sampled configuration (n, joints) per voxel; NaN rows if unreached."""
+        indices, inside = self._lookup(points)
+        seeds = np.full((len(indices), self.seeds.shape[-1]), np.nan)
+        seeds[inside] = self.seeds.reshape(-1, self.seeds.shape[-1])[indices[inside]]
+        return seeds
+
+    def query(self, points: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Reachability and conditioning of a batch of Cartesian points.
+
+        Args:
+            points: End-effector positions (n, 3) in meters, base frame
+
+        Returns:
+            Reachable flags, manipulability, and manipulability relative to
+            the best in the workspace (near 0 = close to a singularity)
+        """
+        manipulability = self.manipulability_at(points)
+        return {
+            'reachable': manipulability > 0.0,
+            'manipulability': manipulability,
+            'normalized_manipulability': manipulability / self.max_manipulability,
+        }
+
+    def _load_cache(self) -> bool:
+        """Open the stored grids memory-mapped. Returns False on a miss."""
+        path = self.cache_path
+        if path is None or not (path / "meta.json").exists():
+            return False
+        try:
+            meta = json.loads((path / "meta.json").read_text())
+            if meta.get('version') != MAP_VERSION or meta.get('content_hash') != self.content_hash:
+                return False
+            manipulability = np.load(path / "manipulability.npy", mmap_mode='r')
+            seeds = np.load(path / "seeds.npy", mmap_mode='r')
+        except Exception as e:
+            print(f"Ignoring unreadable reachability map {path}: {e}")
+            return False
+
+        self.origin = np.array(meta['origin'])
+        self.shape = tuple(meta['shape'])
+        self.max_manipulability = meta['max_manipulability']
+        self.manipulability = manipulability
+        self.seeds = seeds
+        return True
+
+    def _save_cache(self):
+        """Write the grids to the cache, if enabled, then reopen them memory-mapped."""
+        path = self.cache_path
+        if path is None:
+            return
+        meta = {
+            'version': MAP_VERSION,
+            'content_hash': self.content_hash,
+            'origin': self.origin.tolist(),
+            'shape': list(self.shape),
+            'voxel_size': self.voxel_size,
+            'num_samples': self.num_samples,
+            'max_manipulability': self.max_manipulability,
+            'created_at': time.time(),
+        }
+        # Fill a private directory, then rename, so concurrent workers never see a partial map
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            tmp_path.mkdir(parents=True, exist_ok=True)
+            np.save(tmp_path / "manipulability.npy", self.manipulability)
+            np.save(tmp_path / "seeds.npy", self.seeds)
+            (tmp_path / "meta.json").write_text(json.dumps(meta))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # Another worker may have published the same map first
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            if not path.exists():
+                print(f"Could not write reachability map {path}: {e}")
+        self._load_cache()
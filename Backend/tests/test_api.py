@@ -7,7 +7,7 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from app.main import app
+from app.main import app, state
 
 client = TestClient(app)
 
@@ -124,3 +124,19 @@ def test_logs_export():
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
+
+
+def test_machine_state_after_reset():
+    """A reset replaces the served frame, even while the simulation is stopped."""
+    with TestClient(app) as live_client:
+        assert live_client.post("/machine/control", json={"command": "stop"}).status_code == 200
+        before = live_client.get("/machine/state").json()
+        assert before["status"] == "stopped"
+
+        assert live_client.post("/machine/control", json={"command": "reset"}).json()["success"]
+        frame_seq = state.frame_bus.latest.seq if state.frame_bus.latest else None
+        after = live_client.get("/machine/state").json()
+        assert state.frame_bus.latest.seq != frame_seq
+        # The served joints are the reset simulator's, not the pre-reset frame's
+        angles = [joint.angle for joint in state.simulator.get_joint_states()]
+        assert [joint["angle"] for joint in after["joints"]] == pytest.approx(angles)
@@ -0,0 +1,97 @@
+"""Tests for the simulation frame bus."""
+import asyncio
+import json
+import sys
+import threading
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.api.frame_bus import Frame, FrameBus
+from app.simulation.worker import SimulationWorker
+
+
+def make_frame(bus: FrameBus) -> Frame:
+    seq = bus.next_seq()
+    return Frame(
+        seq=seq,
+        timestamp=float(seq),
+        joint_states=[],
+        sensor_data=None,
+        predictions={},
+        alerts=[],
+        payload={"seq": seq}
+    )
+
+
+def test_publish_fans_out_same_frame():
+    """Every subscriber receives the identical frame object."""
+    async def run():
+        bus = FrameBus()
+        queues = [bus.subscribe() for _ in range(3)]
+        frame = make_frame(bus)
+        bus.publish(frame)
+        received = [await q.get() for q in queues]
+        assert all(r is frame for r in received)
+        assert bus.latest is frame
+
+    asyncio.run(run())
+
+
+def test_slow_subscriber_gets_latest_frame():
+    """A subscriber that falls behind skips straight to the newest frame."""
+    async def run():
+        bus = FrameBus()
+        queue = bus.subscribe()
+        for _ in range(5):
+            bus.publish(make_frame(bus))
+        frame = await queue.get()
+        assert frame.seq == 5
+        assert queue.empty()
+
+        bus.unsubscribe(queue)
+        assert bus.subscriber_count == 0
+
+    asyncio.run(run())
+
+
+def test_frame_serialized_once():
+    """The JSON payload is cached after the first serialization."""
+    bus = FrameBus()
+    frame = make_frame(bus)
+    text = frame.to_json()
+    assert json.loads(text) == {"seq": 1}
+    assert frame.to_json() is text
+
+
+def test_worker_thread_publishes_to_event_loop():
+    """Frames produced on the worker thread reach subscribers on the API loop."""
+    async def run():
+        bus = FrameBus()
+        bus.attach(asyncio.get_running_loop())
+        queue = bus.subscribe()
+        producer_threads = set()
+
+        async def produce():
+            producer_threads.add(threading.current_thread().name)
+            for _ in range(3):
+                bus.publish_threadsafe(make_frame(bus))
+                await asyncio.sleep(0.01)
+            await asyncio.Event().wait()  # Run until cancelled
+
+        worker = SimulationWorker(produce, name="test-worker")
+        worker.start()
+        try:
+            seqs = []
+            while not seqs or seqs[-1] < 3:
+                frame = await asyncio.wait_for(queue.get(), timeout=2.0)
+                seqs.append(frame.seq)
+            assert seqs == sorted(seqs)
+            assert bus.latest.seq == 3
+            assert producer_threads == {"test-worker"}
+        finally:
+            worker.stop()
+        assert not worker.is_alive
+
+    asyncio.run(run())
@@ -0,0 +1,258 @@
+"""Tests for kinematics and dynamics built from the URDF."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import settings
+from app.simulation.urdf_parser import URDFParser
+from app.simulation.kinematics import ForwardKinematics, InverseKinematics
+from app.simulation.dynamics import InverseDynamics
+from app.simulation.workspace import ReachabilityMap
+from app.simulation.collision import SelfCollisionChecker, build_sphere_tree, load_stl
+from app.simulation.physics_sim import PhysicsSimulator
+from app.simulation.fleet_sim import FleetSimulator
+from app.simulation.clock import VirtualClock
+
+
+@pytest.fixture(scope="module")
+def urdf_parser():
+    parser = URDFParser(settings.urdf_path)
+    assert parser.parse()
+    return parser
+
+
+@pytest.fixture(scope="module")
+def fk(urdf_parser):
+    return ForwardKinematics(urdf_parser)
+
+
+def test_fk_zero_pose(fk, urdf_parser):
+    """At zero angles the arm is straight up: origins along z simply add."""
+    pose = fk.end_effector_poses(np.zeros(fk.num_joints))
+    chain = ["joint1", "joint2", "joint3", "joint4", "joint5", "grasping_frame_joint"]
+    height = sum(urdf_parser.get_joint_by_name(name).origin_xyz[2] for name in chain)
+    assert np.allclose(pose[:3, :3], np.eye(3))
+    assert np.allclose(pose[:3, 3], [0.0, 0.0, height])
+
+
+def test_fk_joint_rotation(fk):
+    """Bending joint2 (x axis) swings the arm in the y-z plane; joint1 (z axis) yaws it."""
+    q = np.zeros(fk.num_joints)
+    q[fk.joint_names.index("joint2")] = np.pi / 2
+    reach = fk.end_effector_poses(q)[:3, 3]
+    assert reach[0] == pytest.approx(0.0, abs=1e-12)
+    assert reach[1] < 0.0
+
+    q[fk.joint_names.index("joint1")] = np.pi / 2
+    yawed = fk.end_effector_poses(q)[:3, 3]
+    assert np.allclose(yawed, [-reach[1], 0.0, reach[2]])
+
+
+def test_fk_batch_matches_single(fk):
+    """Batched poses (any batch shape) equal one-at-a-time results."""
+    rng = np.random.default_rng(0)
+    q = rng.uniform(-1.0, 1.0, size=(4, 3, fk.num_joints))
+    poses = fk.link_poses(q)
+    assert poses.shape == (4, 3, len(fk.link_names), 4, 4)
+    for index in np.ndindex(4, 3):
+        assert np.allclose(poses[index], fk.link_poses(q[index]))
+
+    ee = fk.end_effector_poses(q)
+    assert np.allclose(ee, poses[..., fk.link_index[fk.end_effector], :, :])
+    assert np.allclose(np.linalg.det(ee[..., :3, :3]), 1.0)
+
+
+def test_fk_mimic_joints(fk, urdf_parser):
+    """Gripper linkage joints follow r_joint through their <mimic> elements."""
+    assert urdf_parser.get_joint_by_name("l_joint").mimic_joint == "r_joint"
+    assert urdf_parser.get_joint_by_name("l_joint").mimic_multiplier == -1.0
+
+    q = np.zeros(fk.num_joints)
+    q[fk.joint_names.index("r_joint")] = 0.5
+    moved = fk.link_poses(q, ["l_link", "r_out_link"])
+    # l_joint's own column is ignored: it mimics r_joint
+    q[fk.joint_names.index("l_joint")] = 1.0
+    assert np.allclose(fk.link_poses(q, ["l_link", "r_out_link"]), moved)
+    assert not np.allclose(moved, fk.link_poses(np.zeros(fk.num_joints), ["l_link", "r_out_link"]))
+
+
+def test_ik_reaches_reachable_targets(urdf_parser, fk):
+    """Targets generated by FK are reached within tolerance and joint limits."""
+    ik = InverseKinematics(urdf_parser, fk=fk, seed=0)
+    rng = np.random.default_rng(1)
+    q = rng.uniform(ik.lower_limits, ik.upper_limits, size=(200, fk.num_joints))
+    targets = fk.end_effector_poses(q)[:, :3, 3]
+
+    solution = ik.solve(targets)
+    assert solution.converged.mean() > 0.97
+    assert np.all(solution.errors[~solution.converged] < 1e-3)
+    assert np.all(solution.angles >= ik.lower_limits) and np.all(solution.angles <= ik.upper_limits)
+    reached = fk.end_effector_poses(solution.angles)[:, :3, 3]
+    assert np.allclose(reached, solution.positions)
+
+    # Warm starts near the answer converge everywhere, in few iterations
+    warm = ik.solve(targets, initial=q + 0.05)
+    assert warm.converged.all()
+    assert warm.iterations < 50
+
+
+def test_ik_jacobian_matches_finite_differences(urdf_parser, fk):
+    ik = InverseKinematics(urdf_parser, fk=fk, seed=0)
+    q = np.random.default_rng(2).uniform(-1.0, 1.0, size=(3, fk.num_joints))
+    positions, J = ik.jacobian(q)
+    eps = 1e-6
+    for column in range(fk.num_joints):
+        shifted = q.copy()
+        shifted[:, column] += eps
+        numeric = (fk.end_effector_poses(shifted)[:, :3, 3] - positions) / eps
+        assert np.allclose(numeric, J[:, :, column], atol=1e-5)
+
+
+def test_ik_unreachable_target(urdf_parser, fk):
+    """Out-of-reach targets are reported as not converged, not raised."""
+    ik = InverseKinematics(urdf_parser, fk=fk, seed=0)
+    solution = ik.solve([[2.0, 0.0, 0.0]])
+    assert not solution.converged[0]
+    assert solution.errors[0] > 1.0
+
+
+def test_rnea_gravity_matches_center_of_mass_reference(urdf_parser, fk):
+    """Holding torque equals the moment of gravity on the links beyond each joint."""
+    dynamics = InverseDynamics(urdf_parser, fk=fk)
+    q = np.random.default_rng(3).uniform(-1.0, 1.0, size=(4, fk.num_joints))
+    torques = dynamics.gravity_torques(q)
+    assert torques.shape == q.shape
+
+    poses = fk.link_poses(q)
+    centers = np.einsum('nlij,lj->nli', poses[..., :3, :3], dynamics.coms) + poses[..., :3, 3]
+    weights = dynamics.masses[None, :, None] * np.array([0.0, 0.0, -dynamics.gravity])
+    # Mimic joints pass their load to the joint they follow, scaled by the multiplier
+    expected = np.zeros_like(torques)
+    for link, column in enumerate(fk.pose_columns):
+        if column < 0:
+            continue
+        subtree = [link]
+        for index in range(link + 1, len(fk.link_names)):
+            if fk.parent_index[index] in subtree:
+                subtree.append(index)
+        axis = np.einsum('nij,j->ni', poses[:, link, :3, :3], fk.axes[link])
+        moment = np.cross(centers[:, subtree] - poses[:, link, None, :3, 3], weights[:, subtree]).sum(axis=1)
+        expected[:, column] -= np.einsum('ni,ni->n', moment, axis) * fk.multipliers[link]
+    assert np.allclose(torques, expected, atol=1e-10)
+    assert np.all(torques[:, fk.joint_names.index("l_joint")] == 0.0)
+
+
+def test_rnea_mass_matrix_and_power(urdf_parser, fk):
+    dynamics = InverseDynamics(urdf_parser, fk=fk)
+    rng = np.random.default_rng(4)
+    q = rng.uniform(-1.0, 1.0, size=fk.num_joints)
+    M = dynamics.mass_matrix(q)
+    assert np.allclose(M, M.T, atol=1e-12)
+    assert np.all(np.linalg.eigvalsh(M[:5, :5]) > 0.0)
+
+    # Torque is linear in acceleration with the mass matrix as its slope
+    qd = rng.normal(size=fk.num_joints)
+    qdd = rng.normal(size=fk.num_joints)
+    bias = dynamics.torques(q, qd, np.zeros_like(qdd))
+    assert np.allclose(dynamics.torques(q, qd, qdd), bias + M @ qdd, atol=1e-10)
+
+    # Batched call matches row-by-row evaluation across chunk boundaries
+    dynamics.chunk_rows = 3
+    batch = rng.uniform(-1.0, 1.0, size=(3, 8, fk.num_joints))
+    torques = dynamics.torques(batch, batch, batch)
+    assert torques.shape == batch.shape
+    assert np.allclose(torques[1, 5], dynamics.torques(batch[1, 5], batch[1, 5], batch[1, 5]))
+
+
+def test_reachability_map_cache_and_lookups(urdf_parser, fk, tmp_path):
+    ik = InverseKinematics(urdf_parser, fk=fk, seed=0)
+    options = dict(cache_dir=tmp_path, voxel_size=0.03, num_samples=50_000)
+    built = ReachabilityMap(ik, urdf_parser.content_hash, **options).build()
+    assert not built.loaded_from_cache
+
+    # A second map for the same URDF opens the stored grids memory-mapped
+    cached = ReachabilityMap(ik, urdf_parser.content_hash, **options).build()
+    assert cached.loaded_from_cache
+    assert isinstance(cached.manipulability, np.memmap)
+    assert np.array_equal(cached.manipulability, built.manipulability)
+
+    # Each reached voxel's seed puts the end effector inside that voxel
+    voxels = np.argwhere(cached.manipulability > 0)[::97]
+    centers = cached.origin + (voxels + 0.5) * cached.voxel_size
+    seeds = cached.seed_configurations(centers)
+    reached = fk.end_effector_poses(seeds)[:, :3, 3]
+    assert np.all(np.abs(reached - centers) <= cached.voxel_size / 2 + 1e-6)
+    _, J = ik.jacobian(seeds)
+    expected = np.sqrt(np.linalg.det(J @ J.transpose(0, 2, 1)))
+    assert np.allclose(cached.manipulability_at(centers), expected, rtol=1e-5)
+
+    result = cached.query([[2.0, 0.0, 0.0], centers[0]])
+    assert result['reachable'].tolist() == [False, True]
+    assert 0.0 < result['normalized_manipulability'][1] <= 1.0
+
+
+def test_sphere_tree_encloses_mesh(tmp_path):
+    """ASCII STL triangles are all inside their leaf spheres."""
+    rng = np.random.default_rng(5)
+    triangles = rng.uniform(-0.05, 0.05, size=(40, 3, 3))
+    lines = ["solid test"]
+    for triangle in triangles:
+        lines += ["facet normal 0 0 1", "outer loop"]
+        lines += [f"vertex {x:.9f} {y:.9f} {z:.9f}" for x, y, z in triangle]
+        lines += ["endloop", "endfacet"]
+    path = tmp_path / "mesh.stl"
+    path.write_text("\n".join(lines + ["endsolid test"]))
+    loaded = load_stl(path)
+    assert np.allclose(loaded, triangles)
+
+    centers, radii, children = build_sphere_tree(loaded, leaf_radius=0.01)
+    assert radii[0] >= np.max(np.linalg.norm(loaded.reshape(-1, 3) - centers[0], axis=1)) - 1e-12
+    # Every vertex lies in some leaf sphere, so leaf overlap tests are conservative
+    leaves = children[:, 0] < 0
+    distances = np.linalg.norm(loaded.reshape(-1, 1, 3) - centers[leaves], axis=2)
+    assert np.all(np.any(distances <= radii[leaves] + 1e-12, axis=1))
+
+
+def test_self_collision_checker(urdf_parser, fk, tmp_path):
+    options = dict(fk=fk, cache_dir=tmp_path, leaf_radius=0.01)
+    checker = SelfCollisionChecker(urdf_parser, settings.mesh_dir, **options)
+    assert not checker.loaded_from_cache
+    assert len(checker.link_names) == 14
+    # Jointed neighbours are never checked against each other
+    assert ('link1', 'link2') not in checker.pair_names
+
+    folded = np.zeros(fk.num_joints)
+    folded[1:4] = 1.5  # Arm bent down into the base
+    q = np.stack([np.zeros(fk.num_joints), folded])
+    assert checker.in_collision(q).tolist() == [False, True]
+    hits = checker.check(q)
+    assert ('base_link', 'gripper_base') in [checker.pair_names[i] for i in np.flatnonzero(hits[1])]
+
+    cached = SelfCollisionChecker(urdf_parser, settings.mesh_dir, **options)
+    assert cached.loaded_from_cache
+    assert np.array_equal(cached.check(q), hits)
+
+    intervals = cached.flag_trajectory(q[[0, 1, 1, 0]], np.array([0.0, 0.1, 0.2, 0.3]))
+    assert len(intervals) == 1
+    assert intervals[0]['start_time'] == 0.1 and intervals[0]['end_time'] == 0.2
+
+
+def test_simulated_motion_is_collision_free(urdf_parser, fk, tmp_path):
+    """The physics and fleet simulators never drive the arm into itself."""
+    checker = SelfCollisionChecker(urdf_parser, settings.mesh_dir, fk=fk, cache_dir=tmp_path, leaf_radius=0.01)
+    clock = VirtualClock()
+    sim = PhysicsSimulator(urdf_parser, seed=0, clock=clock)
+    fleet = FleetSimulator(urdf_parser, num_machines=4, seed=0, clock=clock)
+    angles = []
+    # Two periods of the motion pattern (every joint frequency is a multiple of 0.1 Hz)
+    for _ in range(200):
+        clock.advance(sim.dt)
+        sim.step()
+        fleet.step()
+        angles.append(np.vstack([sim.angles, fleet.angles]))
+    assert not checker.in_collision(np.concatenate(angles)).any()
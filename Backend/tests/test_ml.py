@@ -0,0 +1,276 @@
+"""Tests for the ML feature pipeline."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.ml.preprocessing import FeatureEngineer, RollingStats
+
+
+def test_rolling_stats_match_window():
+    """Incremental statistics agree with recomputing over the window."""
+    values = np.random.default_rng(0).normal(300.0, 5.0, 2000)
+    for window_size in (1, 7, 500):
+        stats = RollingStats(window_size)
+        for i, value in enumerate(values):
+            stats.add(value)
+            window = values[max(0, i - window_size + 1):i + 1]
+            assert len(stats) == len(window)
+            assert stats.mean == pytest.approx(window.mean(), abs=1e-9)
+            assert stats.std == pytest.approx(window.std(), abs=1e-9)
+            assert stats.max == window.max() and stats.min == window.min()
+
+
+def test_extract_features_rolling_window():
+    """Rolling features cover only the last window_size samples."""
+    engineer = FeatureEngineer(window_size=3)
+    for value in [10.0, 1.0, 2.0, 3.0]:
+        engineer.add_sample({'temperature': value})
+    features = engineer.extract_features({'temperature': 3.0})
+    assert features['temperature_current'] == 3.0
+    assert features['temperature_mean'] == pytest.approx(2.0)
+    assert features['temperature_std'] == pytest.approx(np.std([1.0, 2.0, 3.0]))
+    assert features['temperature_max'] == 3.0 and features['temperature_min'] == 1.0
+    assert features['temperature_range'] == 2.0
+
+
+def test_extract_features_during_add_sample():
+    """Feature reads from another thread never see a half-updated window."""
+    import threading
+
+    engineer = FeatureEngineer(window_size=4)
+    engineer.add_sample({'temperature': 0.0})
+    done = threading.Event()
+    errors = []
+
+    def read():
+        while not done.is_set():
+            try:
+                features = engineer.extract_features({'temperature': 0.0})
+                assert features['temperature_min'] <= features['temperature_max']
+            except Exception as e:
+                errors.append(e)
+                return
+
+    # Switch threads as often as possible so reads land inside add_sample
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        reader = threading.Thread(target=read)
+        reader.start()
+        for value in np.random.default_rng(0).normal(size=50000).tolist():
+            engineer.add_sample({'temperature': value})
+        done.set()
+        reader.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert not errors
+
+
+def make_samples(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {'temperature': t, 'vibration': v, 'power': p, 'velocity': w, 'torque': q, 'angle': a}
+        for t, v, p, w, q, a in rng.normal(1.0, 0.5, size=(n, 6)).tolist()
+    ]
+
+
+def test_feature_schema_matches_scaler(tmp_path):
+    """The compiled schema reproduces MinMaxScaler and survives save/load."""
+    import joblib
+    import pandas as pd
+
+    engineer = FeatureEngineer(window_size=5)
+    X, names = engineer.create_training_dataset(make_samples())
+    assert names == engineer.feature_names
+
+    sample = make_samples(1, seed=1)[0]
+    engineer.add_sample(sample)
+    features = engineer.extract_features(sample)
+    expected = engineer.scaler.transform(pd.DataFrame([features])[names])[0]
+    # Key order and unknown keys do not matter; missing and non-finite values become 0
+    shuffled = dict(reversed(list(features.items())), unknown=5.0)
+    np.testing.assert_allclose(engineer.prepare_for_ml(shuffled), expected)
+    # Scaling reuses one output buffer per thread
+    assert engineer.prepare_for_ml(shuffled) is engineer.prepare_for_ml(features)
+    features['power_current'] = np.nan
+    del features['angle_mean']
+    vector = engineer.prepare_for_ml(features)
+    zeroed = engineer.scaler.min_[[names.index('power_current'), names.index('angle_mean')]]
+    np.testing.assert_allclose(vector[[names.index('power_current'), names.index('angle_mean')]], zeroed)
+
+    path = tmp_path / "feature_engineer.pkl"
+    engineer.save(path)
+    loaded = FeatureEngineer(window_size=5)
+    loaded.load(path)
+    assert loaded.feature_names == names
+    np.testing.assert_allclose(loaded.prepare_for_ml(shuffled), expected)
+
+    # Files holding only the scaler recover the schema from its fit columns
+    joblib.dump(engineer.scaler, path)
+    legacy = FeatureEngineer(window_size=5)
+    legacy.load(path)
+    assert legacy.feature_names == names
+
+
+@pytest.mark.parametrize("window_size", [1, 10, 300])
+def test_batch_training_dataset_matches_streaming(window_size):
+    """The vectorized training path gives the streaming features and buffers."""
+    import pandas as pd
+
+    logs = make_samples(1000)
+    streaming = FeatureEngineer(window_size=window_size)
+    rows = []
+    for log in logs:
+        streaming.add_sample(log)
+        rows.append(streaming.extract_features(log))
+    expected = pd.DataFrame(rows)
+
+    batch = FeatureEngineer(window_size=window_size)
+    features = batch.extract_features_batch(pd.DataFrame(logs))
+    assert list(features.columns) == list(expected.columns)
+    np.testing.assert_allclose(features.to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-12)
+
+    X, names = batch.create_training_dataset(logs)
+    assert X.shape == expected.shape and names == list(expected.columns)
+    # Buffers end on the final window, so live features continue seamlessly
+    live = batch.extract_features(logs[-1])
+    assert live == pytest.approx(rows[-1], rel=1e-9, abs=1e-12)
+
+    # Uneven logs fall back to the streaming path
+    X_uneven, uneven_names = FeatureEngineer(window_size).create_training_dataset(logs + [{'temperature': 1.0}])
+    assert X_uneven.shape == (len(logs) + 1, len(names)) and set(uneven_names) == set(names)
+
+
+def test_inference_engine_scores_batches():
+    """One call scores every row with all models and matches per-row scoring."""
+    import pandas as pd
+    from app.ml.anomaly_detector import AnomalyDetector
+    from app.ml.failure_predictor import FailurePredictor
+    from app.ml.rul_estimator import RULEstimator
+    from app.ml.inference import InferenceEngine, DEFAULT_PREDICTIONS
+
+    logs = make_samples(400)
+    engineer = FeatureEngineer(window_size=10)
+    X, names = engineer.create_training_dataset(logs)
+    anomaly, failure, rul = AnomalyDetector(), FailurePredictor(), RULEstimator()
+    engine = InferenceEngine(engineer, anomaly, failure, rul)
+
+    # Untrained models report their defaults
+    untrained = engine.predict(X[:3])
+    for name, value in DEFAULT_PREDICTIONS.items():
+        np.testing.assert_array_equal(untrained[name], np.full(3, value))
+
+    labels = (np.arange(len(X)) % 5 == 0).astype(int)
+    anomaly.model.set_params(n_estimators=20)
+    failure.model.set_params(n_estimators=10)
+    rul.model.set_params(n_estimators=10)
+    anomaly.train(X)
+    failure.train(X, labels)
+    rul.train(X, labels * 100.0)
+
+    predictions = engine.predict(X)
+    assert all(values.shape == (len(X),) for values in predictions.values())
+    assert predictions['anomaly_score'][7] == pytest.approx(anomaly.predict(X[7]))
+    assert predictions['failure_probability'][7] == pytest.approx(failure.predict_proba(X[7]))
+    assert predictions['rul_hours'][7] == pytest.approx(rul.predict(X[7]))
+
+    # A recording scored at once matches the training features row by row
+    from_frame = engine.predict_frame(pd.DataFrame(logs))
+    for name in engine.MODELS:
+        np.testing.assert_allclose(from_frame[name], predictions[name], rtol=1e-6, atol=1e-9)
+
+    report = engine.report()
+    assert report['rul_hours']['calls'] == 2 and report['rul_hours']['rows'] == 2 * len(X)
+    with pytest.raises(ValueError):
+        engine.predict(np.zeros((2, len(names) + 1)))
+
+
+def test_micro_batcher_groups_concurrent_rows():
+    """Rows submitted together are scored in shared batches, each caller getting its own row."""
+    import asyncio
+    from app.ml.anomaly_detector import AnomalyDetector
+    from app.ml.failure_predictor import FailurePredictor
+    from app.ml.rul_estimator import RULEstimator
+    from app.ml.inference import InferenceEngine
+    from app.ml.batching import MicroBatcher
+
+    engineer = FeatureEngineer(window_size=10)
+    X, names = engineer.create_training_dataset(make_samples(300))
+    rul = RULEstimator()
+    rul.model.set_params(n_estimators=10)
+    rul.train(X, np.arange(len(X), dtype=float))
+    engine = InferenceEngine(engineer, AnomalyDetector(), FailurePredictor(), rul)
+    expected = engine.predict(X)['rul_hours']
+
+    batcher = MicroBatcher(engine, window_ms=50.0, max_batch_size=64)
+    with pytest.raises(RuntimeError):
+        batcher.submit(X[0])
+    batcher.start()
+    try:
+        async def score_all():
+            return await asyncio.gather(*(batcher.predict(row) for row in X[:200]))
+
+        results = asyncio.run(score_all())
+        np.testing.assert_allclose([result['rul_hours'] for result in results], expected[:200], rtol=1e-6)
+        report = batcher.report()
+        # Rows arrive within one window; allow for a slow machine splitting a few batches
+        assert report['rows'] == 200 and report['batches'] <= 20
+        assert report['mean_batch_size'] >= 10
+
+        with pytest.raises(ValueError):
+            batcher.submit(np.zeros(len(names) + 1))
+    finally:
+        batcher.stop()
+    assert not batcher.is_alive
+
+    # Stopping scores every queued row, then exits; later submissions are refused
+    batcher = MicroBatcher(engine, window_ms=50.0, max_batch_size=16)
+    batcher.start()
+    futures = [batcher.submit(row) for row in X[:100]]
+    batcher.stop(timeout=30.0)
+    assert not batcher.is_alive
+    assert [future.result(timeout=0)['rul_hours'] for future in futures] == pytest.approx(expected[:100].tolist(), rel=1e-6)
+    with pytest.raises(RuntimeError):
+        batcher.submit(X[0])
+
+    # A caller timing out while its row waits in the window does not stop the thread
+    batcher = MicroBatcher(engine, window_ms=50.0, max_batch_size=16)
+    batcher.start()
+    try:
+        async def cancel_then_score():
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(batcher.predict(X[0]), 0.001)
+            return await asyncio.wait_for(batcher.predict(X[1]), 10.0)
+
+        result = asyncio.run(cancel_then_score())
+        assert result['rul_hours'] == pytest.approx(expected[1], rel=1e-6)
+        assert batcher.is_alive
+        assert batcher.report()['rows'] == 1
+    finally:
+        batcher.stop()
+
+
+def test_model_latency_concurrent_records():
+    """Latency records from several threads are all counted."""
+    import threading
+    from app.ml.inference import ModelLatency
+
+    latency = ModelLatency(window=64)
+
+    def record():
+        for _ in range(5000):
+            latency.record(0.001, 2)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    report = latency.report()
+    assert report["calls"] == 20000 and report["rows"] == 40000
+    assert report["mean_ms"] == pytest.approx(1.0)
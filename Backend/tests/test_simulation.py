@@ -0,0 +1,482 @@
+"""Tests for the simulation components."""
+import asyncio
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import settings
+from app.simulation.urdf_parser import URDFParser
+from app.simulation.physics_sim import PhysicsSimulator
+from app.simulation.fleet_sim import FleetSimulator
+from app.simulation.real_data_sim import RealDataSimulator
+from app.simulation.replay_format import convert_recording
+from app.simulation.sensor_generator import SensorGenerator
+from app.simulation.rom import ReducedOrderModel, DMDSurrogate
+from app.simulation.pipeline import MultiRatePipeline, FixedRateScheduler
+from app.simulation.clock import Clock, VirtualClock, create_clock
+
+
+@pytest.fixture(scope="module")
+def urdf_parser():
+    parser = URDFParser(settings.urdf_path)
+    assert parser.parse()
+    return parser
+
+
+def test_urdf_parse_cache(tmp_path):
+    """A second parse of an unchanged URDF loads the cached model instead of the XML."""
+    urdf_path = tmp_path / "robot.urdf"
+    urdf_path.write_bytes(settings.urdf_path.read_bytes())
+
+    first = URDFParser(urdf_path, cache_dir=tmp_path / "cache")
+    assert first.parse() and not first.loaded_from_cache
+    second = URDFParser(urdf_path, cache_dir=tmp_path / "cache")
+    assert second.parse() and second.loaded_from_cache
+    assert second.root is None
+    assert second.joints == first.joints and second.links == first.links
+    assert second.get_metadata_dict() == first.get_metadata_dict()
+    assert second.get_joint_by_name("joint3") == first.joints[[j.name for j in first.joints].index("joint3")]
+    assert second.get_link_by_name(first.links[0].name) == first.links[0]
+    assert second.get_joint_by_name("missing") is None
+
+    # Any content change produces a new key
+    urdf_path.write_bytes(urdf_path.read_bytes() + b"\n")
+    third = URDFParser(urdf_path, cache_dir=tmp_path / "cache")
+    assert third.parse() and not third.loaded_from_cache
+    assert third.content_hash != first.content_hash
+
+
+def test_physics_step_vectorized(urdf_parser):
+    """All joints advance together and stay within their URDF limits."""
+    sim = PhysicsSimulator(urdf_parser, frequency=100.0)
+    for _ in range(50):
+        sim.step()
+
+    assert sim.angles.shape == (len(sim.revolute_joints),)
+    assert np.all(sim.angles >= sim.lower_limits)
+    assert np.all(sim.angles <= sim.upper_limits)
+    assert np.all(np.abs(sim.torques) <= sim.effort_limits)
+    assert sim.sim_time == pytest.approx(0.5)
+
+
+def test_physics_joint_state_views(urdf_parser):
+    """JointState views mirror the underlying arrays."""
+    sim = PhysicsSimulator(urdf_parser)
+    sim.step()
+
+    states = sim.get_joint_states()
+    assert [s.name for s in states] == sim.joint_names
+    assert [s.angle for s in states] == sim.angles.tolist()
+    assert [s.torque for s in states] == sim.torques.tolist()
+    assert set(sim.joint_states) == set(sim.joint_names)
+
+    sim.reset()
+    assert np.allclose(sim.angles, sim.centers)
+    assert np.all(sim.velocities == 0.0)
+
+
+def test_fleet_step_batched(urdf_parser):
+    """Fleet machines advance together with independent phases and faults."""
+    fleet = FleetSimulator(urdf_parser, num_machines=8, seed=0)
+    fleet.inject_fault(fleet.machine_ids[3], "seizure", joint_index=0)
+    held = fleet.angles[3, 0]
+    for _ in range(10):
+        fleet.step()
+
+    assert fleet.angles.shape == (8, len(urdf_parser.get_revolute_joints()))
+    assert np.all(fleet.angles >= fleet.lower_limits)
+    assert np.all(fleet.angles <= fleet.upper_limits)
+    # Phase offsets keep machines out of lockstep
+    assert not np.allclose(fleet.angles[0], fleet.angles[1])
+    # Seized joint holds its angle
+    assert fleet.angles[3, 0] == held
+    assert fleet.velocities[3, 0] == 0.0
+
+    states = fleet.get_joint_states(fleet.machine_ids[5])
+    assert [s.angle for s in states] == fleet.angles[5].tolist()
+
+    # Torques use the same rigid-body dynamics as the single-machine simulator
+    single = PhysicsSimulator(urdf_parser, seed=0)
+    for machine in (0, 5):
+        expected = np.clip(
+            single.dynamics.torques(fleet.angles[machine], fleet.velocities[machine], fleet.accelerations[machine])
+            + fleet.friction_coeffs[machine] * fleet.velocities[machine],
+            -fleet.effort_limits, fleet.effort_limits)
+        np.testing.assert_allclose(fleet.torques[machine], expected, atol=1e-9)
+
+    with pytest.raises(KeyError):
+        fleet.machine_index("unknown")
+
+
+def test_fleet_faults_and_rng_streams(urdf_parser):
+    """Fleet machines take the sensor fault types and draw from their own random streams."""
+    clock = VirtualClock()
+    small = FleetSimulator(urdf_parser, num_machines=2, seed=7, clock=clock)
+    large = FleetSimulator(urdf_parser, num_machines=5, seed=7, clock=clock)
+    large.inject_fault(large.machine_ids[1], "vibration", 1.0)
+    for _ in range(20):
+        clock.advance(small.dt)
+        small.step()
+        large.step()
+    # Machine 0's motion does not depend on the size or faults of the rest of the fleet
+    np.testing.assert_array_equal(small.angles[0], large.angles[0])
+
+    base = small.friction_coeffs[0].copy()
+    small.inject_fault(small.machine_ids[0], "temperature", 0.5)
+    assert np.all(small.friction_coeffs[0] > base)
+    with pytest.raises(ValueError):
+        small.inject_fault(small.machine_ids[0], "unknown")
+    with pytest.raises(ValueError):
+        SensorGenerator(PhysicsSimulator(urdf_parser)).inject_fault("unknown")
+
+
+def test_real_data_replay_compiled(urdf_parser, tmp_path):
+    """Replay resolves columns once and precomputes derivatives."""
+    t = np.arange(50) * 0.1
+    csv_path = tmp_path / "replay.csv"
+    csv_path.write_text(
+        "timestamp,joint_1,j2\n"
+        + "\n".join(f"{ti:.1f},{10 * ti:.6f},{5.0:.1f}" for ti in t)
+    )
+
+    sim = RealDataSimulator(urdf_parser, csv_path, frequency=10.0)
+    assert sim.column_map[:3] == ["joint_1", "j2", None]
+    assert sim.angle_data.shape == (50, len(urdf_parser.get_revolute_joints()))
+    assert sim.angle_data.flags["C_CONTIGUOUS"]
+
+    sim.step()
+    sim.step()
+    states = sim.get_joint_states()
+    assert states[0].angle == pytest.approx(np.deg2rad(1.0))
+    # Constant 10 deg/s ramp on joint 1, stationary joint 2
+    assert states[0].velocity == pytest.approx(np.deg2rad(10.0))
+    assert states[0].acceleration == pytest.approx(0.0, abs=1e-9)
+    assert states[1].velocity == pytest.approx(0.0)
+    assert states[2].angle == 0.0
+
+    # Replay loops back to the first row
+    for _ in range(48):
+        sim.step()
+    sim.step()
+    assert sim.get_joint_states()[0].angle == pytest.approx(0.0)
+
+
+def test_streaming_replay_matches_in_memory(urdf_parser, tmp_path):
+    """Chunked streaming replay reproduces the in-memory replay, including seeks."""
+    rng = np.random.default_rng(0)
+    t = np.cumsum(rng.uniform(0.05, 0.15, size=103))
+    angles = np.cumsum(rng.normal(size=(103, 3)), axis=0)
+    csv_path = tmp_path / "replay.csv"
+    rows = [f"{ti:.6f}," + ",".join(f"{a:.6f}" for a in row) for ti, row in zip(t, angles)]
+    csv_path.write_text("timestamp,joint_1,joint_2,joint_3\n" + "\n".join(rows) + "\n")
+
+    memory = RealDataSimulator(urdf_parser, csv_path, streaming=False, interpolation="none")
+    stream = RealDataSimulator(urdf_parser, csv_path, streaming=True, chunk_rows=7, interpolation="none")
+    try:
+        assert stream.source is not None
+        assert stream.num_steps == memory.num_steps == 103
+
+        # Two full loops through the recording
+        for _ in range(2 * 103):
+            memory.step()
+            stream.step()
+            assert np.allclose(stream.angles, memory.angles)
+            assert np.allclose(stream.velocities, memory.velocities)
+            assert np.allclose(stream.accelerations, memory.accelerations)
+
+        memory.seek(50)
+        stream.seek(50)
+        memory.step()
+        stream.step()
+        assert np.allclose(stream.angles, memory.angles)
+        assert np.allclose(stream.accelerations, memory.accelerations)
+
+        # A full compiled pass mid-replay neither moves nor disturbs the live stream
+        compiled = np.concatenate([block[0] for _, block in stream.iter_compiled()])
+        assert np.allclose(compiled, memory.angle_data)
+        for _ in range(20):
+            memory.step()
+            stream.step()
+            assert np.allclose(stream.angles, memory.angles)
+    finally:
+        stream.close()
+
+
+def test_streaming_replay_corrupt_recording(urdf_parser, tmp_path):
+    """A read failure on the prefetch thread surfaces in step() instead of hanging."""
+    rows = [f"{0.1 * i:.1f},{i}.0" for i in range(30)]
+    rows[20] = "2.0,not-a-number"
+    csv_path = tmp_path / "replay.csv"
+    csv_path.write_text("timestamp,joint_1\n" + "\n".join(rows) + "\n")
+
+    sim = RealDataSimulator(urdf_parser, csv_path, streaming=True, chunk_rows=7, interpolation="none")
+    try:
+        with pytest.raises(RuntimeError, match="failed"):
+            for _ in range(30):
+                sim.step()
+        # The error stays raised rather than blocking on an empty queue
+        with pytest.raises(RuntimeError):
+            sim.source.next_chunk()
+    finally:
+        sim.close()
+
+
+def test_binary_recording_replay(urdf_parser, tmp_path):
+    """A converted .npy recording replays like its CSV source, memory-mapped."""
+    rng = np.random.default_rng(1)
+    angles = np.cumsum(rng.normal(size=(40, 2)), axis=0)
+    csv_path = tmp_path / "replay.csv"
+    rows = [f"{i * 0.1:.1f}," + ",".join(f"{a:.6f}" for a in row) for i, row in enumerate(angles)]
+    csv_path.write_text("timestamp,joint_1,joint_2\n" + "\n".join(rows) + "\n")
+
+    npy_path = convert_recording(csv_path, urdf_parser=urdf_parser, chunk_rows=16)
+    assert npy_path == tmp_path / "replay.npy"
+
+    csv_sim = RealDataSimulator(urdf_parser, csv_path, streaming=False, interpolation="none")
+    npy_sim = RealDataSimulator(urdf_parser, npy_path, interpolation="none")
+    assert isinstance(npy_sim.angle_data, np.memmap)
+    assert npy_sim.num_steps == 40
+
+    # Resampling would copy the mapping into private memory, so it is skipped
+    resampled = RealDataSimulator(urdf_parser, npy_path, frequency=100.0, interpolation="linear")
+    assert isinstance(resampled.angle_data, np.memmap)
+    assert resampled.num_steps == 40
+
+    for _ in range(45):
+        csv_sim.step()
+        npy_sim.step()
+        assert np.allclose(npy_sim.angles, csv_sim.angles)
+        assert np.allclose(npy_sim.velocities, csv_sim.velocities)
+        assert np.allclose(npy_sim.torques, csv_sim.torques)
+
+
+@pytest.mark.parametrize("method", ["linear", "cubic"])
+def test_resampled_replay(urdf_parser, tmp_path, method):
+    """A 10 Hz recording is resampled onto a 100 Hz grid at load time."""
+    t = np.arange(21) * 0.1
+    csv_path = tmp_path / "replay.csv"
+    rows = [f"{ti:.1f},{30 * ti:.6f}" for ti in t]
+    csv_path.write_text("timestamp,joint_1\n" + "\n".join(rows) + "\n")
+
+    sim = RealDataSimulator(urdf_parser, csv_path, frequency=100.0, interpolation=method)
+    assert sim.num_steps == 201
+    assert np.allclose(np.diff(sim.timestamp_data), 0.01)
+
+    for _ in range(16):
+        sim.step()
+    # 15th resampled step is t = 0.15 s, between two recorded rows
+    assert sim.angles[0] == pytest.approx(np.deg2rad(4.5))
+    assert sim.velocities[0] == pytest.approx(np.deg2rad(30.0))
+
+    fast = RealDataSimulator(urdf_parser, csv_path, frequency=10.0, interpolation=method, speed=4.0)
+    assert fast.num_steps == 6
+
+
+def test_sensor_generator_batched(urdf_parser):
+    """Sensor readings are computed for all joints at once and stay in range."""
+    sim = PhysicsSimulator(urdf_parser)
+    sensors = SensorGenerator(sim, seed=0)
+    for _ in range(20):
+        sim.step()
+        data = sensors.generate()
+
+    assert data.temperatures.shape == (len(sim.joint_names),)
+    assert np.all(data.temperatures >= settings.base_temperature)
+    assert np.all(data.temperatures <= settings.max_temperature)
+    assert np.all((data.vibrations >= 0) & (data.vibrations <= settings.vibration_max))
+    assert data.power_consumption == pytest.approx(10.0 * np.sum(np.abs(sim.torques * sim.velocities)))
+    assert data.joint_temperatures == dict(zip(sim.joint_names, data.temperatures.tolist()))
+    assert sensors.cycles_count == 20
+
+    sensors.inject_fault("temperature", 1.0)
+    assert np.all(sensors.joint_temps > settings.base_temperature + 29.0)
+    sensors.reset()
+    assert np.all(sensors.joint_temps == settings.base_temperature)
+
+
+def test_rom_running_mean(urdf_parser):
+    """The running-sum ROM matches a plain window average."""
+    sim = PhysicsSimulator(urdf_parser)
+    rom = ReducedOrderModel(reduction_factor=4)
+    history = []
+    for i in range(11):
+        sim.step()
+        states = sim.get_joint_states()
+        rom.add_state(states)
+        history.append([[s.angle, s.velocity, s.acceleration, s.torque] for s in states])
+        assert rom.is_ready() == (i >= 3)
+
+    expected = np.mean(history[-4:], axis=0)
+    assert np.allclose(rom.get_reduced_array(), expected)
+    reduced = rom.get_reduced_state()
+    assert [s.name for s in reduced] == sim.joint_names
+    assert reduced[0].torque == pytest.approx(expected[0, 3])
+
+    rom.reset()
+    assert rom.get_reduced_state() == []
+
+
+def test_dmd_surrogate(urdf_parser):
+    """DMD recovers the sinusoidal joint dynamics and reports its rollout error."""
+    sim = PhysicsSimulator(urdf_parser, frequency=100.0)
+    t = np.arange(3000)[:, None] * sim.dt
+    angles = sim.centers + sim.amplitudes * np.sin(sim.omega * t)
+    velocities = sim._velocity_gain * np.cos(sim.omega * t)
+
+    exact = DMDSurrogate().fit(angles[:1000], velocities[:1000])
+    assert exact.error_bound(angles, velocities)['relative_error'] < 1e-8
+
+    rng = np.random.default_rng(0)
+    noisy = DMDSurrogate().fit(angles[:1000] + rng.normal(0.0, 0.01, (1000, 7)),
+                               velocities[:1000] + rng.normal(0.0, 0.05, (1000, 7)))
+    bound = noisy.error_bound(angles, velocities)
+    assert bound['relative_error'] < 0.1
+    assert np.all(np.abs(noisy.eigenvalues) <= 1.0 + 1e-12)
+
+    # Batched propagation: stepping, closed-form jumps and rollouts agree
+    z = noisy.encode(angles[[0, 100]], velocities[[0, 100]])
+    stepped = noisy.step(noisy.step(noisy.step(z)))
+    assert np.allclose(noisy.advance(z, 3), stepped)
+    assert np.allclose(noisy.rollout(z, np.arange(4))[3], stepped)
+    recon_angles, _ = noisy.reconstruct(noisy.advance(z, 50))
+    assert np.abs(recon_angles - angles[[50, 150]]).max() < bound['max_angle_error'] + 1e-9
+
+
+def test_multi_rate_pipeline():
+    """Stages run at integer decimations of the base rate and report savings."""
+    pipeline = MultiRatePipeline(100.0, {"physics": 100.0, "inference": 10.0, "stream": 30.0})
+    assert pipeline.stages["inference"].decimation == 10
+    assert pipeline.stages["stream"].decimation == 3
+
+    runs = {"physics": 0, "inference": 0}
+    for _ in range(50):
+        pipeline.advance()
+        for stage in runs:
+            if pipeline.due(stage):
+                with pipeline.measure(stage):
+                    runs[stage] += 1
+    assert runs == {"physics": 50, "inference": 5}
+
+    report = pipeline.report()
+    assert report["ticks"] == 50
+    assert report["stages"]["inference"]["calls"] == 5
+    assert 0.0 < report["cpu_savings_percent"] < 100.0
+
+    pipeline.reset()
+    assert pipeline.tick == 0 and pipeline.stages["physics"].calls == 0
+
+
+def run_scheduler(policy, work):
+    """Drive a scheduler on a virtual clock; work[i] is the time tick i takes."""
+    clock = VirtualClock()
+
+    async def loop():
+        scheduler = FixedRateScheduler(100.0, policy, max_catch_up=2, clock=clock)
+        ticks = []
+        for seconds in work:
+            ticks.append(await scheduler.wait())
+            clock.advance(seconds)
+        return scheduler, ticks, clock.now()
+
+    return asyncio.run(loop())
+
+
+def test_fixed_rate_scheduler_keeps_absolute_deadlines():
+    """Work time does not stretch the tick period."""
+    scheduler, ticks, end = run_scheduler("catch_up", [0.004] * 100)
+    assert ticks == list(range(100))
+    assert end == pytest.approx(0.994)
+    report = scheduler.report()
+    assert report["overruns"] == 0 and report["skipped_ticks"] == 0
+    assert report["jitter_ms"]["max"] == pytest.approx(0.0, abs=1e-9)
+    assert report["achieved_rate_hz"] == pytest.approx(100 / 0.994)
+    assert scheduler.timestamp(10) - scheduler.timestamp(0) == pytest.approx(0.1)
+
+
+def test_fixed_rate_scheduler_policies():
+    """A 55 ms stall is caught up (up to the limit) or skipped."""
+    work = [0.001, 0.001, 0.055, 0.001, 0.001, 0.001, 0.001]
+    scheduler, ticks, _ = run_scheduler("skip", work)
+    assert ticks == [0, 1, 2, 7, 8, 9, 10]
+    assert scheduler.report()["skipped_ticks"] == 4
+
+    scheduler, ticks, _ = run_scheduler("catch_up", work)
+    assert ticks == [0, 1, 2, 5, 6, 7, 8]
+    report = scheduler.report()
+    assert report["skipped_ticks"] == 2
+    assert report["overruns"] == 3
+    assert report["jitter_ms"]["max"] == pytest.approx(25.0)
+
+    with pytest.raises(ValueError):
+        FixedRateScheduler(100.0, "wait")
+
+
+
+def test_fixed_rate_scheduler_reset_during_wait():
+    """A reset while a wait() is sleeping re-anchors the grid instead of failing."""
+    clock = VirtualClock()
+
+    async def loop():
+        scheduler = FixedRateScheduler(100.0, clock=clock)
+        for _ in range(5):
+            await scheduler.wait()
+        pending = asyncio.ensure_future(scheduler.wait())
+        await asyncio.sleep(0)  # Let the wait start sleeping
+        scheduler.reset()
+        first = await pending
+        anchored = clock.now()
+        ticks = [await scheduler.wait() for _ in range(3)]
+        return scheduler, first, anchored, ticks
+
+    scheduler, first, anchored, ticks = asyncio.run(loop())
+    assert first == 0 and ticks == [1, 2, 3]
+    assert clock.now() == pytest.approx(anchored + 0.03)
+    report = scheduler.report()
+    assert report["ticks"] == 4 and report["overruns"] == 0
+
+
+def test_virtual_clock_deterministic_physics(urdf_parser):
+    """Seeded simulators on virtual clocks follow simulated time and repeat exactly."""
+    def run():
+        clock = VirtualClock(epoch=1000.0)
+        simulator = PhysicsSimulator(urdf_parser, frequency=10.0, clock=clock, seed=7)
+        angles = []
+        for _ in range(50):
+            clock.advance(simulator.dt)
+            simulator.step()
+            angles.append(simulator.angles.copy())
+        return np.array(angles), simulator.get_state_dict()["timestamp"]
+
+    first, timestamp = run()
+    second, _ = run()
+    np.testing.assert_array_equal(first, second)
+    assert timestamp == pytest.approx(1005.0)
+    # Motion follows the 5 simulated seconds, however fast the loop ran
+    assert np.ptp(first, axis=0).max() > 0.1
+
+    with pytest.raises(ValueError):
+        create_clock("sundial")
+    # The base class only defines the interface
+    with pytest.raises(TypeError):
+        Clock()
+
+
+def test_turbo_clock_outpaces_real_time():
+    """A turbo virtual clock lets the scheduler run far ahead of the wall clock."""
+    clock = create_clock("virtual")
+
+    async def loop():
+        scheduler = FixedRateScheduler(100.0, clock=clock)
+        for _ in range(1000):
+            await scheduler.wait()
+        return scheduler.report()
+
+    report = asyncio.run(loop())
+    assert clock.now() == pytest.approx(9.99)
+    assert report["overruns"] == 0
+    assert report["speedup"] > 10.0
@@ -13,6 +13,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 from app.config import settings
 from app.simulation.urdf_parser import URDFParser
 from app.simulation.physics_sim import PhysicsSimulator
+from app.simulation.clock import VirtualClock
 from app.simulation.sensor_generator import SensorGenerator
 from app.ml.preprocessing import FeatureEngineer
 from app.ml.anomaly_detector import AnomalyDetector
@@ -25,11 +26,14 @@ def generate_training_data(num_samples: int = 5000):
     print(f"Generating {num_samples} training samples...")
     
     # Initialize simulation
-    urdf_parser = URDFParser(settings.urdf_path)
+    urdf_parser = URDFParser(settings.urdf_path, cache_dir=settings.cache_dir)
     if not urdf_parser.parse():
         raise RuntimeError("Failed to parse URDF")
     
-    simulator = PhysicsSimulator(urdf_parser, frequency=10.0)
+    # Virtual time advances one timestep per sample, so the motion follows
+    # the 10 Hz sample rate however fast this loop runs
+    clock = VirtualClock()
+    simulator = PhysicsSimulator(urdf_parser, frequency=10.0, clock=clock)
     sensor_gen = SensorGenerator(simulator)
     
     # Generate data
@@ -39,6 +43,7 @@ def generate_training_data(num_samples: int = 5000):
     
     for i in range(num_samples):
         # Step simulation
+        clock.advance(simulator.dt)
         simulator.step()
         sensor_data = sensor_gen.generate()
         joint_states = simulator.get_joint_states()
@@ -88,7 +93,7 @@ def train_models():
     
     # Feature engineering
     print("\nFeature Engineering...")
-    feature_eng = FeatureEngineer(window_size=10)
+    feature_eng = FeatureEngineer(window_size=settings.feature_window_size)
     X, feature_names = feature_eng.create_training_dataset(data)
     feature_eng.save() # Save the fitted scaler
     print(f"Feature matrix shape: {X.shape}")